@@ -64,7 +64,9 @@ async def get_available_print_files(request: Request):
         db_service = await get_database_service()
         
         # Get active products and their print file IDs
-        active_products = await db_service.get_products_by_tenant(tenant_id)
+        active_products = await db_service.get_products_by_tenant(
+            tenant_id, fields=["print_file_id", "is_active", "file_name"]
+        )
         active_file_ids = {p.print_file_id for p in active_products if p.print_file_id and p.is_active}
         
         # Create mapping from print_file_id to clean filename using products.file_name
@@ -154,7 +156,10 @@ async def get_products_with_files(request: Request):
         db_service = await get_database_service()
         
         # Get all products for this tenant
-        products = await db_service.get_products_by_tenant(tenant_id)
+        products = await db_service.get_products_by_tenant(
+            tenant_id,
+            fields=["name", "description", "category", "print_file_id", "requires_assembly", "image_url", "created_at"]
+        )
 
         products_with_files = []
         files_dir = Path("/home/pi/PrintFarmSoftware/files/print_files")
@@ -314,7 +319,7 @@ async def get_files_status(request: Request):
         
         # Get database counts
         db_service = await get_database_service()
-        products = await db_service.get_products_by_tenant(tenant_id)
+        products = await db_service.get_products_by_tenant(tenant_id, fields=["print_file_id"])
         products_with_files = len([p for p in products if p.print_file_id])
         
         return {
@@ -354,7 +359,7 @@ async def cleanup_orphaned_files(request: Request):
         db_service = await get_database_service()
         
         # Get active products and their print file IDs
-        active_products = await db_service.get_products_by_tenant(tenant_id)
+        active_products = await db_service.get_products_by_tenant(tenant_id, fields=["print_file_id", "is_active"])
         active_file_ids = {p.print_file_id for p in active_products if p.print_file_id and p.is_active}
         
         logger.info(f"Starting cleanup - {len(active_products)} total products, {len(active_file_ids)} active print file IDs")
@@ -370,7 +375,7 @@ async def cleanup_orphaned_files(request: Request):
         # IMPORTANT: A file is "orphaned" if not linked to active products
         # However, delete_print_file() will also check for print job references
         # to prevent database integrity errors
-        all_print_files = await db_service.get_print_files_by_tenant(tenant_id)
+        all_print_files = await db_service.get_print_files_by_tenant(tenant_id, fields=["name"])
         orphaned_db_files = [pf for pf in all_print_files if pf.id not in active_file_ids]
 
         logger.info(f"Found {len(orphaned_db_files)} potentially orphaned files in database (not linked to active products)")
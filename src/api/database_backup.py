@@ -191,7 +191,8 @@ async def download_database_backup(
                         "backup_type": "complete" if include_files else "database_only"
                     }
 
-            # Copy and compress database
+            # Copy and compress database (checkpoint first so the WAL is in the main file)
+            await db_service.checkpoint()
             if compress:
                 db_backup_filename = "tenant.db.gz"
                 db_backup_path = db_backup_dir / db_backup_filename
@@ -450,6 +451,7 @@ async def restore_database_backup(
                     backup_name = f"pre_restore_backup_{timestamp}.db"
                     backup_path = backup_dir / backup_name
 
+                    await db_service.checkpoint()
                     shutil.copy2(current_db_path, backup_path)
                     backup_created = str(backup_path)
                     logger.info(f"Created pre-restore database backup at: {backup_path}")
@@ -464,10 +466,14 @@ async def restore_database_backup(
                     logger.info(f"Created pre-restore files backup at: {files_backup_path}")
 
             # Close all database connections
+            await db_service.checkpoint()
             await db_service.engine.dispose()
 
-            # Replace the current database with the restored one
+            # Replace the current database with the restored one; WAL sidecar
+            # files belong to the old database and must not be replayed onto it
             current_db_path = Path(db_service.database_path)
+            for suffix in ("-wal", "-shm"):
+                Path(f"{current_db_path}{suffix}").unlink(missing_ok=True)
             shutil.copy2(restored_db_path, current_db_path)
             logger.info(f"Database restored from: {restored_db_path}")
 
@@ -643,6 +649,7 @@ async def clear_database(
                 backup_name = f"pre_clear_backup_{timestamp}.db"
                 backup_path = backup_dir / backup_name
 
+                await db_service.checkpoint()
                 shutil.copy2(current_db_path, backup_path)
                 backup_created = str(backup_path)
                 logger.info(f"Created pre-clear backup at: {backup_path}")
@@ -18,7 +18,8 @@ from sqlalchemy import text
 from ..services.config_service import get_config_service
 from ..utils.tenant_utils import get_tenant_id_or_raise
 from ..services.database_service import get_database_service
-from ..services.job_queue_service import job_queue_service, JobPriority
+from ..services.metadata_cache_service import metadata_cache_service
+from ..services.job_queue_service import job_queue_service, job_handler, JobPriority
 from ..core.printer_client import printer_manager
 from ..utils.validators import sanitize_bambu_filename
 from ..services.auth_service import get_auth_service
@@ -450,6 +451,18 @@ async def create_enhanced_print_job(
             logger.warning(f"Failed to fetch print file metadata: {file_error}, using defaults")
             quantity_per_print = 1
 
+        # The plate index has the figures for the plate actually printed, where
+        # the print_files row may aggregate filament across every plate
+        plate = await _get_plate_info(file_info, 1)
+        if plate:
+            if plate["object_count"]:
+                quantity_per_print = plate["object_count"]
+            if plate["filament_weight_grams"]:
+                filament_grams = int(plate["filament_weight_grams"] * 100)
+            if plate["print_time_seconds"]:
+                estimated_time_minutes = int(plate["print_time_seconds"] / 60)
+            logger.info(f"Using plate 1 index: {quantity_per_print} objects, {filament_grams} centigrams, {estimated_time_minutes} minutes")
+
         # Get printer model and name
         printer_name = None
         try:
@@ -623,7 +636,7 @@ async def create_enhanced_print_job(
                     "request": request.dict(),
                     "tenant_id": tenant_id
                 },
-                callback=_process_print_job_queued,
+                handler="print_jobs.process",
                 priority=job_priority,
                 max_retries=2  # Allow 2 retries for robustness
             )
@@ -653,6 +666,24 @@ async def create_enhanced_print_job(
         logger.error(f"Failed to create enhanced print job: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _get_plate_info(file_info: Dict[str, Any], plate_index: int = 1) -> Optional[Dict[str, Any]]:
+    """
+    Get the indexed metadata for one plate of the selected print file
+
+    Reads the per-plate index kept by the metadata cache, parsing the 3MF
+    only if it has never been indexed. Returns None for non-3MF or missing
+    files and unknown plates, so callers fall back to the print_files row.
+    """
+    local_path = file_info.get("local_path")
+    if not local_path or not local_path.lower().endswith(".3mf") or not file_info.get("exists"):
+        return None
+
+    try:
+        return await metadata_cache_service.get_plate(local_path, plate_index)
+    except Exception as e:
+        logger.warning(f"Failed to read plate {plate_index} index for {local_path}: {e}")
+        return None
+
 async def _get_file_info(job_type: str, target_id: str, tenant_id: str, printer_model: Optional[str] = None) -> Dict[str, Any]:
     """
     Get file information based on job type with model-aware selection for products
@@ -841,6 +872,7 @@ async def _process_print_job_direct(
     # Call the main processing function directly
     await _process_print_job(job_id, file_info, request, tenant_id)
 
+@job_handler("print_jobs.process")
 async def _process_print_job_queued(payload: Dict[str, Any]):
     """Queued job callback to process the print job directly without slicing"""
     job_id = payload["job_id"]
@@ -1117,6 +1149,7 @@ async def get_object_count(
     product_id: str,
     printer_id: str,
     product_sku_id: Optional[str] = None,
+    plate_number: int = 1,
     fastapi_request: Request = None
 ):
     """
@@ -1130,9 +1163,10 @@ async def get_object_count(
         product_id: ID of the product
         printer_id: ID of the target printer
         product_sku_id: Optional SKU ID for stock calculation
+        plate_number: Plate to count objects on for multi-plate files (default 1)
 
     Returns:
-        object_count: Number of objects in the print file (null if no file found)
+        object_count: Number of objects on the plate (null if no file found)
         current_stock: Current stock level (null if no SKU provided)
         projected_stock: Projected stock after print (null if no SKU or no file)
         requires_assembly: Whether product requires assembly
@@ -1146,29 +1180,26 @@ async def get_object_count(
         # Get database service
         db_service = await get_database_service()
 
-        # First, query database to get the numeric printer_id from the UUID
+        # Map the UUID to the numeric printer_id
         # The frontend sends UUID (id field), but printer_manager uses numeric IDs from YAML config
-        async with db_service.get_session() as session:
-            result = await session.execute(
-                text("SELECT printer_id FROM printers WHERE id = :printer_id"),
-                {"printer_id": printer_id}
-            )
-            printer_record = result.fetchone()
+        numeric_printer_id = printer_manager.identity_index.get_numeric_id(printer_id)
+        if numeric_printer_id is None:
+            async with db_service.get_session() as session:
+                result = await session.execute(
+                    text("SELECT printer_id, tenant_id FROM printers WHERE id = :printer_id"),
+                    {"printer_id": printer_id}
+                )
+                printer_record = result.fetchone()
 
-        if not printer_record:
-            raise HTTPException(status_code=404, detail=f"Printer {printer_id} not found in database")
+            if not printer_record:
+                raise HTTPException(status_code=404, detail=f"Printer {printer_id} not found in database")
 
-        numeric_printer_id = printer_record[0]
+            numeric_printer_id = printer_record[0]
+            printer_manager.identity_index.register(numeric_printer_id, printer_id, printer_record[1])
         logger.info(f"Mapped printer UUID {printer_id} to numeric ID {numeric_printer_id}")
 
         # Get printer info to determine model using the numeric ID
-        printer = None
-        printers_list = printer_manager.list_printers()
-        for p in printers_list:
-            # Match using the numeric ID from database
-            if str(p.get("id")) == str(numeric_printer_id):
-                printer = p
-                break
+        printer = printer_manager.printer_configs.get(str(numeric_printer_id))
 
         if not printer:
             raise HTTPException(status_code=404, detail=f"Printer with numeric ID {numeric_printer_id} not found in printer config")
@@ -1192,17 +1223,22 @@ async def get_object_count(
                 "error": e.detail
             }
 
-        # Get object count from print file
+        # Get object count from the plate index, falling back to the print file
         object_count = 1  # Default
-        try:
-            print_file = await db_service.get_print_file_by_id(print_file_id)
-            if print_file and print_file.object_count:
-                object_count = print_file.object_count
-                logger.info(f"Object count from print file: {object_count}")
-            else:
-                logger.warning(f"Print file {print_file_id} has no object_count, defaulting to 1")
-        except Exception as e:
-            logger.warning(f"Failed to get print file object_count: {e}, defaulting to 1")
+        plate = await _get_plate_info(file_info, plate_number)
+        if plate and plate["object_count"]:
+            object_count = plate["object_count"]
+            logger.info(f"Object count from plate {plate_number} index: {object_count}")
+        else:
+            try:
+                print_file = await db_service.get_print_file_by_id(print_file_id)
+                if print_file and print_file.object_count:
+                    object_count = print_file.object_count
+                    logger.info(f"Object count from print file: {object_count}")
+                else:
+                    logger.warning(f"Print file {print_file_id} has no object_count, defaulting to 1")
+            except Exception as e:
+                logger.warning(f"Failed to get print file object_count: {e}, defaulting to 1")
 
         # Get product to check if assembly is required
         product = await db_service.get_product_by_id(product_id)
@@ -1231,7 +1267,8 @@ async def get_object_count(
             "current_stock": current_stock,
             "projected_stock": projected_stock,
             "requires_assembly": requires_assembly,
-            "print_file_id": print_file_id
+            "print_file_id": print_file_id,
+            "plate_number": plate_number
         }
 
     except HTTPException:
@@ -1368,8 +1405,13 @@ async def _resolve_printer_uuid(printer_id: str, db_service, tenant_id: str) ->
         Database UUID string for the printer, or None if not found
     """
     try:
-        # Get all printers for this tenant
+        printer_uuid = printer_manager.identity_index.get_uuid(printer_id)
+        if printer_uuid:
+            return printer_uuid
+
+        # Cache miss: get all printers for this tenant and index them
         printers = await db_service.get_printers_by_tenant(tenant_id)
+        printer_manager.identity_index.register_many(printers)
         
         # Find printer by printer_id field
         for printer in printers:
@@ -15,7 +15,8 @@ import tempfile
 from ..services.file_association_service import get_file_association_service
 from ..services.config_service import get_config_service
 from ..models.responses import BaseResponse
-from ..utils.metadata_parser import parse_3mf_metadata
+from ..services.metadata_cache_service import metadata_cache_service
+from ..utils.upload_stream import receive_upload
 
 logger = logging.getLogger(__name__)
 
@@ -44,15 +45,15 @@ async def parse_file_metadata(file: UploadFile = File(...)):
                 detail="Only 3MF files can be parsed for metadata. Other file types (STL, GCODE, etc.) must be manually assigned to a printer model."
             )
 
-        # Create a temporary file to parse
+        # Stream the file to a temporary location to parse
         with tempfile.NamedTemporaryFile(delete=False, suffix='.3mf') as temp_file:
-            # Read and save file content
-            content = await file.read()
-            temp_file.write(content)
             temp_file_path = temp_file.name
+        upload = await receive_upload(file, temp_file_path, index_zip=True)
 
-        # Parse metadata from the temporary file
-        metadata = parse_3mf_metadata(temp_file_path)
+        # Parse metadata from the temporary file (cached by content hash)
+        metadata = await metadata_cache_service.get_metadata(
+            temp_file_path, remember_path=False, content_hash=upload.sha256
+        )
 
         # Extract the printer model ID (this is the key field we need)
         printer_model_id = metadata.get('printer_model_id')
@@ -122,10 +123,8 @@ async def upload_file(
         # Save file with record ID as filename, preserving original extension
         file_path = storage_dir / f"{record_id}{file_extension}"
         
-        # Read and save file content
-        content = await file.read()
-        with open(file_path, 'wb') as f:
-            f.write(content)
+        # Stream file content to disk
+        upload = await receive_upload(file, str(file_path), index_zip=file_extension == '.3mf')
         
         logger.info(f"Uploaded file {file.filename} to {file_path} for record {record_id}")
 
@@ -133,7 +132,7 @@ async def upload_file(
         metadata = None
         if file_extension == '.3mf':
             try:
-                metadata = parse_3mf_metadata(str(file_path))
+                metadata = await metadata_cache_service.get_metadata(str(file_path), content_hash=upload.sha256)
                 logger.info(f"Extracted metadata from 3MF file: {record_id}")
             except Exception as parse_error:
                 logger.warning(f"Failed to parse 3MF metadata for {record_id}: {parse_error}")
@@ -148,7 +147,7 @@ async def upload_file(
             "message": "File uploaded successfully",
             "record_id": record_id,
             "local_path": str(file_path),
-            "file_size": len(content)
+            "file_size": upload.size_bytes
         }
 
         # Include metadata in response if parsed
@@ -157,6 +156,8 @@ async def upload_file(
 
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to upload file for record {record_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -311,25 +312,24 @@ async def replace_file(
         if file_extension not in allowed_extensions:
             raise HTTPException(status_code=400, detail=f"File must be one of: {', '.join(allowed_extensions)}")
         
-        # Delete old file if it exists with any extension
-        possible_extensions = ['.3mf', '.stl', '.gcode', '.obj', '.amf']
-        storage_dir = Path("/home/pi/PrintFarmSoftware/files/print_files")
-        for ext in possible_extensions:
-            old_file_path = storage_dir / f"{record_id}{ext}"
-            if old_file_path.exists():
-                old_file_path.unlink()
-                logger.info(f"Deleted old file: {old_file_path}")
-
         # Construct new file path with original extension
+        storage_dir = Path("/home/pi/PrintFarmSoftware/files/print_files")
         file_path = storage_dir / f"{record_id}{file_extension}"
 
         # Create storage directory if it doesn't exist
         storage_dir.mkdir(parents=True, exist_ok=True)
         
-        # Read and save file content (will overwrite existing file)
-        content = await file.read()
-        with open(file_path, 'wb') as f:
-            f.write(content)
+        # Stream file content to disk (atomically replaces an existing file,
+        # so a rejected upload leaves the old one in place)
+        upload = await receive_upload(file, str(file_path), index_zip=file_extension == '.3mf')
+
+        # Delete old file if it exists with any other extension
+        possible_extensions = ['.3mf', '.stl', '.gcode', '.obj', '.amf']
+        for ext in possible_extensions:
+            old_file_path = storage_dir / f"{record_id}{ext}"
+            if ext != file_extension and old_file_path.exists():
+                old_file_path.unlink()
+                logger.info(f"Deleted old file: {old_file_path}")
         
         logger.info(f"Replaced file {file_path} for record {record_id}")
 
@@ -337,7 +337,7 @@ async def replace_file(
         metadata = None
         if file_extension == '.3mf':
             try:
-                metadata = parse_3mf_metadata(str(file_path))
+                metadata = await metadata_cache_service.get_metadata(str(file_path), content_hash=upload.sha256)
                 logger.info(f"Extracted metadata from replaced 3MF file: {record_id}")
             except Exception as parse_error:
                 logger.warning(f"Failed to parse 3MF metadata for {record_id}: {parse_error}")
@@ -351,7 +351,7 @@ async def replace_file(
             "message": "File replaced successfully",
             "record_id": record_id,
             "local_path": str(file_path),
-            "file_size": len(content)
+            "file_size": upload.size_bytes
         }
 
         # Include metadata in response if parsed
@@ -360,6 +360,8 @@ async def replace_file(
 
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to replace file for record {record_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -475,6 +477,49 @@ async def cleanup_orphaned_files():
         logger.error(f"Failed to cleanup orphaned files: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/metadata-cache/stats")
+async def get_metadata_cache_stats():
+    """
+    Get 3MF metadata cache size and hit/miss counters
+    """
+    try:
+        return {"success": True, **await metadata_cache_service.get_stats()}
+    except Exception as e:
+        logger.error(f"Failed to get metadata cache stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/metadata-cache/invalidate")
+async def invalidate_metadata_cache(content_hash: Optional[str] = None, file_path: Optional[str] = None):
+    """
+    Drop cached 3MF metadata by content hash, by file path, or all of it
+    """
+    try:
+        removed = await metadata_cache_service.invalidate(content_hash=content_hash, file_path=file_path)
+        return {
+            "success": True,
+            "message": f"Removed {removed} metadata cache entries",
+            "entries_removed": removed
+        }
+    except Exception as e:
+        logger.error(f"Failed to invalidate metadata cache: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/metadata-cache/rebuild")
+async def rebuild_metadata_cache():
+    """
+    Clear the 3MF metadata cache and re-parse every stored 3MF file
+    """
+    try:
+        result = await metadata_cache_service.rebuild()
+        return {
+            "success": True,
+            "message": f"Rebuilt metadata cache from {result['files_parsed']} files",
+            **result
+        }
+    except Exception as e:
+        logger.error(f"Failed to rebuild metadata cache: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 async def _try_associate_file(record_id: str, file_path: str, metadata: Optional[dict] = None):
     """
     Background task to try associating a file with its database record and updating metadata
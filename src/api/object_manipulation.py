@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, BackgroundTasks, Request
 from fastapi.responses import FileResponse
 import os
 import tempfile
@@ -9,7 +9,8 @@ from typing import Optional
 from datetime import datetime, timedelta
 from src.models.responses import BaseResponse
 from src.core.threemf_processor import ThreeMFProcessor
-from src.utils.mesh_utils import MeshUtils
+from src.utils.process_pool import cpu_worker_pool
+from src.utils.upload_stream import receive_upload
 import asyncio
 
 logger = logging.getLogger(__name__)
@@ -45,8 +46,43 @@ def cleanup_old_files():
     for file_id in expired_files:
         del TEMP_FILE_STORE[file_id]
 
+# How often a running multiplication checks whether its client is still there
+DISCONNECT_POLL_INTERVAL = 0.5
+
+class ClientDisconnected(Exception):
+    """The client went away before the response was ready"""
+
+async def run_while_connected(request: Request, coro, poll_interval: float = DISCONNECT_POLL_INTERVAL):
+    """
+    Await coro, cancelling it if the client disconnects first
+
+    Cancelling the 3MF processor terminates its worker process, so an
+    abandoned upload stops using CPU straight away instead of running to
+    completion for nobody.
+
+    Raises:
+        ClientDisconnected: The client disconnected and coro was cancelled
+    """
+    task = asyncio.create_task(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+
 @router.post("/3mf/multiply", response_class=FileResponse)
 async def multiply_objects(
+    request: Request,
     file: UploadFile = File(..., description="3MF file containing a single object"),
     object_count: int = Form(..., ge=1, le=100, description="Number of objects to create (1-100)"),
     spacing_mm: float = Form(..., ge=0, le=50, description="Spacing between objects in mm (0-50)")
@@ -71,11 +107,10 @@ async def multiply_objects(
     temp_input_path = None
     
     try:
-        # Save uploaded file to temporary location
+        # Stream uploaded file to a temporary location
         with tempfile.NamedTemporaryFile(delete=False, suffix='.3mf') as temp_file:
             temp_input_path = temp_file.name
-            content = await file.read()
-            temp_file.write(content)
+        await receive_upload(file, temp_input_path, index_zip=True)
         
         logger.info(f"Processing 3MF file: {file.filename} with {object_count} objects and {spacing_mm}mm spacing")
         
@@ -84,15 +119,16 @@ async def multiply_objects(
         logger.info(f"Processing with {timeout_seconds}s timeout for {object_count} objects")
         
         try:
-            output_path = await asyncio.wait_for(
-                asyncio.to_thread(
-                    processor.process_3mf,
-                    temp_input_path,
-                    object_count,
-                    spacing_mm
-                ),
-                timeout=timeout_seconds
+            output_path = await run_while_connected(
+                request,
+                asyncio.wait_for(
+                    processor.process_3mf(temp_input_path, object_count, spacing_mm),
+                    timeout=timeout_seconds
+                )
             )
+        except ClientDisconnected:
+            logger.info(f"Client disconnected, cancelled multiplication of {file.filename}")
+            raise HTTPException(status_code=499, detail="Client closed request")
         except asyncio.TimeoutError:
             logger.error(f"Processing timed out after {timeout_seconds}s for {object_count} objects")
             raise HTTPException(
@@ -135,6 +171,8 @@ async def multiply_objects(
             }
         )
         
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -247,6 +285,7 @@ async def get_manipulation_status():
             "files": active_files,
             "max_object_count": 100,
             "max_spacing_mm": 50,
-            "build_plate_size": "256x256mm"
+            "build_plate_size": "256x256mm",
+            "cpu_pool": cpu_worker_pool.get_stats()
         }
     )
\ No newline at end of file
@@ -477,12 +477,12 @@ async def toggle_printer_cleared_status(printer_id: str):
     bed needs to be cleared before starting a new print.
     """
     try:
-        import sqlite3
         from datetime import datetime
+        from ..utils.sqlite_profile import connect_sqlite
 
         # Direct SQLite access
         db_path = "/home/pi/PrintFarmSoftware/data/tenant.db"
-        conn = sqlite3.connect(db_path)
+        conn = connect_sqlite(db_path)
         cursor = conn.cursor()
 
         # Get current cleared status
@@ -57,9 +57,12 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=List[dict])
-async def get_printers():
+async def get_printers(fields: Optional[str] = None):
     """
     Get all printers for the current tenant from local SQLite
+
+    Pass a comma-separated list of columns in `fields` (e.g. `id,name,status`)
+    to load and return only those; `id` is always included.
     """
     try:
         # Get tenant ID from config
@@ -69,14 +72,29 @@ async def get_printers():
         
         if not tenant_id:
             raise HTTPException(status_code=400, detail="Tenant not configured")
+
+        requested_fields = None
+        if fields:
+            requested_fields = {field.strip() for field in fields.split(',') if field.strip()}
+            unknown_fields = requested_fields - set(Printer.__table__.columns.keys())
+            if unknown_fields:
+                raise HTTPException(status_code=400, detail=f"Unknown printer fields: {', '.join(sorted(unknown_fields))}")
+            requested_fields.add('id')
         
         # Get printers from local database
         db_service = await get_database_service()
-        printers = await db_service.get_printers_by_tenant(tenant_id)
+        printers = await db_service.get_printers_by_tenant(tenant_id, fields=requested_fields)
         
         # Convert to dict for response
+        if requested_fields:
+            return [
+                {key: value for key, value in printer.to_dict().items() if key in requested_fields}
+                for printer in printers
+            ]
         return [printer.to_dict() for printer in printers]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get printers: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -106,7 +124,7 @@ async def create_printer(printer_request: PrinterCreateRequest):
 
         # Get ALL printers (including inactive) for this tenant to find the max printer_id
         # This prevents UNIQUE constraint violations when inactive printers exist
-        existing_printers = await db_service.get_all_printers_by_tenant(tenant_id)
+        existing_printers = await db_service.get_all_printers_by_tenant(tenant_id, fields=["printer_id"])
         max_printer_id = 0
         for printer in existing_printers:
             if printer.printer_id and printer.printer_id > max_printer_id:
@@ -7,37 +7,33 @@ import logging
 import uuid
 import asyncio
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 from src.models.responses import BaseResponse
 from src.core.orcaslicer_client import OrcaSlicerClient
+from src.core.slice_cache import slice_cache
+from src.core.slicing_executor import slicing_executor
+from src.services.job_queue_service import JobPriority
+from src.services.sliced_file_store import sliced_file_store
 from src.core.threemf_processor import ThreeMFProcessor
 from src.core.printer_client import printer_manager
 from src.utils.exceptions import PrinterNotFoundError, PrinterConnectionError
+from src.utils.upload_stream import receive_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["3MF Slicing Operations"])
 
-# Store for temporary sliced files (extend TTL for larger files)
-SLICED_FILE_STORE = {}
-SLICED_FILE_TTL = timedelta(hours=2)  # Sliced files expire after 2 hours
-
-def cleanup_old_sliced_files():
-    """Remove expired sliced files"""
-    current_time = datetime.now()
-    expired_files = []
-    
-    for file_id, file_info in SLICED_FILE_STORE.items():
-        if current_time - file_info['created_at'] > SLICED_FILE_TTL:
-            expired_files.append(file_id)
-            try:
-                if os.path.exists(file_info['path']):
-                    os.remove(file_info['path'])
-                logger.info(f"Cleaned up expired sliced file: {file_id}")
-            except Exception as e:
-                logger.error(f"Error cleaning up sliced file {file_id}: {e}")
-    
-    for file_id in expired_files:
-        del SLICED_FILE_STORE[file_id]
+def sliced_file_response(stored: dict) -> FileResponse:
+    """Download response for a sliced file store entry"""
+    return FileResponse(
+        path=stored['file_path'],
+        filename=stored['filename'],
+        media_type="application/octet-stream",
+        headers={
+            "Content-Disposition": f"attachment; filename=\"{stored['filename']}\"",
+            "Content-Type": "application/octet-stream",
+            "X-Sliced-File-Id": stored['id']
+        }
+    )
 
 @router.post("/3mf/slice", response_class=FileResponse)
 async def slice_3mf_file(
@@ -71,15 +67,15 @@ async def slice_3mf_file(
         os.makedirs(work_dir, exist_ok=True)
         temp_filename = f"input_{uuid.uuid4().hex[:8]}.3mf"
         temp_input_path = os.path.join(work_dir, temp_filename)
+        sliced_file_store.hold_work_file(temp_input_path)
         
-        content = await file.read()
-        with open(temp_input_path, 'wb') as temp_file:
-            temp_file.write(content)
+        upload = await receive_upload(file, temp_input_path, index_zip=True)
         
         logger.info(f"Starting slicing process for: {file.filename}")
         
-        # Validate the 3MF file
-        orcaslicer.validate_3mf_file(temp_input_path)
+        # Validate the 3MF structure from the index built while streaming
+        if '3D/3dmodel.model' not in upload.zip_members:
+            raise ValueError("Invalid 3MF file: missing 3dmodel.model")
         
         # Get file info for timeout calculation
         file_info = await orcaslicer.get_file_info(temp_input_path)
@@ -119,30 +115,12 @@ async def slice_3mf_file(
             except:
                 pass
         
-        # Schedule cleanup of output file after download
-        async def delayed_cleanup():
-            await asyncio.sleep(300)  # Wait 5 minutes for download
-            try:
-                if os.path.exists(output_path):
-                    os.remove(output_path)
-                logger.info(f"Cleaned up sliced file: {output_filename}")
-            except Exception as e:
-                logger.warning(f"Error during delayed cleanup: {e}")
-        
-        # Start cleanup task
-        background_tasks.add_task(delayed_cleanup)
-        
-        # Return FileResponse for direct download
-        return FileResponse(
-            path=output_path,
-            filename=output_filename,
-            media_type="application/octet-stream",
-            headers={
-                "Content-Disposition": f"attachment; filename=\"{output_filename}\"",
-                "Content-Type": "application/octet-stream"
-            }
-        )
+        # Keep the output in the sliced file store for re-download
+        stored = await sliced_file_store.add(output_path, output_filename, source="slice")
+        return sliced_file_response(stored)
         
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Validation error for {file.filename}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -150,6 +128,7 @@ async def slice_3mf_file(
         logger.error(f"Error slicing 3MF file {file.filename}: {e}")
         raise HTTPException(status_code=500, detail=f"Error slicing file: {str(e)}")
     finally:
+        sliced_file_store.release_work_files(temp_input_path)
         # Clean up input temp file if processing failed
         if temp_input_path and os.path.exists(temp_input_path):
             try:
@@ -186,6 +165,7 @@ async def multiply_and_slice_3mf(
     orcaslicer = OrcaSlicerClient()
     temp_input_path = None
     multiplied_path = None
+    accessible_multiplied_path = None
     
     try:
         # Save uploaded file to flatpak-accessible location
@@ -194,10 +174,9 @@ async def multiply_and_slice_3mf(
         os.makedirs(work_dir, exist_ok=True)
         temp_filename = f"input_{uuid.uuid4().hex[:8]}.3mf"
         temp_input_path = os.path.join(work_dir, temp_filename)
+        sliced_file_store.hold_work_file(temp_input_path)
         
-        content = await file.read()
-        with open(temp_input_path, 'wb') as temp_file:
-            temp_file.write(content)
+        await receive_upload(file, temp_input_path, index_zip=True)
         
         logger.info(f"Starting multiply-slice process for: {file.filename}")
         logger.info(f"Parameters: {object_count} objects, {spacing_mm}mm spacing")
@@ -208,12 +187,7 @@ async def multiply_and_slice_3mf(
         
         try:
             multiplied_path = await asyncio.wait_for(
-                asyncio.to_thread(
-                    processor.process_3mf,
-                    temp_input_path,
-                    object_count,
-                    spacing_mm
-                ),
+                processor.process_3mf(temp_input_path, object_count, spacing_mm),
                 timeout=multiply_timeout
             )
         except asyncio.TimeoutError:
@@ -226,6 +200,7 @@ async def multiply_and_slice_3mf(
         # Step 2: Copy multiplied file to flatpak-accessible location
         multiplied_filename = f"multiplied_{uuid.uuid4().hex[:8]}.3mf"
         accessible_multiplied_path = os.path.join(work_dir, multiplied_filename)
+        sliced_file_store.hold_work_file(accessible_multiplied_path)
         shutil.copy2(multiplied_path, accessible_multiplied_path)
         logger.info(f"Copied multiplied file to accessible location: {accessible_multiplied_path}")
         
@@ -269,30 +244,14 @@ async def multiply_and_slice_3mf(
                 except:
                     pass
         
-        # Schedule cleanup of output file after download
-        async def delayed_cleanup():
-            await asyncio.sleep(300)  # Wait 5 minutes
-            try:
-                processor.cleanup()
-                if os.path.exists(output_path):
-                    os.remove(output_path)
-                logger.info(f"Cleaned up multiply-slice files for: {output_filename}")
-            except Exception as e:
-                logger.warning(f"Error during delayed cleanup: {e}")
-        
-        background_tasks.add_task(delayed_cleanup)
-        
-        # Return FileResponse for direct download
-        return FileResponse(
-            path=output_path,
-            filename=output_filename,
-            media_type="application/octet-stream",
-            headers={
-                "Content-Disposition": f"attachment; filename=\"{output_filename}\"",
-                "Content-Type": "application/octet-stream"
-            }
-        )
+        background_tasks.add_task(processor.cleanup)
+        
+        # Keep the output in the sliced file store for re-download
+        stored = await sliced_file_store.add(output_path, output_filename, source="multiply-slice")
+        return sliced_file_response(stored)
         
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -300,6 +259,7 @@ async def multiply_and_slice_3mf(
         logger.error(f"Error in multiply-slice process: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
     finally:
+        sliced_file_store.release_work_files(temp_input_path, accessible_multiplied_path)
         # Clean up temporary files if processing failed
         cleanup_files = [temp_input_path, multiplied_path]
         for file_path in cleanup_files:
@@ -345,6 +305,7 @@ async def multiply_slice_and_print(
     orcaslicer = OrcaSlicerClient()
     temp_input_path = None
     multiplied_path = None
+    accessible_multiplied_path = None
     sliced_path = None
     
     try:
@@ -354,10 +315,9 @@ async def multiply_slice_and_print(
         os.makedirs(work_dir, exist_ok=True)
         temp_filename = f"input_{uuid.uuid4().hex[:8]}.3mf"
         temp_input_path = os.path.join(work_dir, temp_filename)
+        sliced_file_store.hold_work_file(temp_input_path)
         
-        content = await file.read()
-        with open(temp_input_path, 'wb') as temp_file:
-            temp_file.write(content)
+        await receive_upload(file, temp_input_path, index_zip=True)
         
         logger.info(f"Starting complete workflow for printer {printer_id}: {file.filename}")
         logger.info(f"Parameters: {object_count} objects, {spacing_mm}mm spacing, AMS: {use_ams}, Auto-start: {start_print}")
@@ -368,12 +328,7 @@ async def multiply_slice_and_print(
         
         try:
             multiplied_path = await asyncio.wait_for(
-                asyncio.to_thread(
-                    processor.process_3mf,
-                    temp_input_path,
-                    object_count,
-                    spacing_mm
-                ),
+                processor.process_3mf(temp_input_path, object_count, spacing_mm),
                 timeout=multiply_timeout
             )
         except asyncio.TimeoutError:
@@ -385,6 +340,7 @@ async def multiply_slice_and_print(
         # Step 2: Copy multiplied file to flatpak-accessible location
         multiplied_filename = f"multiplied_{uuid.uuid4().hex[:8]}.3mf"
         accessible_multiplied_path = os.path.join(work_dir, multiplied_filename)
+        sliced_file_store.hold_work_file(accessible_multiplied_path)
         shutil.copy2(multiplied_path, accessible_multiplied_path)
         logger.info(f"Copied multiplied file to accessible location: {accessible_multiplied_path}")
         
@@ -402,7 +358,8 @@ async def multiply_slice_and_print(
                 input_path=accessible_multiplied_path,
                 output_filename=sliced_filename,
                 timeout=slice_timeout,
-                printer_id=printer_id  # Use the actual printer ID for profile selection
+                printer_id=printer_id,  # Use the actual printer ID for profile selection
+                priority=JobPriority.HIGH  # A printer is waiting on this one
             )
         except asyncio.TimeoutError:
             raise HTTPException(
@@ -530,6 +487,7 @@ async def multiply_slice_and_print(
         logger.error(f"Error in complete workflow: {e}")
         raise HTTPException(status_code=500, detail=f"Workflow failed: {str(e)}")
     finally:
+        sliced_file_store.release_work_files(temp_input_path, accessible_multiplied_path)
         # Clean up temporary files if processing failed
         cleanup_files = [temp_input_path, multiplied_path, sliced_path]
         for file_path in cleanup_files:
@@ -539,6 +497,69 @@ async def multiply_slice_and_print(
                 except:
                     pass
 
+@router.get("/3mf/sliced")
+async def list_sliced_files():
+    """
+    List sliced files kept for re-download
+    
+    Unpinned files expire after the configured TTL since their last download
+    and are evicted least recently used first when the store exceeds its size
+    budget.
+    """
+    try:
+        files = await sliced_file_store.list_files()
+        return {
+            "success": True,
+            "message": "Stored sliced files",
+            "timestamp": datetime.now().isoformat(),
+            "files": [{k: v for k, v in f.items() if k != 'file_path'} for f in files],
+            "store": await sliced_file_store.get_stats()
+        }
+    except Exception as e:
+        logger.error(f"Error listing sliced files: {e}")
+        raise HTTPException(status_code=500, detail=f"Error listing sliced files: {str(e)}")
+
+@router.get("/3mf/sliced/{file_id}", response_class=FileResponse)
+async def download_sliced_file(file_id: str):
+    """
+    Download a previously sliced file again without re-slicing
+    
+    The id is returned in the X-Sliced-File-Id header of the slice endpoints.
+    """
+    stored = await sliced_file_store.get(file_id)
+    if not stored:
+        raise HTTPException(status_code=404, detail="Sliced file not found or expired")
+    return sliced_file_response(stored)
+
+@router.post("/3mf/sliced/{file_id}/pin")
+async def pin_sliced_file(file_id: str, pinned: bool = True):
+    """
+    Pin a sliced file so it is never evicted (pinned=false to unpin)
+    """
+    if not await sliced_file_store.set_pinned(file_id, pinned):
+        raise HTTPException(status_code=404, detail="Sliced file not found")
+    return {
+        "success": True,
+        "message": f"Sliced file {'pinned' if pinned else 'unpinned'}",
+        "timestamp": datetime.now().isoformat(),
+        "id": file_id,
+        "pinned": pinned
+    }
+
+@router.delete("/3mf/sliced/{file_id}")
+async def delete_sliced_file(file_id: str):
+    """
+    Delete a sliced file before it expires
+    """
+    if not await sliced_file_store.delete(file_id):
+        raise HTTPException(status_code=404, detail="Sliced file not found")
+    return {
+        "success": True,
+        "message": "Sliced file deleted",
+        "timestamp": datetime.now().isoformat(),
+        "id": file_id
+    }
+
 @router.get("/profiles")
 async def list_orcaslicer_profiles():
     """
@@ -633,11 +654,8 @@ async def get_slicing_status():
     Get status of slicing service and temporary files
     
     Returns information about the slicing service, OrcaSlicer availability,
-    and any temporary sliced files currently stored.
+    the slicing queue, and the sliced file store and slice cache.
     """
-    # Clean up old files first
-    cleanup_old_sliced_files()
-    
     # Check OrcaSlicer availability
     orcaslicer = OrcaSlicerClient()
     orcaslicer_available = True
@@ -662,16 +680,6 @@ async def get_slicing_status():
         orcaslicer_available = False
         orcaslicer_error = str(e)
     
-    # Get temporary file info
-    active_files = []
-    for file_id, file_info in SLICED_FILE_STORE.items():
-        active_files.append({
-            "id": file_id,
-            "filename": file_info['filename'],
-            "created_at": file_info['created_at'].isoformat(),
-            "expires_at": (file_info['created_at'] + SLICED_FILE_TTL).isoformat()
-        })
-    
     return {
         "success": True,
         "message": "Slicing service status",
@@ -684,9 +692,7 @@ async def get_slicing_status():
             "max_objects": 100,
             "max_spacing_mm": 50
         },
-        "temporary_files": {
-            "active_count": len(active_files),
-            "files": active_files,
-            "ttl_hours": SLICED_FILE_TTL.total_seconds() / 3600
-        }
+        "sliced_files": await sliced_file_store.get_stats(),
+        "slicing_queue": slicing_executor.get_stats(),
+        "slice_cache": slice_cache.get_stats()
     }
\ No newline at end of file
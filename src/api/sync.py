@@ -416,6 +416,7 @@ async def get_printer_connections():
                     'is_active': printer.is_active,
                     'is_connected_db': printer.is_connected,
                     'is_connected_actual': conn_info['connected'] if conn_info else False,
+                    'connect_outcome': conn_info.get('connect_outcome') if conn_info else None,
                     'connection_error': printer.connection_error,
                     'last_connection_attempt': printer.last_connection_attempt.isoformat() if printer.last_connection_attempt else None
                 })
@@ -425,6 +426,7 @@ async def get_printer_connections():
                 'total_printers': len(printer_details),
                 'connected_count': sum(1 for p in printer_details if p['is_connected_actual']),
                 'printers': printer_details,
+                'fleet_connect': connection_status.get('fleet_connect'),
                 'connection_service': connection_status,
                 'timestamp': datetime.utcnow().isoformat()
             }
@@ -521,8 +523,8 @@ async def resync_printer_connections():
         if not connection_service:
             raise HTTPException(status_code=503, detail="Printer connection service not available")
         
-        # Perform resync
-        result = await connection_service.sync_printers_from_database()
+        # Perform resync (printers connect in parallel; progress is on /printer-connections)
+        result = await connection_service.sync_printers_from_database(user_action=True)
         
         return {
             'success': result.get('success', False),
@@ -2,7 +2,8 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import asyncio
 import json
 import logging
-from typing import Dict, Set
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
 from src.models.responses import LivePrintStatus, LiveStatusUpdate, PrintJobStatus, PrintProgress, TemperatureStatus, TemperatureInfo
 from src.core.printer_client import printer_manager
 from src.utils.exceptions import PrinterNotFoundError, PrinterConnectionError
@@ -11,24 +12,60 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["WebSocket Live Status"])
 
 class ConnectionManager:
-    """Manages WebSocket connections for live status streaming"""
-    
+    """Manages WebSocket connections for live status streaming
+
+    Each topic (a single printer, or the all-printers stream) has one shared
+    producer task that computes the status once per tick, serializes it once
+    and fans the same payload out to every subscriber. Producers start with
+    the first subscriber and exit when the last one leaves.
+
+    The all-printers stream also has an opt-in delta mode: subscribers get a
+    full snapshot tagged with a sequence number, then only the per-printer
+    fields that changed, one sequence number per frame. A client that sees a
+    gap in the sequence asks for a resync and gets a fresh snapshot.
+    """
+
+    ALL_PRINTERS_TOPIC = "__all__"
+
     def __init__(self):
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         self.all_printers_connections: Set[WebSocket] = set()
+        self.producer_tasks: Dict[str, asyncio.Task] = {}
+
+        # Delta-mode subscribers of the all-printers stream
+        self.delta_connections: Set[WebSocket] = set()
+        self.pending_snapshots: Set[WebSocket] = set()  # Awaiting a full snapshot (new or resync)
+        self.snapshots_in_flight: Set[WebSocket] = set()  # Snapshot being sent; join delta_connections after
+        self.delta_seq: int = 0
+        self.delta_state: Dict[str, Dict] = {}  # printer_id -> last status sent to delta subscribers
+        self.all_printers_wakeup = asyncio.Event()
+
+        self.single_printer_interval = 2  # seconds between single printer updates
+        self.all_printers_interval = 3  # seconds between all printers updates
+        self.send_timeout = 2.0  # slow clients are dropped after this many seconds
     
-    async def connect_single_printer(self, websocket: WebSocket, printer_id: str):
-        """Connect client to single printer status updates"""
+    async def connect_single_printer(self, websocket: WebSocket, printer_id: str, initial_message: Optional[str] = None):
+        """Connect client to single printer status updates
+
+        The initial message is sent before the client joins the broadcast set
+        so it never races with a producer send on the same socket.
+        """
         await websocket.accept()
+        if initial_message is not None:
+            await websocket.send_text(initial_message)
         if printer_id not in self.active_connections:
             self.active_connections[printer_id] = set()
         self.active_connections[printer_id].add(websocket)
+        self._ensure_producer(printer_id, self._single_printer_producer(printer_id))
         logger.info(f"Client connected to printer {printer_id} status stream")
     
-    async def connect_all_printers(self, websocket: WebSocket):
+    async def connect_all_printers(self, websocket: WebSocket, initial_message: Optional[str] = None):
         """Connect client to all printers status updates"""
         await websocket.accept()
+        if initial_message is not None:
+            await websocket.send_text(initial_message)
         self.all_printers_connections.add(websocket)
+        self._ensure_producer(self.ALL_PRINTERS_TOPIC, self._all_printers_producer())
         logger.info("Client connected to all printers status stream")
     
     def disconnect_single_printer(self, websocket: WebSocket, printer_id: str):
@@ -39,39 +76,196 @@ class ConnectionManager:
                 del self.active_connections[printer_id]
         logger.info(f"Client disconnected from printer {printer_id} status stream")
     
+    async def connect_all_printers_delta(self, websocket: WebSocket):
+        """Connect client to the delta-encoded all printers stream
+
+        The producer is woken immediately and delivers the initial snapshot,
+        so every frame a delta client receives comes from the same task and
+        shares one sequence.
+        """
+        await websocket.accept()
+        self.pending_snapshots.add(websocket)
+        self._ensure_producer(self.ALL_PRINTERS_TOPIC, self._all_printers_producer())
+        self.all_printers_wakeup.set()
+        logger.info("Client connected to all printers status stream (delta mode)")
+
+    def request_resync(self, websocket: WebSocket):
+        """Queue a fresh snapshot for a delta client that detected a gap"""
+        if (websocket in self.delta_connections or websocket in self.pending_snapshots
+                or websocket in self.snapshots_in_flight):
+            self.delta_connections.discard(websocket)
+            self.pending_snapshots.add(websocket)
+            self.all_printers_wakeup.set()
+            logger.debug("Delta client requested resync")
+    
     def disconnect_all_printers(self, websocket: WebSocket):
         """Disconnect client from all printers updates"""
         self.all_printers_connections.discard(websocket)
+        self.delta_connections.discard(websocket)
+        self.pending_snapshots.discard(websocket)
+        self.snapshots_in_flight.discard(websocket)
         logger.info("Client disconnected from all printers status stream")
-    
+
+    def _has_all_printers_subscribers(self) -> bool:
+        return bool(self.all_printers_connections or self.delta_connections or self.pending_snapshots)
+
+    def _ensure_producer(self, topic: str, producer) -> None:
+        """Start the producer for a topic unless one is already running"""
+        task = self.producer_tasks.get(topic)
+        if task and not task.done():
+            producer.close()  # Discard the unused coroutine
+            return
+        self.producer_tasks[topic] = asyncio.create_task(producer)
+        logger.debug(f"Started live status producer for topic {topic}")
+
+    async def _fan_out(self, subscribers: Set[WebSocket], payload: str) -> None:
+        """Send one pre-serialized payload to every subscriber concurrently
+
+        A client that errors or does not accept the frame within send_timeout
+        is removed from the set and closed, so one slow browser tab cannot
+        stall the stream for everyone else.
+        """
+        targets = list(subscribers)
+        if not targets:
+            return
+
+        results = await asyncio.gather(
+            *(asyncio.wait_for(websocket.send_text(payload), timeout=self.send_timeout) for websocket in targets),
+            return_exceptions=True
+        )
+
+        for websocket, result in zip(targets, results):
+            if isinstance(result, BaseException):
+                if isinstance(result, asyncio.TimeoutError):
+                    logger.warning("Dropping slow live status client (send timed out)")
+                else:
+                    logger.warning(f"Failed to send to client: {result}")
+                subscribers.discard(websocket)
+                try:
+                    await websocket.close()
+                except Exception:
+                    pass  # Client already gone
+
     async def send_to_printer_subscribers(self, printer_id: str, message: dict):
         """Send message to all subscribers of a specific printer"""
         if printer_id in self.active_connections:
-            disconnected = []
-            for websocket in self.active_connections[printer_id].copy():
-                try:
-                    await websocket.send_text(json.dumps(message))
-                except Exception as e:
-                    logger.warning(f"Failed to send to client: {e}")
-                    disconnected.append(websocket)
-            
-            # Clean up disconnected clients
-            for websocket in disconnected:
-                self.active_connections[printer_id].discard(websocket)
+            await self._fan_out(self.active_connections[printer_id], json.dumps(message, default=str))
     
     async def send_to_all_subscribers(self, message: dict):
         """Send message to all subscribers of the all-printers stream"""
-        disconnected = []
-        for websocket in self.all_printers_connections.copy():
+        await self._fan_out(self.all_printers_connections, json.dumps(message, default=str))
+
+    async def _single_printer_producer(self, printer_id: str):
+        """Shared update loop for one printer's subscribers"""
+        try:
+            while self.active_connections.get(printer_id):
+                await asyncio.sleep(self.single_printer_interval)
+
+                subscribers = self.active_connections.get(printer_id)
+                if not subscribers:
+                    break
+
+                payload = await build_single_printer_message(printer_id)
+                await self._fan_out(subscribers, payload)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.producer_tasks.pop(printer_id, None)
+            logger.debug(f"Stopped live status producer for printer {printer_id}")
+
+    async def _all_printers_producer(self):
+        """Shared update loop for the all-printers subscribers (full and delta)"""
+        try:
+            while self._has_all_printers_subscribers():
+                try:
+                    await asyncio.wait_for(self.all_printers_wakeup.wait(), timeout=self.all_printers_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self.all_printers_wakeup.clear()
+
+                if not self._has_all_printers_subscribers():
+                    break
+
+                try:
+                    status_data = await collect_all_printers_status()
+                except Exception as e:
+                    logger.error(f"Error in all printers live status stream: {e}")
+                    payload = json.dumps({
+                        "type": "error",
+                        "message": f"Stream error: {str(e)}"
+                    })
+                    for subscribers in (self.all_printers_connections, self.delta_connections, self.pending_snapshots):
+                        await self._fan_out(subscribers, payload)
+                    continue
+
+                if self.all_printers_connections:
+                    payload = json.dumps({
+                        "type": "live_status",
+                        "data": status_data
+                    }, default=str)
+                    await self._fan_out(self.all_printers_connections, payload)
+
+                if self.delta_connections or self.pending_snapshots:
+                    await self._publish_delta(status_data)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.producer_tasks.pop(self.ALL_PRINTERS_TOPIC, None)
+            logger.debug("Stopped all printers live status producer")
+
+    async def _publish_delta(self, status_data: List[Dict]):
+        """Advance the delta sequence and send changes and pending snapshots"""
+        current = {str(status["printer_id"]): status for status in status_data}
+
+        changes = {}
+        for printer_id, status in current.items():
+            previous = self.delta_state.get(printer_id)
+            diff = status if previous is None else diff_status_fields(previous, status)
+            if diff:
+                changes[printer_id] = diff
+        removed = [printer_id for printer_id in self.delta_state if printer_id not in current]
+
+        if changes or removed or self.delta_seq == 0:
+            self.delta_seq += 1
+            self.delta_state = current
+
+            # Unchanged ticks send nothing; the sequence only advances with real changes
+            if self.delta_connections:
+                payload = json.dumps({
+                    "type": "live_status_delta",
+                    "seq": self.delta_seq,
+                    "changes": changes,
+                    "removed": removed,
+                    "timestamp": datetime.utcnow()
+                }, default=str)
+                await self._fan_out(self.delta_connections, payload)
+
+        if self.pending_snapshots:
+            pending = self.pending_snapshots
+            self.pending_snapshots = set()
+            self.snapshots_in_flight = pending
+            payload = json.dumps({
+                "type": "live_status_snapshot",
+                "seq": self.delta_seq,
+                "data": status_data
+            }, default=str)
             try:
-                await websocket.send_text(json.dumps(message))
-            except Exception as e:
-                logger.warning(f"Failed to send to all-printers client: {e}")
-                disconnected.append(websocket)
-        
-        # Clean up disconnected clients
-        for websocket in disconnected:
-            self.all_printers_connections.discard(websocket)
+                await self._fan_out(pending, payload)
+            finally:
+                self.snapshots_in_flight = set()
+            # Clients that failed the send were discarded from the set by _fan_out, and
+            # clients that disconnected meanwhile by disconnect_all_printers; a client
+            # that asked for a resync meanwhile waits for its next snapshot instead
+            self.delta_connections |= pending - self.pending_snapshots
+
+    async def shutdown(self):
+        """Cancel all running producer tasks"""
+        tasks = list(self.producer_tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.producer_tasks.clear()
 
 manager = ConnectionManager()
 
@@ -105,9 +299,109 @@ def convert_to_response_models(status_data: Dict) -> LivePrintStatus:
         status=status,
         progress=progress,
         temperatures=temperatures,
-        light_on=status_data.get("light_on", False)
+        light_on=status_data.get("light_on", False),
+        stale=status_data.get("stale", False)
     )
 
+async def build_single_printer_message(printer_id: str) -> str:
+    """Compute and serialize one live status frame for a single printer"""
+    try:
+        # Check if printer is still connected
+        if printer_id not in printer_manager.clients:
+            return json.dumps({
+                "type": "error",
+                "message": f"Printer {printer_id} disconnected"
+            })
+
+        # Get live status
+        status_data = await printer_manager.get_live_print_status(printer_id)
+        live_status = convert_to_response_models(status_data)
+
+        # Send update in format expected by frontend
+        status_data = live_status.model_dump() if hasattr(live_status, 'model_dump') else live_status
+        return json.dumps({
+            "type": "live_status",
+            "data": status_data
+        }, default=str)
+
+    except PrinterConnectionError as e:
+        logger.warning(f"Printer connection error for {printer_id}: {e}")
+        return json.dumps({
+            "type": "error",
+            "message": f"Printer connection error: {str(e)}"
+        })
+    except Exception as e:
+        logger.error(f"Error in live status stream for {printer_id}: {e}")
+        return json.dumps({
+            "type": "error",
+            "message": f"Stream error: {str(e)}"
+        })
+
+async def collect_all_printers_status() -> List[Dict]:
+    """Get live status for all printers in the format expected by the frontend"""
+    all_status_data = await printer_manager.get_all_live_status()
+    live_statuses = [convert_to_response_models(status) for status in all_status_data]
+    return [status.model_dump() if hasattr(status, 'model_dump') else status for status in live_statuses]
+
+def diff_status_fields(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Return only the fields of a printer status that changed
+
+    Nested dicts (temperatures, progress) are diffed recursively so a single
+    temperature tick sends one number, not the whole block; any other change,
+    including a dict becoming None, replaces the value outright. Clients apply
+    the result with a deep merge. The per-status timestamp is ignored since it
+    changes every tick; delta frames carry their own.
+    """
+    changes = {}
+    for key, value in current.items():
+        if key == "timestamp":
+            continue
+        old_value = previous.get(key)
+        if isinstance(value, dict) and isinstance(old_value, dict):
+            nested = diff_status_fields(old_value, value)
+            if nested:
+                changes[key] = nested
+        elif key not in previous or old_value != value:
+            changes[key] = value
+    return changes
+
+async def build_all_printers_message() -> str:
+    """Compute and serialize one live status frame for all printers"""
+    try:
+        status_data = await collect_all_printers_status()
+        return json.dumps({
+            "type": "live_status",
+            "data": status_data
+        }, default=str)
+
+    except Exception as e:
+        logger.error(f"Error in all printers live status stream: {e}")
+        return json.dumps({
+            "type": "error",
+            "message": f"Stream error: {str(e)}"
+        })
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    """Hold the handler open until the client goes away
+
+    Updates are pushed by the shared producer; the handler only drains
+    incoming frames so a closed socket is noticed promptly.
+    """
+    while True:
+        await websocket.receive_text()
+
+async def _handle_delta_client_messages(websocket: WebSocket):
+    """Process control messages from a delta-mode client until it disconnects"""
+    while True:
+        message = await websocket.receive_text()
+        try:
+            request = json.loads(message)
+        except ValueError:
+            continue
+
+        if isinstance(request, dict) and request.get("type") == "resync":
+            manager.request_resync(websocket)
+
 @router.websocket("/ws/live-status/{printer_id}")
 async def websocket_single_printer_status(websocket: WebSocket, printer_id: str):
     """
@@ -118,83 +412,32 @@ async def websocket_single_printer_status(websocket: WebSocket, printer_id: str)
     - Print status (idle, printing, paused, etc.)
     - Temperature readings (nozzle, bed, chamber)
     
-    Updates are sent every 2 seconds while connected.
+    Updates are sent every 2 seconds while connected, from a producer
+    shared by every subscriber of this printer.
     """
-    await manager.connect_single_printer(websocket, printer_id)
-    
+    # Verify printer exists
+    if printer_id not in printer_manager.printer_configs:
+        await websocket.accept()
+        await websocket.send_text(json.dumps({
+            "type": "error",
+            "message": f"Printer {printer_id} not found"
+        }))
+        await websocket.close()
+        return
+
+    # Build initial status
+    if printer_id in printer_manager.clients:
+        initial_message = await build_single_printer_message(printer_id)
+    else:
+        # Send offline status
+        initial_message = json.dumps({
+            "type": "error",
+            "message": f"Printer {printer_id} not connected"
+        })
+
     try:
-        # Verify printer exists
-        if printer_id not in printer_manager.printer_configs:
-            await websocket.send_text(json.dumps({
-                "type": "error",
-                "message": f"Printer {printer_id} not found"
-            }))
-            return
-        
-        # Send initial status
-        try:
-            if printer_id in printer_manager.clients:
-                status_data = await printer_manager.get_live_print_status(printer_id)
-                live_status = convert_to_response_models(status_data)
-                # Send message format expected by frontend
-                status_data = live_status.model_dump() if hasattr(live_status, 'model_dump') else live_status
-                await websocket.send_text(json.dumps({
-                    "type": "live_status",
-                    "data": status_data
-                }, default=str))
-            else:
-                # Send offline status
-                await websocket.send_text(json.dumps({
-                    "type": "error",
-                    "message": f"Printer {printer_id} not connected"
-                }))
-        except Exception as e:
-            logger.error(f"Failed to get initial status for {printer_id}: {e}")
-            await websocket.send_text(json.dumps({
-                "type": "error", 
-                "message": f"Failed to get printer status: {str(e)}"
-            }))
-        
-        # Stream live updates
-        while True:
-            try:
-                # Wait for 2 seconds between updates
-                await asyncio.sleep(2)
-                
-                # Check if printer is still connected
-                if printer_id not in printer_manager.clients:
-                    await websocket.send_text(json.dumps({
-                        "type": "error",
-                        "message": f"Printer {printer_id} disconnected"
-                    }))
-                    continue
-                
-                # Get live status
-                status_data = await printer_manager.get_live_print_status(printer_id)
-                live_status = convert_to_response_models(status_data)
-
-                # Send update in format expected by frontend
-                status_data = live_status.model_dump() if hasattr(live_status, 'model_dump') else live_status
-                await websocket.send_text(json.dumps({
-                    "type": "live_status",
-                    "data": status_data
-                }, default=str))
-                
-            except PrinterConnectionError as e:
-                logger.warning(f"Printer connection error for {printer_id}: {e}")
-                await websocket.send_text(json.dumps({
-                    "type": "error",
-                    "message": f"Printer connection error: {str(e)}"
-                }))
-                await asyncio.sleep(5)  # Wait longer on connection errors
-            except Exception as e:
-                logger.error(f"Error in live status stream for {printer_id}: {e}")
-                await websocket.send_text(json.dumps({
-                    "type": "error",
-                    "message": f"Stream error: {str(e)}"
-                }))
-                break
-                
+        await manager.connect_single_printer(websocket, printer_id, initial_message)
+        await _wait_for_disconnect(websocket)
     except WebSocketDisconnect:
         logger.info(f"Client disconnected from printer {printer_id} status stream")
     except Exception as e:
@@ -212,53 +455,26 @@ async def websocket_all_printers_status(websocket: WebSocket):
     - Print status for each printer  
     - Temperature readings for each printer
     
-    Updates are sent every 3 seconds while connected.
+    Updates are sent every 3 seconds while connected, from a single producer
+    shared by every subscriber.
+
+    Connect with ?mode=delta to opt into delta encoding:
+    - Server sends {"type": "live_status_snapshot", "seq": n, "data": [...]} first
+    - Then {"type": "live_status_delta", "seq": n, "changes": {printer_id: {...}}, "removed": [...]}
+      only when something changed; each delta advances seq by exactly one
+    - Client sends {"type": "resync"} after a gap in seq to get a fresh snapshot
     """
-    await manager.connect_all_printers(websocket)
-    
+    delta_mode = websocket.query_params.get("mode") == "delta"
+
     try:
-        # Send initial status for all printers
-        try:
-            all_status_data = await printer_manager.get_all_live_status()
-            live_statuses = [convert_to_response_models(status) for status in all_status_data]
-            # Send message format expected by frontend
-            status_data = [status.model_dump() if hasattr(status, 'model_dump') else status for status in live_statuses]
-            await websocket.send_text(json.dumps({
-                "type": "live_status",
-                "data": status_data
-            }, default=str))
-        except Exception as e:
-            logger.error(f"Failed to get initial status for all printers: {e}")
-            await websocket.send_text(json.dumps({
-                "type": "error",
-                "message": f"Failed to get printers status: {str(e)}"
-            }))
-        
-        # Stream live updates for all printers
-        while True:
-            try:
-                # Wait for 3 seconds between updates (slightly longer for all printers)
-                await asyncio.sleep(3)
-                
-                # Get live status for all printers
-                all_status_data = await printer_manager.get_all_live_status()
-                live_statuses = [convert_to_response_models(status) for status in all_status_data]
-
-                # Send update in format expected by frontend
-                status_data = [status.model_dump() if hasattr(status, 'model_dump') else status for status in live_statuses]
-                await websocket.send_text(json.dumps({
-                    "type": "live_status",
-                    "data": status_data
-                }, default=str))
-                
-            except Exception as e:
-                logger.error(f"Error in all printers live status stream: {e}")
-                await websocket.send_text(json.dumps({
-                    "type": "error",
-                    "message": f"Stream error: {str(e)}"
-                }))
-                break
-                
+        if delta_mode:
+            await manager.connect_all_printers_delta(websocket)
+            await _handle_delta_client_messages(websocket)
+        else:
+            # Build initial status for all printers
+            initial_message = await build_all_printers_message()
+            await manager.connect_all_printers(websocket, initial_message)
+            await _wait_for_disconnect(websocket)
     except WebSocketDisconnect:
         logger.info("Client disconnected from all printers status stream")
     except Exception as e:
@@ -266,6 +482,7 @@ async def websocket_all_printers_status(websocket: WebSocket):
     finally:
         manager.disconnect_all_printers(websocket)
 
+
 @router.get("/live-status/all")
 async def get_all_printers_live_status():
     """
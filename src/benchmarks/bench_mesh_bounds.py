@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+3MF Mesh Bounds Benchmark
+
+Compares the previous bounds calculation (ET.parse of the whole model, a
+Python list per vertex, then NumPy) with ThreeMFProcessor._get_object_bounds
+on a generated model. Reports time and peak Python memory (tracemalloc).
+
+The generated model has one mesh object of --vertices vertices, referenced
+by an assembly object through --components components: half translated
+only, half rotated about Z, as slicers write multi-part assemblies.
+
+Usage:
+    python src/benchmarks/bench_mesh_bounds.py [--vertices 1000000] [--components 8] [--runs 3]
+"""
+
+import argparse
+import io
+import math
+import statistics
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.threemf_processor import ThreeMFProcessor
+
+NS = {'3mf': 'http://schemas.microsoft.com/3dmanufacturing/core/2015/02'}
+
+
+def legacy_bounds(processor: ThreeMFProcessor, model_bytes: bytes):
+    """The bounds calculation _get_object_bounds used before streaming"""
+    root = ET.parse(io.BytesIO(model_bytes)).getroot()
+    item = root.find('.//3mf:build', NS).find('3mf:item', NS)
+    return legacy_recursive(processor, root, item.get('objectid'), item.get('transform'))
+
+
+def legacy_recursive(processor, root, object_id, transform):
+    obj = root.find(f'.//3mf:object[@id="{object_id}"]', NS)
+    transform_matrix = processor._parse_transform(transform) if transform else np.eye(4)
+    all_bounds = []
+
+    mesh = obj.find('3mf:mesh', NS)
+    if mesh is not None:
+        vertices = []
+        for vertex in mesh.find('3mf:vertices', NS).findall('3mf:vertex', NS):
+            vertices.append([float(vertex.get('x', 0)), float(vertex.get('y', 0)), float(vertex.get('z', 0)), 1])
+        transformed = np.dot(np.array(vertices), transform_matrix.T)
+        all_bounds.append((transformed[:, :3].min(axis=0), transformed[:, :3].max(axis=0)))
+
+    components = obj.find('3mf:components', NS)
+    if components is not None:
+        for component in components.findall('3mf:component', NS):
+            comp_matrix = processor._parse_transform(component.get('transform')) if component.get('transform') else np.eye(4)
+            combined = processor._matrix_to_transform(np.dot(transform_matrix, comp_matrix))
+            all_bounds.append(legacy_recursive(processor, root, component.get('objectid'), combined))
+
+    return np.min([b[0] for b in all_bounds], axis=0), np.max([b[1] for b in all_bounds], axis=0)
+
+
+def generate_model(vertex_count: int, component_count: int) -> bytes:
+    """Random points on a 20mm sphere, with faces, inside an assembly"""
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(vertex_count, 3))
+    points = points / np.linalg.norm(points, axis=1, keepdims=True) * 20 + 20
+
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<model unit="millimeter" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n'
+             ' <resources>\n  <object id="1" type="model">\n   <mesh>\n    <vertices>\n']
+    parts.extend(f'     <vertex x="{x:.6f}" y="{y:.6f}" z="{z:.6f}"/>\n' for x, y, z in points)
+    parts.append('    </vertices>\n    <triangles>\n')
+    parts.extend(f'     <triangle v1="{i}" v2="{(i + 1) % vertex_count}" v3="{(i + 2) % vertex_count}"/>\n'
+                 for i in range(0, vertex_count * 2, 2))
+    parts.append('    </triangles>\n   </mesh>\n  </object>\n  <object id="2" type="model">\n   <components>\n')
+    for i in range(component_count):
+        angle = math.radians(15 * i) if i % 2 else 0.0
+        c, s = math.cos(angle), math.sin(angle)
+        parts.append(f'    <component objectid="1" transform="{c} {-s} 0 {s} {c} 0 0 0 1 {i * 45} 0 0"/>\n')
+    parts.append('   </components>\n  </object>\n </resources>\n <build>\n'
+                 '  <item objectid="2" transform="1 0 0 0 1 0 0 0 1 128 128 0" printable="1"/>\n </build>\n</model>\n')
+    return ''.join(parts).encode()
+
+
+def measure(label: str, loader, runs: int):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = loader()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    loader()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<28} best {min(timings):7.2f} s   median {statistics.median(timings):7.2f} s   peak {peak / 1024 / 1024:7.1f} MiB")
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark 3MF mesh bounds calculation")
+    parser.add_argument("--vertices", type=int, default=1000000, help="Vertices in the mesh (default: 1000000)")
+    parser.add_argument("--components", type=int, default=8, help="Components referencing the mesh (default: 8)")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per implementation (default: 3)")
+    args = parser.parse_args()
+
+    processor = ThreeMFProcessor()
+    model_bytes = generate_model(args.vertices, args.components)
+    print(f"Model: {len(model_bytes) / 1024 / 1024:.1f} MiB, {args.vertices} vertices, {args.components} components")
+    print()
+
+    (legacy_min, legacy_max), legacy_time = measure("ET.parse + findall (old)", lambda: legacy_bounds(processor, model_bytes), args.runs)
+    bounds, stream_time = measure("iterparse + NumPy buffer", lambda: processor._get_object_bounds(io.BytesIO(model_bytes)), args.runs)
+
+    streamed = np.array([[bounds['min_x'], bounds['min_y'], bounds['min_z']], [bounds['max_x'], bounds['max_y'], bounds['max_z']]])
+    assert np.allclose(streamed, [legacy_min, legacy_max], atol=1e-6), f"Bounds differ: {streamed} vs {legacy_min}, {legacy_max}"
+    print()
+    print(f"Bounds match, {legacy_time / stream_time:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
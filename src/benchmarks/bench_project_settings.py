@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+project_settings.config Extraction Benchmark
+
+Compares json.load of the whole Metadata/project_settings.config with the
+streaming extract_json_keys used by _parse_project_settings, over a corpus
+of 3MF files. Reports time and peak Python memory (tracemalloc) per file.
+
+Usage:
+    python src/benchmarks/bench_project_settings.py [corpus_dir ...] [--runs 20] [--synthetic-mb 8]
+
+With no corpus directories the stored print files are used. --synthetic-mb
+adds a generated project of roughly that size, modelled on a large
+multi-plate project (per-plate arrays make up most of the file).
+
+_parse_project_settings only streams files above
+PROJECT_SETTINGS_STREAM_THRESHOLD; use this to check where the crossover
+sits for your slicer output.
+"""
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.metadata_parser import extract_json_keys, PROJECT_SETTINGS_KEYS, PROJECT_SETTINGS_STREAM_THRESHOLD
+
+DEFAULT_CORPUS = Path(__file__).parent.parent.parent / "files" / "print_files"
+SETTINGS_MEMBER = "Metadata/project_settings.config"
+
+
+def full_load(raw: bytes):
+    settings = json.load(io.BytesIO(raw))
+    return {key: settings[key] for key in PROJECT_SETTINGS_KEYS if key in settings}
+
+
+def streaming_load(raw: bytes):
+    return extract_json_keys(io.BytesIO(raw), PROJECT_SETTINGS_KEYS)
+
+
+def synthetic_settings(template: dict, target_mb: float) -> bytes:
+    """Inflate a real settings dict with per-plate style arrays, keeping keys sorted like the slicers do"""
+    settings = dict(template)
+    plate = 0
+    while len(json.dumps(settings)) < target_mb * 1024 * 1024:
+        plate += 1
+        settings[f"wipe_tower_x_plate_{plate:03d}"] = [f"{i * 0.37:.3f}" for i in range(2000)]
+        settings[f"different_settings_to_system_{plate:03d}"] = ["layer_height;wall_loops;sparse_infill_density"] * 400
+    return json.dumps(dict(sorted(settings.items())), indent=4).encode()
+
+
+def measure(loader, raw: bytes, runs: int):
+    """Best and median wall time in ms, plus peak traced memory in KiB"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        loader(raw)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    loader(raw)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), statistics.median(timings), peak / 1024
+
+
+def collect_corpus(directories):
+    samples = []
+    for directory in directories:
+        for path in sorted(Path(directory).rglob("*.3mf")):
+            try:
+                with zipfile.ZipFile(path) as zip_ref:
+                    samples.append((path.name, zip_ref.read(SETTINGS_MEMBER)))
+            except (KeyError, zipfile.BadZipFile):
+                print(f"Skipping {path} (no {SETTINGS_MEMBER})")
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark project_settings.config key extraction")
+    parser.add_argument("corpus", nargs="*", help=f"Directories of 3MF files (default: {DEFAULT_CORPUS})")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per file (default: 20)")
+    parser.add_argument("--synthetic-mb", type=float, default=0, help="Also test a generated project of this size")
+    args = parser.parse_args()
+
+    samples = collect_corpus(args.corpus or [DEFAULT_CORPUS])
+    if args.synthetic_mb and samples:
+        samples.append((f"synthetic-{args.synthetic_mb:g}MB", synthetic_settings(json.loads(samples[0][1]), args.synthetic_mb)))
+    if not samples:
+        print("No 3MF files with project_settings.config found")
+        return 1
+
+    print(f"Streaming threshold: {PROJECT_SETTINGS_STREAM_THRESHOLD // 1024} KiB")
+    print(f"{'file':<44} {'size KiB':>9}  {'json.load ms':>12} {'peak KiB':>9}  {'stream ms':>10} {'peak KiB':>9}  {'speedup':>7}")
+    for name, raw in samples:
+        assert full_load(raw) == streaming_load(raw), f"{name}: extracted values differ"
+        full_best, _, full_peak = measure(full_load, raw, args.runs)
+        stream_best, _, stream_peak = measure(streaming_load, raw, args.runs)
+        print(f"{name[:44]:<44} {len(raw) / 1024:9.1f}  {full_best:12.2f} {full_peak:9.1f}  "
+              f"{stream_best:10.2f} {stream_peak:9.1f}  {full_best / stream_best:6.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
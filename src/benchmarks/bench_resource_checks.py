@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Resource Throttle Check Benchmark
+
+Compares should_throttle_operation reading the sampler's cached snapshot
+with querying psutil on every call, as it did before the background
+sampler. Printer polling calls the check several times per printer per
+status poll, so the per-call cost is what matters.
+
+Usage:
+    python src/benchmarks/bench_resource_checks.py [--calls 2000] [--runs 3]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.resource_monitor import ResourceMonitor
+
+
+def measure(label: str, monitor: ResourceMonitor, max_age: float, calls: int, runs: int) -> float:
+    """Time `calls` throttle checks with snapshots up to max_age old, print per-call statistics"""
+    original = monitor.get_system_resources
+    monitor.get_system_resources = lambda: original(max_age=max_age)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for i in range(calls):
+            monitor.should_throttle_operation("printer_poll" if i % 2 else "logging")
+        timings.append((time.perf_counter() - start) / calls * 1e6)
+    monitor.get_system_resources = original
+    print(f"{label:<28} best {min(timings):8.2f} us/call   median {statistics.median(timings):8.2f} us/call")
+    return min(timings)
+
+
+def main(calls: int, runs: int):
+    monitor = ResourceMonitor()
+    monitor._configured = True  # Defaults; no config file needed
+    monitor.sample()
+
+    print(f"{calls} throttle checks, best of {runs} runs")
+    print()
+    uncached = measure("psutil on every call", monitor, -1.0, calls, runs)
+    cached = measure("cached snapshot", monitor, float("inf"), calls, runs)
+    print()
+    print(f"Cached checks: {uncached / cached:.0f}x faster")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark resource throttle checks")
+    parser.add_argument("--calls", type=int, default=2000, help="Checks per run")
+    parser.add_argument("--runs", type=int, default=3, help="Number of runs")
+    args = parser.parse_args()
+    main(args.calls, args.runs)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Row Hydration Benchmark
+
+Compares the previous list-query loader (SELECT * then an instrumented
+setattr per column per row) with DatabaseService._load_models, both for
+full rows and for a column projection, on a throwaway database.
+
+Usage:
+    python src/benchmarks/bench_row_hydration.py [--rows 10000] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import text
+
+from src.models.database import Base, Printer
+from src.services.database_service import DatabaseService
+
+TENANT_ID = "00000000-0000-0000-0000-000000000001"
+
+
+async def legacy_load(db: DatabaseService, tenant_id: str):
+    """The loader get_printers_by_tenant used before bulk hydration"""
+    async with db.get_session() as session:
+        result = await session.execute(
+            text("SELECT * FROM printers WHERE tenant_id = :tenant_id AND is_active = 1 ORDER BY sort_order"),
+            {"tenant_id": tenant_id}
+        )
+        rows = result.fetchall()
+
+        printers = []
+        for row in rows:
+            printer = Printer()
+            for column in row._fields:
+                setattr(printer, column, getattr(row, column))
+            printers.append(printer)
+
+        return printers
+
+
+async def seed(db: DatabaseService, rows: int):
+    """Create the schema and insert printer rows for one tenant"""
+    async with db.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            text("""
+                INSERT INTO printers (id, tenant_id, name, model, status, is_active, sort_order, printer_id,
+                                      ip_address, serial_number, access_code, created_at, updated_at)
+                VALUES (:id, :tenant_id, :name, 'P1S', 'idle', 1, :sort_order, :printer_id,
+                        '10.0.0.1', :serial, '12345678', '2025-01-01 00:00:00', '2025-01-01 00:00:00')
+            """),
+            [
+                {
+                    "id": str(uuid.uuid4()),
+                    "tenant_id": TENANT_ID,
+                    "name": f"Printer {i}",
+                    "sort_order": i,
+                    "printer_id": i + 1,
+                    "serial": f"SN{i:08d}"
+                }
+                for i in range(rows)
+            ]
+        )
+
+
+async def measure(label: str, loader, runs: int, expected_rows: int):
+    """Run a loader several times and print timing statistics"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = await loader()
+        timings.append((time.perf_counter() - start) * 1000)
+        assert len(result) == expected_rows, f"{label}: expected {expected_rows} rows, got {len(result)}"
+
+    print(f"{label:<32} best {min(timings):8.1f} ms   median {statistics.median(timings):8.1f} ms")
+    return min(timings)
+
+
+async def run_benchmark(rows: int, runs: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db = DatabaseService(database_path=str(Path(temp_dir) / "bench.db"))
+        try:
+            await seed(db, rows)
+            print(f"Loading {rows} printers, best of {runs} runs")
+            print()
+
+            legacy = await measure("SELECT * + setattr (old)", lambda: legacy_load(db, TENANT_ID), runs, rows)
+            bulk = await measure("bulk hydration, all columns", lambda: db.get_printers_by_tenant(TENANT_ID), runs, rows)
+            projected = await measure(
+                "bulk hydration, 3 columns",
+                lambda: db.get_printers_by_tenant(TENANT_ID, fields=["name", "status", "printer_id"]),
+                runs, rows
+            )
+
+            print()
+            print(f"All columns: {legacy / bulk:.1f}x faster, projection: {legacy / projected:.1f}x faster")
+        finally:
+            await db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseService list-query row hydration")
+    parser.add_argument("--rows", type=int, default=10000, help="Rows to load (default: 10000)")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per loader (default: 5)")
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.rows, args.runs))
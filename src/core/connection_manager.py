@@ -189,7 +189,27 @@ class ConnectionManager:
             return False, f"Backoff timer active, next attempt in {wait_time:.1f} seconds"
 
         return True, "Connection attempt allowed"
-    
+
+    def get_global_wait(self, pending: int = 0, user_action: bool = False) -> float:
+        """Seconds until the global rate limit allows another attempt
+
+        Args:
+            pending: Attempts already started but not yet recorded
+            user_action: Use the higher user-action limit
+        """
+        current_time = time.time()
+        self.global_attempts = [t for t in self.global_attempts
+                               if current_time - t < self.global_attempt_window]
+
+        max_attempts = self.max_global_attempts * 2 if user_action else self.max_global_attempts
+        excess = len(self.global_attempts) + pending - max_attempts + 1
+        if excess <= 0:
+            return 0.0
+        if excess > len(self.global_attempts):
+            # Budget is held by attempts still in flight; check again shortly
+            return 1.0
+        return max(0.1, self.global_attempts[excess - 1] + self.global_attempt_window - current_time)
+
     def record_connection_attempt(self, printer_id: str, success: bool, error: str = ""):
         """Record connection attempt result"""
         current_time = time.time()
@@ -0,0 +1,221 @@
+"""
+Connection Status Writer
+Write-behind queue for printers.is_connected. MQTT callbacks submit changes
+from paho threads without touching the disk; a single task on the event loop
+coalesces them per printer and writes each batch in one transaction.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from ..utils.sqlite_profile import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PendingStatus:
+    """Latest unwritten connection state for one printer"""
+    printer_id: str
+    is_connected: bool
+    due_at: float  # monotonic time the change may be written
+
+class ConnectionStatusWriter:
+    """Coalescing, serialized writer for printer connection status
+
+    submit() is safe to call from any thread. Changes for the same printer
+    overwrite each other until written, so a flapping connection costs one
+    UPDATE per batch rather than one per callback. User actions (explicit
+    connect/disconnect events) are written after batch_window; background
+    observations must hold for settle_window before they are written.
+    """
+
+    def __init__(self, batch_window: float = 0.25, settle_window: float = 5.0):
+        self.batch_window = batch_window
+        self.settle_window = settle_window
+        self.database_path: Optional[str] = None
+        self.is_running = False
+        self.writer_task: Optional[asyncio.Task] = None
+        self.last_written: Dict[str, bool] = {}  # printer_id -> state last committed
+        self.batches_written = 0
+        self.updates_written = 0
+        self.updates_coalesced = 0
+        self._pending: Dict[str, PendingStatus] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def submit(self, printer_id: str, is_connected: bool, immediate: bool = False) -> None:
+        """Queue a connection state change for a printer
+
+        Args:
+            printer_id: Printer identifier (numeric printer_id from config)
+            is_connected: New connection state
+            immediate: Write after the short batch window instead of waiting
+                for the state to settle
+        """
+        now = time.monotonic()
+        with self._lock:
+            existing = self._pending.get(printer_id)
+
+            if not immediate and existing is None and self.last_written.get(printer_id) == is_connected:
+                return  # Already in the database
+
+            if existing is not None:
+                self.updates_coalesced += 1
+                if immediate:
+                    due_at = min(existing.due_at, now + self.batch_window)
+                elif existing.is_connected != is_connected:
+                    due_at = now + self.settle_window  # state changed again, restart settling
+                else:
+                    due_at = existing.due_at
+            else:
+                due_at = now + (self.batch_window if immediate else self.settle_window)
+
+            self._pending[printer_id] = PendingStatus(printer_id, is_connected, due_at)
+
+        self._wake()
+
+    def _wake(self) -> None:
+        """Wake the writer task from any thread"""
+        if self._loop and self._wakeup:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # Loop already closed; stop() flushes what is left
+
+    async def start(self, database_path: str):
+        """Start the writer task"""
+        if self.is_running:
+            return
+
+        self.database_path = database_path
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.is_running = True
+        self.writer_task = asyncio.create_task(self._writer_loop())
+        logger.info(f"Connection status writer started for {database_path}")
+
+    async def stop(self):
+        """Stop the writer and flush every pending change regardless of its window"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        if self.writer_task:
+            self._wakeup.set()
+            try:
+                await self.writer_task
+            except asyncio.CancelledError:
+                pass
+
+        await self.flush(force=True)
+        self._loop = None
+        self._wakeup = None
+        logger.info("Connection status writer stopped")
+
+    async def _writer_loop(self):
+        """Wait for the earliest due change, then write everything that is due"""
+        while self.is_running:
+            try:
+                with self._lock:
+                    next_due = min((p.due_at for p in self._pending.values()), default=None)
+
+                timeout = None if next_due is None else max(0.0, next_due - time.monotonic())
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in connection status writer loop: {e}")
+                await asyncio.sleep(self.settle_window)
+
+    async def flush(self, force: bool = False) -> int:
+        """Write due (or, with force, all) pending changes in one transaction
+
+        Returns:
+            Number of printers written
+        """
+        now = time.monotonic()
+        with self._lock:
+            batch = [p for p in self._pending.values() if force or p.due_at <= now]
+            for pending in batch:
+                del self._pending[pending.printer_id]
+
+        if not batch:
+            return 0
+
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+        except Exception as e:
+            logger.error(f"Failed to write connection status for {len(batch)} printers: {e}")
+            self._requeue(batch)
+            return 0
+
+        for pending in batch:
+            self.last_written[pending.printer_id] = pending.is_connected
+            logger.debug(f"Updated DB connection status for printer {pending.printer_id}: connected={pending.is_connected}")
+
+        self.batches_written += 1
+        self.updates_written += len(batch)
+        return len(batch)
+
+    def _write_batch(self, batch: List[PendingStatus]) -> None:
+        """Apply a batch in a single transaction (runs in a worker thread)"""
+        updated_at = datetime.utcnow().isoformat()
+        rows = []
+        for pending in batch:
+            try:
+                rows.append((1 if pending.is_connected else 0, updated_at, int(pending.printer_id)))
+            except ValueError:
+                logger.warning(f"Skipping connection status for non-numeric printer id {pending.printer_id}")
+
+        if not rows:
+            return
+
+        conn = connect_sqlite(self.database_path)
+        try:
+            with conn:
+                # When disconnected, set status to 'offline' to keep UI in sync
+                conn.executemany("""
+                    UPDATE printers
+                    SET is_connected = ?1,
+                        status = CASE WHEN ?1 = 1 THEN status ELSE 'offline' END,
+                        updated_at = ?2
+                    WHERE printer_id = ?3
+                """, rows)
+        finally:
+            conn.close()
+
+    def _requeue(self, batch: List[PendingStatus]) -> None:
+        """Put failed changes back unless a newer change has arrived meanwhile"""
+        retry_at = time.monotonic() + self.settle_window
+        with self._lock:
+            for pending in batch:
+                if pending.printer_id not in self._pending:
+                    pending.due_at = retry_at
+                    self._pending[pending.printer_id] = pending
+
+    def forget(self, printer_id: str) -> None:
+        """Drop the remembered state for a printer removed from the manager"""
+        self.last_written.pop(printer_id, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get writer statistics for diagnostics"""
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "batches_written": self.batches_written,
+            "updates_written": self.updates_written,
+            "updates_coalesced": self.updates_coalesced
+        }
@@ -3,13 +3,24 @@ import os
 import tempfile
 import logging
 import shutil
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from pathlib import Path
 import json
 import zipfile
 
+from .slice_cache import slice_cache
+from .slicing_executor import slicing_executor, SliceTask
+from ..services.job_queue_service import JobPriority
+from ..utils.file_hash import hash_file
+
 logger = logging.getLogger(__name__)
 
+# Longest stdout/stderr line read from the slicer (progress lines can be long)
+SLICER_OUTPUT_LINE_LIMIT = 1024 * 1024
+
+# Slicer build identifiers, per command, for the slice cache key
+_SLICER_VERSIONS: Dict[tuple, Optional[str]] = {}
+
 class OrcaSlicerClient:
     """Client for interacting with OrcaSlicer CLI using printer profiles for Bambu Studio compatibility"""
     
@@ -123,7 +134,8 @@ class OrcaSlicerClient:
         input_path: str, 
         output_filename: Optional[str] = None,
         timeout: Optional[int] = None,
-        printer_id: Optional[str] = None
+        printer_id: Optional[str] = None,
+        priority: JobPriority = JobPriority.NORMAL
     ) -> str:
         """
         Slice a 3MF file using OrcaSlicer CLI with appropriate printer profile
@@ -131,8 +143,10 @@ class OrcaSlicerClient:
         Args:
             input_path: Path to input 3MF file
             output_filename: Optional custom output filename
-            timeout: Timeout in seconds (default: 300s)
+            timeout: Timeout in seconds (default: 300s), counted from when the
+                slice gets an executor slot rather than from when it was queued
             printer_id: Printer ID for profile selection (e.g., 'a1_main', 'x1c_main')
+            priority: Position in the slicing queue relative to other requests
             
         Returns:
             Path to the sliced .gcode.3mf file
@@ -196,23 +210,24 @@ class OrcaSlicerClient:
             
             # Build slicing command with profile
             command = self._build_slice_command_with_profile(input_path, output_path, profile_path)
-            
-            # Execute with timeout
             timeout_seconds = timeout or self.default_timeout
-            await self._execute_with_timeout(command, timeout_seconds, input_path)
             
-            # Verify output file was created
-            if not os.path.exists(output_path):
-                raise RuntimeError("OrcaSlicer completed but output file was not created")
-                
-            # Verify output file is not empty
-            if os.path.getsize(output_path) == 0:
-                raise RuntimeError("OrcaSlicer created empty output file")
+            cache_key = await self._get_slice_cache_key(input_path, profile_path, nozzle_size)
+            if cache_key is None:
+                await self._run_slice(command, timeout_seconds, input_path, output_path, priority)
+            else:
+                # Identical requests wait here and then hit the entry the first one stored
+                async with slice_cache.hold(cache_key):
+                    if await slice_cache.fetch(cache_key, output_path):
+                        logger.info(f"Slice cache hit for {os.path.basename(input_path)}, skipped OrcaSlicer")
+                        return output_path
+                    await self._run_slice(command, timeout_seconds, input_path, output_path, priority)
+                    await slice_cache.store(cache_key, output_path)
                 
             logger.info(f"Successfully sliced 3MF file: {output_path}")
             return output_path
             
-        except Exception as e:
+        except (Exception, asyncio.CancelledError):
             # Clean up partial output file if it exists
             if os.path.exists(output_path):
                 try:
@@ -221,6 +236,78 @@ class OrcaSlicerClient:
                     pass
             raise
             
+    async def _run_slice(self, command: List[str], timeout: int, input_path: str, output_path: str,
+                         priority: JobPriority = JobPriority.NORMAL):
+        """Run OrcaSlicer and check that it produced a non-empty output file"""
+        await self._execute_with_timeout(command, timeout, input_path, priority)
+        
+        # Verify output file was created
+        if not os.path.exists(output_path):
+            raise RuntimeError("OrcaSlicer completed but output file was not created")
+            
+        # Verify output file is not empty
+        if os.path.getsize(output_path) == 0:
+            raise RuntimeError("OrcaSlicer created empty output file")
+    
+    async def _get_slice_cache_key(self, input_path: str, profile_path: str, nozzle_size: float) -> Optional[str]:
+        """
+        Slice cache key for this input, profile, nozzle and slicer build
+        
+        Returns None (slice without caching) when the slicer build cannot be
+        identified, since an upgrade would otherwise serve stale output.
+        """
+        slicer_version = await self.get_slicer_version()
+        if not slicer_version:
+            return None
+        
+        # Paths are per request; only the flags affect the output
+        slicer_args = self._build_slice_command_with_profile("", "", profile_path)
+        input_hash = await asyncio.to_thread(hash_file, input_path)
+        return slice_cache.make_key(input_hash, profile_path, nozzle_size, slicer_version, slicer_args)
+    
+    async def get_slicer_version(self) -> Optional[str]:
+        """
+        Identify the installed OrcaSlicer build (cached per command once found)
+        
+        Uses the Flatpak commit for Flatpak installs, otherwise the size and
+        mtime of the executable.
+        
+        Returns:
+            Build identifier, or None if it could not be determined
+        """
+        command_key = tuple(self.orcaslicer_command)
+        if command_key in _SLICER_VERSIONS:
+            return _SLICER_VERSIONS[command_key]
+        
+        version = None
+        try:
+            if len(self.orcaslicer_command) >= 3 and self.orcaslicer_command[1] == "run":
+                process = await asyncio.create_subprocess_exec(
+                    self.orcaslicer_command[0], "info", self.orcaslicer_command[2],
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                stdout, _ = await asyncio.wait_for(process.communicate(), timeout=10)
+                if process.returncode == 0:
+                    fields = {}
+                    for line in stdout.decode('utf-8', errors='ignore').splitlines():
+                        name, _, value = line.partition(':')
+                        fields[name.strip().lower()] = value.strip()
+                    version = fields.get('commit') or fields.get('version')
+            else:
+                executable = shutil.which(self.orcaslicer_command[0])
+                if executable:
+                    stat = os.stat(executable)
+                    version = f"{executable}:{stat.st_size}:{stat.st_mtime_ns}"
+        except Exception as e:
+            logger.warning(f"Could not determine OrcaSlicer version: {e}")
+        
+        if version:
+            _SLICER_VERSIONS[command_key] = version
+        else:
+            logger.warning("OrcaSlicer version unknown, slicing without the slice cache")
+        return version
+    
     def _build_slice_command_with_profile(self, input_path: str, output_path: str, profile_path: str) -> List[str]:
         """Build the OrcaSlicer command using built-in Bambu Lab profiles"""
         command = self.orcaslicer_command.copy()
@@ -291,58 +378,96 @@ class OrcaSlicerClient:
         self, 
         command: List[str], 
         timeout: int, 
-        input_file: str
+        input_file: str,
+        priority: JobPriority = JobPriority.NORMAL
     ) -> None:
-        """Execute OrcaSlicer command with timeout and proper error handling"""
-        logger.info(f"Executing: {' '.join(command)}")
-        logger.info(f"Timeout: {timeout}s for file: {os.path.basename(input_file)}")
+        """
+        Execute OrcaSlicer command with timeout and proper error handling
         
-        try:
-            # Start the process
-            process = await asyncio.create_subprocess_exec(
-                *command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-                # Removed cwd parameter - let Flatpak handle its own working directory
-            )
-            
-            # Wait for completion with timeout
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(), 
-                timeout=timeout
-            )
+        The command first waits for a slicing_executor slot; the timeout
+        covers only the slicer run itself.
+        """
+        async with slicing_executor.slot(os.path.basename(input_file), priority) as task:
+            command = slicing_executor.wrap_command(command)
+            logger.info(f"Executing: {' '.join(command)}")
+            logger.info(f"Timeout: {timeout}s for file: {os.path.basename(input_file)} "
+                        f"(waited {task.wait_seconds:.1f}s in slicing queue)")
             
-            # Check return code
-            if process.returncode != 0:
-                stdout_str = stdout.decode('utf-8', errors='ignore') if stdout else ""
-                stderr_str = stderr.decode('utf-8', errors='ignore') if stderr else ""
+            process = None
+            try:
+                # Start the process
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    limit=SLICER_OUTPUT_LINE_LIMIT
+                    # Removed cwd parameter - let Flatpak handle its own working directory
+                )
                 
-                logger.error(f"OrcaSlicer failed with return code {process.returncode}")
-                logger.error(f"STDOUT: {stdout_str}")
-                logger.error(f"STDERR: {stderr_str}")
+                # Wait for completion with timeout, following progress on stdout
+                stdout_str, stderr_str = await asyncio.wait_for(
+                    self._collect_output(process, task),
+                    timeout=timeout
+                )
                 
-                # Extract meaningful error from output
-                error_msg = self._extract_error_message(stdout_str, stderr_str)
-                raise RuntimeError(f"OrcaSlicer failed: {error_msg}")
+                # Check return code
+                if process.returncode != 0:
+                    logger.error(f"OrcaSlicer failed with return code {process.returncode}")
+                    logger.error(f"STDOUT: {stdout_str}")
+                    logger.error(f"STDERR: {stderr_str}")
+                    
+                    # Extract meaningful error from output
+                    error_msg = self._extract_error_message(stdout_str, stderr_str)
+                    raise RuntimeError(f"OrcaSlicer failed: {error_msg}")
+                    
+                # Log successful completion
+                if stdout_str:
+                    logger.debug(f"OrcaSlicer output: {stdout_str}")
+                    
+            except asyncio.TimeoutError:
+                logger.error(f"OrcaSlicer timed out after {timeout}s for {input_file}")
+                await self._kill(process)
+                raise asyncio.TimeoutError(f"Slicing timed out after {timeout} seconds")
                 
-            # Log successful completion
-            stdout_str = stdout.decode('utf-8', errors='ignore') if stdout else ""
-            if stdout_str:
-                logger.debug(f"OrcaSlicer output: {stdout_str}")
+            except asyncio.CancelledError:
+                logger.info(f"Slicing cancelled for {input_file}")
+                await self._kill(process)
+                raise
                 
-        except asyncio.TimeoutError:
-            logger.error(f"OrcaSlicer timed out after {timeout}s for {input_file}")
-            # Try to kill the process
-            try:
-                process.kill()
-                await process.wait()
-            except:
-                pass
-            raise asyncio.TimeoutError(f"Slicing timed out after {timeout} seconds")
-            
-        except Exception as e:
-            logger.error(f"Error executing OrcaSlicer: {e}")
-            raise RuntimeError(f"Failed to execute OrcaSlicer: {e}")
+            except RuntimeError:
+                raise
+                
+            except Exception as e:
+                logger.error(f"Error executing OrcaSlicer: {e}")
+                await self._kill(process)
+                raise RuntimeError(f"Failed to execute OrcaSlicer: {e}")
+    
+    async def _collect_output(self, process: asyncio.subprocess.Process, task: SliceTask) -> Tuple[str, str]:
+        """Read slicer stdout line by line for progress, plus stderr, until it exits"""
+        stdout_lines: List[str] = []
+        
+        async def read_stdout():
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                text = line.decode('utf-8', errors='ignore')
+                stdout_lines.append(text)
+                slicing_executor.update_progress(task, text)
+        
+        _, stderr = await asyncio.gather(read_stdout(), process.stderr.read())
+        await process.wait()
+        return "".join(stdout_lines), stderr.decode('utf-8', errors='ignore') if stderr else ""
+    
+    async def _kill(self, process: Optional[asyncio.subprocess.Process]):
+        """Kill a slicer process that is still running"""
+        if process is None or process.returncode is not None:
+            return
+        try:
+            process.kill()
+            await process.wait()
+        except Exception:
+            pass
             
     def _extract_error_message(self, stdout: str, stderr: str) -> str:
         """Extract meaningful error message from OrcaSlicer output"""
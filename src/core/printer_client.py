@@ -1,7 +1,6 @@
 import asyncio
 import logging
 import os
-import sqlite3
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 import bambulabs_api as bl
@@ -11,7 +10,11 @@ from src.utils.validators import (
     validate_bambu_sequence_id, validate_bambu_file_path
 )
 from .connection_manager import connection_manager
+from .printer_state_store import PrinterStateStore, PrinterStateSnapshot
+from .printer_identity import PrinterIdentityIndex
+from .connection_status_writer import ConnectionStatusWriter
 from ..utils.resource_monitor import resource_monitor
+from ..utils.sqlite_profile import connect_sqlite
 
 logger = logging.getLogger(__name__)
 
@@ -58,101 +61,45 @@ class PrinterClientManager:
         self.max_reconnect_attempts: int = 5
         self.reconnect_tasks: Dict[str, asyncio.Task] = {}  # Track reconnection tasks
 
-        # Debouncing for database writes
-        self.last_db_write: Dict[str, float] = {}  # Track last DB write time per printer
-        self.pending_db_state: Dict[str, bool] = {}  # Track pending connection state per printer
-        self.state_change_time: Dict[str, float] = {}  # Track when state last changed per printer
+        # Coalescing write-behind queue for is_connected/status database writes
+        self.status_writer = ConnectionStatusWriter()
 
         # Track last layer for cleared status management
         self.last_layer_seen: Dict[str, int] = {}  # Track last layer number per printer
         self.printing_start_time: Dict[str, float] = {}  # Track when printer entered 'printing' status
 
+        # Push-based state cache fed by MQTT on_message (replaces per-poll mqtt_dump)
+        self.state_store = PrinterStateStore()
+        self.push_state_printers: set = set()  # Printers whose state is pushed via on_message_handler
+        self.live_status_cache: Dict[str, tuple] = {}  # printer_id -> (snapshot version, parsed status)
+        self.state_refresh_interval: int = 60  # seconds without reports before requesting a pushall
+
+        # Fleet snapshot gathering
+        self.fleet_status_concurrency: int = 8  # Max printers queried at once by get_all_live_status
+        self.fleet_status_deadline: float = 3.0  # seconds per printer before falling back to last-known status
+        self.last_known_status: Dict[str, Dict[str, Any]] = {}  # printer_id -> last healthy live status
+
+        # Numeric printer_id <-> printers.id UUID, invalidated by PrinterConnectionService
+        self.identity_index = PrinterIdentityIndex()
+
     def _update_connection_status_db(self, printer_id: str, is_connected: bool, user_action: bool = False) -> None:
-        """Debounced SQLite update for printer connection status
+        """Queue a printer connection status update for the write-behind writer
+
+        Safe to call from paho MQTT threads - nothing here touches the disk.
 
         Args:
             printer_id: Printer identifier
             is_connected: Connection status
-            user_action: True if this is a user-initiated action (skip debouncing)
+            user_action: True if this is a user-initiated action (skip waiting for the state to settle)
         """
-        import time
-        current_time = time.time()
-
-        # Store the pending state
-        self.pending_db_state[printer_id] = is_connected
-
-        # Update state change time if state actually changed
-        if printer_id not in self.pending_db_state or self.pending_db_state.get(printer_id) != is_connected:
-            self.state_change_time[printer_id] = current_time
-
-        # Determine if we should write to DB now
-        should_write = False
-
-        if user_action:
-            # User-initiated actions always write immediately
-            should_write = True
-            reason = "user action"
-        else:
-            last_write = self.last_db_write.get(printer_id, 0)
-            time_since_last_write = current_time - last_write
-
-            # Get when state last changed
-            state_change_time = self.state_change_time.get(printer_id, current_time)
-            time_since_state_change = current_time - state_change_time
-
-            # Write if:
-            # 1. State has been stable for 5+ seconds, OR
-            # 2. It's been 60+ seconds since last write (periodic sync)
-            if time_since_state_change >= 5:
-                should_write = True
-                reason = "state stable for 5+ seconds"
-            elif time_since_last_write >= 60:
-                should_write = True
-                reason = "periodic sync (60+ seconds)"
-
-        if not should_write:
-            logger.debug(f"Debouncing DB write for printer {printer_id} (state will be written when stable)")
-            return
-
-        try:
-            # Simple direct SQLite update - no complex dependencies
-            db_path = "/home/pi/PrintFarmSoftware/data/tenant.db"
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-
-            # Update is_connected field AND status based on printer_id (integer ID from config)
-            # When disconnected, set status to 'offline' to keep UI in sync
-            if is_connected:
-                cursor.execute("""
-                    UPDATE printers
-                    SET is_connected = ?,
-                        updated_at = ?
-                    WHERE printer_id = ?
-                """, (1, datetime.utcnow().isoformat(), int(printer_id)))
-            else:
-                cursor.execute("""
-                    UPDATE printers
-                    SET is_connected = ?,
-                        status = 'offline',
-                        updated_at = ?
-                    WHERE printer_id = ?
-                """, (0, datetime.utcnow().isoformat(), int(printer_id)))
-
-            conn.commit()
-            conn.close()
-
-            # Update last write time
-            self.last_db_write[printer_id] = current_time
-
-            logger.debug(f"Updated DB connection status for printer {printer_id}: connected={is_connected} (reason: {reason})")
-        except Exception as e:
-            # Don't fail the connection process if DB update fails
-            logger.error(f"Failed to update DB connection status for printer {printer_id}: {e}")
+        self.status_writer.submit(printer_id, is_connected, immediate=user_action)
 
     def add_printer(self, printer_id: str, config: Dict[str, Any]) -> None:
         """Add a printer configuration"""
         self.printer_configs[printer_id] = config
         self.sequence_ids[printer_id] = 1  # Initialize sequence ID
+        if config.get("database_id"):
+            self.identity_index.register(config.get("printer_id"), config["database_id"], config.get("tenant_id"))
         logger.info(f"Added printer configuration: {printer_id}")
     
     def remove_printer(self, printer_id: str) -> None:
@@ -170,6 +117,10 @@ class PrinterClientManager:
             
         if printer_id in self.sequence_ids:
             del self.sequence_ids[printer_id]
+
+        self._clear_printer_state(printer_id)
+        self.identity_index.invalidate(numeric_id=printer_id, uuid=printer_id)
+        self.status_writer.forget(printer_id)
             
         logger.info(f"Removed printer configuration: {printer_id}")
     
@@ -214,7 +165,7 @@ class PrinterClientManager:
             # LAYER 1: Pre-connection network check
             # Quick test if printer's MQTT port is reachable before creating client
             logger.info(f"Pre-check: Testing connectivity to {config['ip']}:8883...")
-            reachable, reason = _test_printer_connectivity(config["ip"], port=8883, timeout=3.0)
+            reachable, reason = await asyncio.to_thread(_test_printer_connectivity, config["ip"], port=8883, timeout=3.0)
 
             if not reachable:
                 error_msg = f"Printer unreachable: {reason}"
@@ -242,6 +193,7 @@ class PrinterClientManager:
                 logger.warning(f"[DISCONNECT EVENT] MQTT disconnected for printer {printer_id}: reason_code={reason_code}")
                 logger.info(f"[DISCONNECT EVENT] Updating database: is_connected=False, status='offline' for printer {printer_id}")
                 self._update_connection_status_db(printer_id, False, user_action=True)
+                self._clear_printer_state(printer_id)
 
                 # Remove client object to stop internal MQTT reconnection loop
                 if printer_id in self.clients:
@@ -296,6 +248,9 @@ class PrinterClientManager:
             if not callback_attached:
                 logger.warning(f"Could not attach MQTT callbacks for printer {printer_id} - attributes not found")
 
+            # Feed the state store from incoming MQTT reports
+            self._attach_state_listener(printer_id, client)
+
             # Connect to printer with timeout
             await asyncio.wait_for(
                 asyncio.to_thread(client.connect),
@@ -364,6 +319,8 @@ class PrinterClientManager:
         if printer_id in self.reconnect_tasks:
             self.reconnect_tasks[printer_id].cancel()
             del self.reconnect_tasks[printer_id]
+
+        self._clear_printer_state(printer_id)
             
         if printer_id in self.clients:
             try:
@@ -384,6 +341,58 @@ class PrinterClientManager:
         if printer_id not in self.clients:
             raise PrinterConnectionError(f"Printer {printer_id} is not connected")
         return self.clients[printer_id]
+
+    def _attach_state_listener(self, printer_id: str, client: bl.Printer) -> None:
+        """Publish every MQTT report for a printer into the state store
+
+        Runs in the paho network thread. bambulabs_api has already merged the
+        report into its internal dict by the time the handler fires, so the
+        merged dump is snapshotted without re-parsing the payload.
+        """
+        if not hasattr(client.mqtt_client, 'on_message_handler'):
+            logger.warning(f"Could not attach MQTT message handler for printer {printer_id} - falling back to polling")
+            self.push_state_printers.discard(printer_id)
+            return
+
+        def on_message_callback(mqtt_client_obj, client_obj, userdata, msg):
+            try:
+                self.state_store.update(printer_id, mqtt_client_obj.dump())
+            except Exception as e:
+                logger.debug(f"Failed to update state store for printer {printer_id}: {e}")
+
+        client.mqtt_client.on_message_handler = on_message_callback
+        self.push_state_printers.add(printer_id)
+        logger.debug(f"Attached state store listener for printer {printer_id}")
+
+    def _clear_printer_state(self, printer_id: str) -> None:
+        """Drop cached MQTT state so a stale report is never served after a disconnect"""
+        self.state_store.remove(printer_id)
+        self.live_status_cache.pop(printer_id, None)
+        self.last_known_status.pop(printer_id, None)
+        self.push_state_printers.discard(printer_id)
+
+    async def _get_state_snapshot(self, printer_id: str, client: bl.Printer) -> PrinterStateSnapshot:
+        """Get the latest state snapshot for a connected printer
+
+        Push-fed printers are served straight from the store. Printers without
+        a message handler (or that have not reported yet) are polled through
+        mqtt_dump once and the result is published to the store.
+        """
+        snapshot = self.state_store.get(printer_id)
+
+        if printer_id not in self.push_state_printers or snapshot is None:
+            mqtt_data = await asyncio.to_thread(client.mqtt_dump)
+            return self.state_store.update(printer_id, mqtt_data)
+
+        # P1-series printers only push deltas; ask for a full report now and then
+        # (bambulabs_api used to do this implicitly from its getters)
+        if snapshot.age >= self.state_refresh_interval and hasattr(client.mqtt_client, 'pushall'):
+            try:
+                await asyncio.to_thread(client.mqtt_client.pushall)
+            except Exception as e:
+                logger.debug(f"Failed to request pushall for printer {printer_id}: {e}")
+
+        return snapshot
     
     def _start_connection_monitor(self, printer_id: str) -> None:
         """Start monitoring connection for auto-reconnect"""
@@ -469,6 +478,7 @@ class PrinterClientManager:
                 except Exception:
                     pass
                 del self.clients[printer_id]
+            self._clear_printer_state(printer_id)
             
             # Attempt reconnection
             config = self.printer_configs[printer_id]
@@ -478,6 +488,7 @@ class PrinterClientManager:
                 config["serial"]
             )
             
+            self._attach_state_listener(printer_id, client)
             await asyncio.to_thread(client.connect)
             self.clients[printer_id] = client
             logger.info(f"Successfully reconnected to printer {printer_id}")
@@ -1098,7 +1109,7 @@ class PrinterClientManager:
         try:
             # Simple direct SQLite update - matching pattern used for is_connected
             db_path = "/home/pi/PrintFarmSoftware/data/tenant.db"
-            conn = sqlite3.connect(db_path)
+            conn = connect_sqlite(db_path)
             cursor = conn.cursor()
 
             # Update cleared field based on printer_id (integer ID from config)
@@ -1850,243 +1861,266 @@ class PrinterClientManager:
     
     # Live Status Methods for WebSocket Streaming
     async def get_live_print_status(self, printer_id: str) -> Dict[str, Any]:
-        """Get live print status including progress and temperatures"""
+        """Get live print status including progress and temperatures
+
+        Served from the push-fed state store; the parsed status is memoized per
+        snapshot version and shared between callers, so treat it as read-only.
+        """
         client = self.get_client(printer_id)
         try:
-            # Get MQTT dump for comprehensive status
-            mqtt_data = await asyncio.to_thread(client.mqtt_dump)
-            
-            # Initialize status structure
-            status = {
-                "printer_id": printer_id,
-                "status": "idle",
-                "progress": None,
-                "temperatures": {
-                    "nozzle": {"current": 0.0, "target": 0.0, "is_heating": False},
-                    "bed": {"current": 0.0, "target": 0.0, "is_heating": False},
-                    "chamber": {"current": 0.0, "target": 0.0, "is_heating": False}
-                },
-                "current_job": None,
-                "raw_gcode_state": None,  # Raw state from printer for job completion detection
-                "error_code": None  # Error code for failed prints
-            }
-            
-            if mqtt_data and isinstance(mqtt_data, dict):
-                # Parse print status and progress
-                print_data = mqtt_data.get('print', {})
-                if isinstance(print_data, dict):
-                    # Get print status
-                    gcode_state = print_data.get('gcode_state', 'idle')
-                    error_code = print_data.get('mc_print_error_code', 0)
-
-                    # Store raw state and error code for downstream services to use
-                    status["raw_gcode_state"] = gcode_state if isinstance(gcode_state, str) else None
-                    status["error_code"] = error_code
-
-                    if isinstance(gcode_state, str):
-                        # Map Bambu states to our enum values
-                        state_mapping = {
-                            'idle': 'idle',
-                            'printing': 'printing',
-                            'pause': 'paused',      # MQTT reports "PAUSE" which becomes "pause" when lowercased
-                            'paused': 'paused',
-                            'stopped': 'stopped',
-                            'finished': 'finished',
-                            'failed': 'failed',
-                            'prepare': 'printing',
-                            'running': 'printing'
-                        }
-                        mapped_status = state_mapping.get(gcode_state.lower(), 'idle')
-
-                        # Check if "failed" is due to cancellation (no error) or actual failure (has error code)
-                        if mapped_status == 'failed':
-                            # Check for error code - if it's 0 or missing, it was a user cancellation
-                            if error_code == 0 or error_code is None:
-                                # No error code means user canceled - show as idle
-                                mapped_status = 'idle'
-                            # Otherwise keep it as 'failed' for actual errors
-
-                        status["status"] = mapped_status
-                    
-                    # Get print progress
-                    mc_percent = print_data.get('mc_percent', 0)
-                    mc_remaining_time = print_data.get('mc_remaining_time', 0)
-                    current_layer = print_data.get('layer_num', 0)
-                    total_layers = print_data.get('total_layer_num', 0)
-                    
-                    # Calculate elapsed time (rough estimate)
-                    elapsed_time = 0
-                    if mc_percent > 0 and mc_remaining_time > 0:
-                        total_estimated = mc_remaining_time / (1 - (mc_percent / 100))
-                        elapsed_time = int(total_estimated - mc_remaining_time)
-                    
-                    if mc_percent > 0 or current_layer > 0:
-                        status["progress"] = {
-                            "percentage": float(mc_percent),
-                            "elapsed_time": elapsed_time,
-                            "remaining_time": int(mc_remaining_time * 60) if mc_remaining_time else None,
-                            "current_layer": int(current_layer) if current_layer else None,
-                            "total_layers": int(total_layers) if total_layers else None
-                        }
+            snapshot = await self._get_state_snapshot(printer_id, client)
 
-                    # Check if we need to mark printer as needing to be cleared
-                    # Set cleared=false when print reaches layer 1 AND has been printing for 45+ seconds
-                    if mapped_status == 'printing':
-                        import time
-                        current_time = time.time()
-
-                        # Track when printer entered 'printing' status
-                        if printer_id not in self.printing_start_time:
-                            self.printing_start_time[printer_id] = current_time
-                            logger.debug(f"Printer {printer_id} entered 'printing' status at {current_time}")
-
-                        # Calculate how long printer has been printing
-                        printing_duration = current_time - self.printing_start_time[printer_id]
-
-                        # Only set cleared=false if printing for 45+ seconds AND layer is 1
-                        if current_layer >= 1 and printing_duration >= 45:
-                            last_layer = self.last_layer_seen.get(printer_id, 0)
-                            # Only update if this is the first time we're seeing layer 1 or higher
-                            if last_layer == 0 and current_layer >= 1:
-                                try:
-                                    await self._set_printer_cleared_status(printer_id, False)
-                                    logger.info(f"Printer {printer_id} marked as needing to be cleared (layer {current_layer}, printing for {printing_duration:.1f}s)")
-                                    # Only update tracking if database update succeeded
-                                    self.last_layer_seen[printer_id] = current_layer
-                                except Exception as e:
-                                    logger.error(f"Failed to set cleared status for printer {printer_id}: {e}")
-                                    # Don't update last_layer_seen so we retry on next poll
-                            elif last_layer > 0:
-                                # Update layer tracking for subsequent layers
-                                self.last_layer_seen[printer_id] = current_layer
-                    elif mapped_status in ['idle', 'finished', 'failed', 'stopped']:
-                        # Reset layer tracking and printing start time when print is done or idle
-                        self.last_layer_seen[printer_id] = 0
-                        if printer_id in self.printing_start_time:
-                            del self.printing_start_time[printer_id]
-                            logger.debug(f"Printer {printer_id} exited 'printing' status, cleared timestamp")
-
-                    # Extract current job information from MQTT data
-                    try:
-                        current_filename = await self._get_current_filename(client)
-                        if current_filename and current_filename != "unknown":
-                            status["current_job"] = {
-                                "filename": current_filename,
-                                "print_id": print_data.get("task_id", ""),
-                                "subtask_name": print_data.get("subtask_name", ""),
-                                "project_id": print_data.get("project_id", "")
-                            }
-                    except Exception as e:
-                        logger.debug(f"Failed to get current job filename for printer {printer_id}: {e}")
-                
-                # Parse temperature data
-                temp_data = print_data
-                nozzle_temp = temp_data.get('nozzle_temper', 0)
-                nozzle_target = temp_data.get('nozzle_target_temper', 0)
-                bed_temp = temp_data.get('bed_temper', 0)
-                bed_target = temp_data.get('bed_target_temper', 0)
-                chamber_temp = temp_data.get('chamber_temper', 0)
-                
-                status["temperatures"] = {
-                    "nozzle": {
-                        "current": float(nozzle_temp),
-                        "target": float(nozzle_target),
-                        "is_heating": abs(float(nozzle_temp) - float(nozzle_target)) > 2.0 and float(nozzle_target) > 0
-                    },
-                    "bed": {
-                        "current": float(bed_temp),
-                        "target": float(bed_target),
-                        "is_heating": abs(float(bed_temp) - float(bed_target)) > 2.0 and float(bed_target) > 0
-                    },
-                    "chamber": {
-                        "current": float(chamber_temp),
-                        "target": 0.0,  # Chamber usually not actively heated
-                        "is_heating": False
-                    }
-                }
-                
-                # Add light status to live data
-                light_status = await self.get_light_status(printer_id)
-                status["light_on"] = light_status.get("is_on", False)
+            cached = self.live_status_cache.get(printer_id)
+            if cached and cached[0] == snapshot.version:
+                status = cached[1]
+            else:
+                status = self._parse_live_status(printer_id, snapshot)
+                self.live_status_cache[printer_id] = (snapshot.version, status)
 
-            # Add is_connected field based on whether printer is in active clients
-            status["is_connected"] = printer_id in self.clients
+            # Shielded: a caller's deadline (see _get_fleet_member_status) must not
+            # cancel the cleared=false write part way; it finishes in the background
+            await asyncio.shield(self._track_cleared_status(printer_id, status))
 
             return status
             
         except Exception as e:
             logger.error(f"Failed to get live status for printer {printer_id}: {e}")
             raise PrinterConnectionError(f"Failed to get live status: {e}")
+
+    def _parse_live_status(self, printer_id: str, snapshot: PrinterStateSnapshot) -> Dict[str, Any]:
+        """Build the live status dict from a state snapshot (no I/O, no side effects)"""
+        # Initialize status structure
+        status = {
+            "printer_id": printer_id,
+            "status": "idle",
+            "progress": None,
+            "temperatures": {
+                "nozzle": {"current": 0.0, "target": 0.0, "is_heating": False},
+                "bed": {"current": 0.0, "target": 0.0, "is_heating": False},
+                "chamber": {"current": 0.0, "target": 0.0, "is_heating": False}
+            },
+            "current_job": None,
+            "raw_gcode_state": None,  # Raw state from printer for job completion detection
+            "error_code": None  # Error code for failed prints
+        }
+
+        if snapshot.data:
+            # Parse print status and progress
+            print_data = snapshot.print_data
+
+            # Get print status
+            gcode_state = print_data.get('gcode_state', 'idle')
+            error_code = print_data.get('mc_print_error_code', 0)
+
+            # Store raw state and error code for downstream services to use
+            status["raw_gcode_state"] = gcode_state if isinstance(gcode_state, str) else None
+            status["error_code"] = error_code
+
+            if isinstance(gcode_state, str):
+                # Map Bambu states to our enum values
+                state_mapping = {
+                    'idle': 'idle',
+                    'printing': 'printing',
+                    'pause': 'paused',      # MQTT reports "PAUSE" which becomes "pause" when lowercased
+                    'paused': 'paused',
+                    'stopped': 'stopped',
+                    'finished': 'finished',
+                    'failed': 'failed',
+                    'prepare': 'printing',
+                    'running': 'printing'
+                }
+                mapped_status = state_mapping.get(gcode_state.lower(), 'idle')
+
+                # Check if "failed" is due to cancellation (no error) or actual failure (has error code)
+                if mapped_status == 'failed':
+                    # Check for error code - if it's 0 or missing, it was a user cancellation
+                    if error_code == 0 or error_code is None:
+                        # No error code means user canceled - show as idle
+                        mapped_status = 'idle'
+                    # Otherwise keep it as 'failed' for actual errors
+
+                status["status"] = mapped_status
+
+            # Get print progress
+            mc_percent = print_data.get('mc_percent', 0)
+            mc_remaining_time = print_data.get('mc_remaining_time', 0)
+            current_layer = print_data.get('layer_num', 0)
+            total_layers = print_data.get('total_layer_num', 0)
+
+            # Calculate elapsed time (rough estimate)
+            elapsed_time = 0
+            if mc_percent > 0 and mc_remaining_time > 0:
+                total_estimated = mc_remaining_time / (1 - (mc_percent / 100))
+                elapsed_time = int(total_estimated - mc_remaining_time)
+
+            if mc_percent > 0 or current_layer > 0:
+                status["progress"] = {
+                    "percentage": float(mc_percent),
+                    "elapsed_time": elapsed_time,
+                    "remaining_time": int(mc_remaining_time * 60) if mc_remaining_time else None,
+                    "current_layer": int(current_layer) if current_layer else None,
+                    "total_layers": int(total_layers) if total_layers else None
+                }
+
+            # Extract current job information from the report
+            current_filename = print_data.get('gcode_file') or "unknown"
+            if current_filename != "unknown":
+                status["current_job"] = {
+                    "filename": current_filename,
+                    "print_id": print_data.get("task_id", ""),
+                    "subtask_name": print_data.get("subtask_name", ""),
+                    "project_id": print_data.get("project_id", "")
+                }
+
+            # Parse temperature data
+            nozzle_temp = print_data.get('nozzle_temper', 0)
+            nozzle_target = print_data.get('nozzle_target_temper', 0)
+            bed_temp = print_data.get('bed_temper', 0)
+            bed_target = print_data.get('bed_target_temper', 0)
+            chamber_temp = print_data.get('chamber_temper', 0)
+
+            status["temperatures"] = {
+                "nozzle": {
+                    "current": float(nozzle_temp),
+                    "target": float(nozzle_target),
+                    "is_heating": abs(float(nozzle_temp) - float(nozzle_target)) > 2.0 and float(nozzle_target) > 0
+                },
+                "bed": {
+                    "current": float(bed_temp),
+                    "target": float(bed_target),
+                    "is_heating": abs(float(bed_temp) - float(bed_target)) > 2.0 and float(bed_target) > 0
+                },
+                "chamber": {
+                    "current": float(chamber_temp),
+                    "target": 0.0,  # Chamber usually not actively heated
+                    "is_heating": False
+                }
+            }
+
+            # Add light status to live data (same lookup as bambulabs_api get_light_state)
+            lights_report = print_data.get('lights_report') or []
+            led_mode = lights_report[0].get('mode', 'unknown') if isinstance(lights_report, list) and lights_report else 'unknown'
+            status["light_on"] = str(led_mode).lower() in ['on', '1', 'true', 'enabled']
+
+        # Add is_connected field based on whether printer is in active clients
+        status["is_connected"] = printer_id in self.clients
+
+        return status
+
+    async def _track_cleared_status(self, printer_id: str, status: Dict[str, Any]) -> None:
+        """Mark the printer as needing to be cleared once a print is underway"""
+        mapped_status = status.get("status")
+        progress = status.get("progress") or {}
+        current_layer = progress.get("current_layer") or 0
+
+        # Check if we need to mark printer as needing to be cleared
+        # Set cleared=false when print reaches layer 1 AND has been printing for 45+ seconds
+        if mapped_status == 'printing':
+            import time
+            current_time = time.time()
+
+            # Track when printer entered 'printing' status
+            if printer_id not in self.printing_start_time:
+                self.printing_start_time[printer_id] = current_time
+                logger.debug(f"Printer {printer_id} entered 'printing' status at {current_time}")
+
+            # Calculate how long printer has been printing
+            printing_duration = current_time - self.printing_start_time[printer_id]
+
+            # Only set cleared=false if printing for 45+ seconds AND layer is 1
+            if current_layer >= 1 and printing_duration >= 45:
+                last_layer = self.last_layer_seen.get(printer_id, 0)
+                # Only update if this is the first time we're seeing layer 1 or higher
+                if last_layer == 0 and current_layer >= 1:
+                    try:
+                        await self._set_printer_cleared_status(printer_id, False)
+                        logger.info(f"Printer {printer_id} marked as needing to be cleared (layer {current_layer}, printing for {printing_duration:.1f}s)")
+                        # Only update tracking if database update succeeded
+                        self.last_layer_seen[printer_id] = current_layer
+                    except Exception as e:
+                        logger.error(f"Failed to set cleared status for printer {printer_id}: {e}")
+                        # Don't update last_layer_seen so we retry on next poll
+                elif last_layer > 0:
+                    # Update layer tracking for subsequent layers
+                    self.last_layer_seen[printer_id] = current_layer
+        elif mapped_status in ['idle', 'finished', 'failed', 'stopped']:
+            # Reset layer tracking and printing start time when print is done or idle
+            self.last_layer_seen[printer_id] = 0
+            if printer_id in self.printing_start_time:
+                del self.printing_start_time[printer_id]
+                logger.debug(f"Printer {printer_id} exited 'printing' status, cleared timestamp")
     
     async def get_all_live_status(self) -> List[Dict[str, Any]]:
-        """Get live status for all configured printers (both connected and disconnected)"""
-        all_status = []
-        
-        # Get all configured printers
-        for printer_id, config in self.printer_configs.items():
-            try:
-                if printer_id in self.clients:
-                    # Connected printer - get full status
-                    status = await self.get_live_print_status(printer_id)
-                    
-                    # Filter out phantom connections with unrealistic temperature data
-                    temps = status.get("temperatures", {})
-                    nozzle_temp = temps.get("nozzle", {}).get("current", 0.0)
-                    bed_temp = temps.get("bed", {}).get("current", 0.0)
-                    
-                    # Only include connected printers with realistic temperature readings
-                    if nozzle_temp > 15.0 or bed_temp > 15.0:
-                        status["is_connected"] = True
-                        all_status.append(status)
-                        logger.debug(f"Including connected printer {printer_id} with temps: nozzle={nozzle_temp}°C, bed={bed_temp}°C")
-                    else:
-                        # Treat as disconnected if temps are unrealistic
-                        logger.debug(f"Treating printer {printer_id} as disconnected due to unrealistic temps: nozzle={nozzle_temp}°C, bed={bed_temp}°C")
-                        offline_status = {
-                            "printer_id": printer_id,
-                            "status": "offline",
-                            "is_connected": False,
-                            "progress": None,
-                            "temperatures": {
-                                "nozzle": {"current": 0.0, "target": 0.0, "is_heating": False},
-                                "bed": {"current": 0.0, "target": 0.0, "is_heating": False},
-                                "chamber": {"current": 0.0, "target": 0.0, "is_heating": False}
-                            }
-                        }
-                        all_status.append(offline_status)
-                else:
-                    # Disconnected printer - create offline status
-                    offline_status = {
-                        "printer_id": printer_id,
-                        "status": "offline",
-                        "is_connected": False,
-                        "progress": None,
-                        "temperatures": {
-                            "nozzle": {"current": 0.0, "target": 0.0, "is_heating": False},
-                            "bed": {"current": 0.0, "target": 0.0, "is_heating": False},
-                            "chamber": {"current": 0.0, "target": 0.0, "is_heating": False}
-                        }
-                    }
-                    all_status.append(offline_status)
-                    logger.debug(f"Including offline printer {printer_id}")
-                    
-            except Exception as e:
-                logger.warning(f"Error getting status for printer {printer_id}: {e}")
-                # Still include as offline on error
-                offline_status = {
-                    "printer_id": printer_id,
-                    "status": "offline",
-                    "is_connected": False,
-                    "progress": None,
-                    "temperatures": {
-                        "nozzle": {"current": 0.0, "target": 0.0, "is_heating": False},
-                        "bed": {"current": 0.0, "target": 0.0, "is_heating": False},
-                        "chamber": {"current": 0.0, "target": 0.0, "is_heating": False}
-                    }
-                }
-                all_status.append(offline_status)
-        
-        return all_status
+        """Get live status for all configured printers (both connected and disconnected)
+
+        Printers are queried concurrently (bounded by fleet_status_concurrency),
+        each with its own fleet_status_deadline. A printer that misses the
+        deadline is reported with its last-known status and "stale": True, so
+        one hung printer no longer delays the whole fleet snapshot.
+        """
+        semaphore = asyncio.Semaphore(self.fleet_status_concurrency)
+        printer_ids = list(self.printer_configs.keys())
+
+        return await asyncio.gather(
+            *(self._get_fleet_member_status(printer_id, semaphore) for printer_id in printer_ids)
+        )
+
+    async def _get_fleet_member_status(self, printer_id: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Get one printer's entry for the fleet snapshot"""
+        try:
+            if printer_id not in self.clients:
+                # Disconnected printer - create offline status
+                logger.debug(f"Including offline printer {printer_id}")
+                return self._offline_status(printer_id)
+
+            # Connected printer - get full status
+            async with semaphore:
+                status = await asyncio.wait_for(
+                    self.get_live_print_status(printer_id),
+                    timeout=self.fleet_status_deadline
+                )
+
+            # Filter out phantom connections with unrealistic temperature data
+            temps = status.get("temperatures", {})
+            nozzle_temp = temps.get("nozzle", {}).get("current", 0.0)
+            bed_temp = temps.get("bed", {}).get("current", 0.0)
+
+            # Only include connected printers with realistic temperature readings
+            if nozzle_temp > 15.0 or bed_temp > 15.0:
+                status["is_connected"] = True
+                self.last_known_status[printer_id] = status
+                logger.debug(f"Including connected printer {printer_id} with temps: nozzle={nozzle_temp}°C, bed={bed_temp}°C")
+                return status
+
+            # Treat as disconnected if temps are unrealistic
+            logger.debug(f"Treating printer {printer_id} as disconnected due to unrealistic temps: nozzle={nozzle_temp}°C, bed={bed_temp}°C")
+            return self._offline_status(printer_id)
+
+        except asyncio.TimeoutError:
+            last_status = self.last_known_status.get(printer_id)
+            logger.warning(f"Live status for printer {printer_id} missed the {self.fleet_status_deadline}s deadline, "
+                           f"{'using last-known status' if last_status else 'reporting offline'}")
+            stale_status = dict(last_status) if last_status else self._offline_status(printer_id)
+            stale_status["stale"] = True
+            return stale_status
+        except Exception as e:
+            logger.warning(f"Error getting status for printer {printer_id}: {e}")
+            # Still include as offline on error
+            return self._offline_status(printer_id)
+
+    def _offline_status(self, printer_id: str) -> Dict[str, Any]:
+        """Build the status entry for a printer that is not reporting"""
+        return {
+            "printer_id": printer_id,
+            "status": "offline",
+            "is_connected": False,
+            "progress": None,
+            "temperatures": {
+                "nozzle": {"current": 0.0, "target": 0.0, "is_heating": False},
+                "bed": {"current": 0.0, "target": 0.0, "is_heating": False},
+                "chamber": {"current": 0.0, "target": 0.0, "is_heating": False}
+            }
+        }
     
     # Light Control Methods
     async def toggle_light(self, printer_id: str) -> Dict[str, Any]:
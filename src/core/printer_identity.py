@@ -0,0 +1,81 @@
+"""
+Printer Identity Index
+Bidirectional in-memory map between the numeric printer_id used by the printer
+manager and MQTT paths and the printers.id UUID used by database foreign keys
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class PrinterIdentity:
+    numeric_id: str
+    uuid: str
+    tenant_id: Optional[str] = None
+
+class PrinterIdentityIndex:
+    """Cache of numeric printer_id <-> printers.id UUID
+
+    Filled as printers are added to the manager and by callers that had to
+    fall back to the database on a miss. Entries are invalidated when a
+    printer is added, updated or deleted, so a stale mapping never outlives
+    the change that made it stale.
+    """
+
+    def __init__(self):
+        self._by_numeric_id: Dict[str, PrinterIdentity] = {}
+        self._by_uuid: Dict[str, PrinterIdentity] = {}
+
+    def register(self, numeric_id, uuid: str, tenant_id: Optional[str] = None) -> Optional[PrinterIdentity]:
+        """Record a mapping, replacing any existing entry for either key"""
+        if numeric_id in (None, "") or not uuid:
+            return None
+
+        identity = PrinterIdentity(numeric_id=str(numeric_id), uuid=str(uuid), tenant_id=tenant_id)
+        self.invalidate(numeric_id=identity.numeric_id, uuid=identity.uuid)
+        self._by_numeric_id[identity.numeric_id] = identity
+        self._by_uuid[identity.uuid] = identity
+        return identity
+
+    def register_many(self, printers: Iterable) -> None:
+        """Record mappings from Printer models (anything with printer_id, id and tenant_id)"""
+        for printer in printers:
+            self.register(getattr(printer, 'printer_id', None), getattr(printer, 'id', None),
+                          getattr(printer, 'tenant_id', None))
+
+    def by_numeric_id(self, numeric_id) -> Optional[PrinterIdentity]:
+        """Look up a printer by its numeric printer_id"""
+        if numeric_id is None:
+            return None
+        return self._by_numeric_id.get(str(numeric_id))
+
+    def by_uuid(self, uuid: str) -> Optional[PrinterIdentity]:
+        """Look up a printer by its printers.id UUID"""
+        if not uuid:
+            return None
+        return self._by_uuid.get(str(uuid))
+
+    def get_uuid(self, numeric_id) -> Optional[str]:
+        identity = self.by_numeric_id(numeric_id)
+        return identity.uuid if identity else None
+
+    def get_numeric_id(self, uuid: str) -> Optional[str]:
+        identity = self.by_uuid(uuid)
+        return identity.numeric_id if identity else None
+
+    def invalidate(self, numeric_id=None, uuid: Optional[str] = None) -> None:
+        """Drop every entry that matches either key"""
+        for identity in (self.by_numeric_id(numeric_id), self.by_uuid(uuid)):
+            if identity:
+                self._by_numeric_id.pop(identity.numeric_id, None)
+                self._by_uuid.pop(identity.uuid, None)
+
+    def clear(self) -> None:
+        self._by_numeric_id.clear()
+        self._by_uuid.clear()
+
+    def __len__(self) -> int:
+        return len(self._by_numeric_id)
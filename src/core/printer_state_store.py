@@ -0,0 +1,134 @@
+"""
+Printer State Store
+Push-based cache of the latest MQTT report for each printer, fed directly from
+the paho on_message path so readers never have to hop threads to call mqtt_dump
+"""
+
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Callable
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class PrinterStateSnapshot:
+    """Immutable view of a printer's merged MQTT report at a given version"""
+    printer_id: str
+    version: int
+    data: Dict[str, Any]
+    received_at: float
+
+    @property
+    def print_data(self) -> Dict[str, Any]:
+        """The 'print' section of the report (state, progress, temperatures)"""
+        section = self.data.get("print", {})
+        return section if isinstance(section, dict) else {}
+
+    @property
+    def age(self) -> float:
+        """Seconds since this snapshot was captured"""
+        return time.time() - self.received_at
+
+class PrinterStateStore:
+    """Per-printer store of MQTT report snapshots with a version counter
+
+    Writers are the paho MQTT threads (one per printer); readers are coroutines
+    on the event loop. Each update publishes a fresh snapshot by reference
+    swap, so readers get a consistent object without copying or locking.
+    Snapshots are shared and must be treated as read-only.
+
+    Listeners are called with every new snapshot on the writer's thread and
+    must hand off any real work (e.g. via loop.call_soon_threadsafe).
+    """
+
+    def __init__(self):
+        self._snapshots: Dict[str, PrinterStateSnapshot] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        self._listeners: List[Callable[[PrinterStateSnapshot], None]] = []
+
+    @property
+    def version(self) -> int:
+        """Store-wide version, incremented on every update for any printer"""
+        return self._version
+
+    def update(self, printer_id: str, data: Dict[str, Any]) -> PrinterStateSnapshot:
+        """Publish a new snapshot for a printer
+
+        bambulabs_api merges each report into its top-level sections in
+        place, so only those sections are copied; nested values are replaced
+        rather than mutated by the library and can be shared safely.
+
+        Args:
+            printer_id: Printer identifier
+            data: Merged MQTT report as returned by mqtt_dump()
+
+        Returns:
+            The snapshot that was published
+        """
+        frozen = {
+            section: dict(values) if isinstance(values, dict) else values
+            for section, values in (data or {}).items()
+        }
+
+        with self._lock:
+            self._version += 1
+            snapshot = PrinterStateSnapshot(
+                printer_id=printer_id,
+                version=self._version,
+                data=frozen,
+                received_at=time.time()
+            )
+            self._snapshots[printer_id] = snapshot
+
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.debug(f"State store listener failed for printer {printer_id}: {e}")
+
+        return snapshot
+
+    def add_listener(self, listener: Callable[[PrinterStateSnapshot], None]) -> None:
+        """Register a callback for every published snapshot"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[PrinterStateSnapshot], None]) -> None:
+        """Unregister a snapshot callback"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def get(self, printer_id: str) -> Optional[PrinterStateSnapshot]:
+        """Get the latest snapshot for a printer, or None if nothing received yet"""
+        return self._snapshots.get(printer_id)
+
+    def get_all(self) -> List[PrinterStateSnapshot]:
+        """Get the latest snapshot of every printer"""
+        return list(self._snapshots.values())
+
+    def get_version(self, printer_id: str) -> int:
+        """Get the version of a printer's latest snapshot (0 if none)"""
+        snapshot = self._snapshots.get(printer_id)
+        return snapshot.version if snapshot else 0
+
+    def remove(self, printer_id: str) -> None:
+        """Drop the snapshot for a printer (disconnect or removal)"""
+        with self._lock:
+            self._snapshots.pop(printer_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics for diagnostics"""
+        snapshots = dict(self._snapshots)
+        return {
+            "version": self._version,
+            "printers": {
+                printer_id: {
+                    "version": snapshot.version,
+                    "age_seconds": round(snapshot.age, 1)
+                }
+                for printer_id, snapshot in snapshots.items()
+            }
+        }
@@ -0,0 +1,230 @@
+"""
+Slice Cache
+Content-addressed store of OrcaSlicer output. Slicing the same 3MF with the
+same profile, nozzle and OrcaSlicer build always produces the same
+.gcode.3mf, so OrcaSlicerClient.slice_3mf looks the result up here before
+spending minutes in the slicer.
+
+Entries are plain files named by their key in the cache directory. They are
+hard-linked (or copied, across filesystems) in and out, so a hit costs a
+link rather than a copy and callers may delete their output as usual.
+Recency is the file mtime, which survives restarts; eviction removes the
+least recently used entries once the total size exceeds the budget.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the key recipe changes so old entries stop matching
+SLICE_CACHE_FORMAT = 1
+ENTRY_SUFFIX = ".gcode.3mf"
+
+def _link_or_copy(source: str, target: str):
+    """Hard-link source to target, copying when a link is not possible"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+class SliceCache:
+    """LRU cache of sliced files bounded by total bytes
+
+    fetch/store do their file work in a worker thread. Use hold(key) around
+    lookup-slice-store so identical concurrent requests slice only once.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.directory = os.path.expanduser("~/orcaslicer-temp/slice-cache")
+        self.max_bytes = 2048 * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_served = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, list] = {}  # key -> [lock, holders]
+
+    def configure(self, cache_config: Optional[Dict[str, Any]]):
+        """Apply the performance.slice_cache config block (enabled, max_size_mb, directory)"""
+        cache_config = cache_config or {}
+        self.enabled = bool(cache_config.get('enabled', self.enabled))
+        if cache_config.get('directory'):
+            self.directory = os.path.expanduser(cache_config['directory'])
+        try:
+            self.max_bytes = int(float(cache_config.get('max_size_mb', self.max_bytes / (1024 * 1024))) * 1024 * 1024)
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid slice cache max_size_mb '{cache_config.get('max_size_mb')}', keeping {self.max_bytes // (1024 * 1024)}MB")
+
+    def _ensure_loaded(self):
+        """Load config and index the cache directory on first use"""
+        with self._lock:
+            if self._loaded:
+                return
+
+            from ..services.config_service import get_config_service
+            self.configure(get_config_service().get_performance_config().get('slice_cache'))
+
+            entries = []
+            if self.enabled:
+                os.makedirs(self.directory, exist_ok=True)
+                for name in os.listdir(self.directory):
+                    path = os.path.join(self.directory, name)
+                    if not name.endswith(ENTRY_SUFFIX):
+                        # Partial store from a crash
+                        if name.endswith(".tmp"):
+                            os.remove(path)
+                        continue
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, name[:-len(ENTRY_SUFFIX)], stat.st_size))
+
+            for _, key, size in sorted(entries):
+                self._entries[key] = size
+                self._total_bytes += size
+            self._loaded = True
+
+        logger.info(f"Slice cache: {len(entries)} entries, {self._total_bytes / (1024 * 1024):.1f}MB in {self.directory}")
+
+    @staticmethod
+    def make_key(input_hash: str, profile_path: str, nozzle_size: float,
+                 slicer_version: str, slicer_args: List[str]) -> str:
+        """Cache key for slicing content input_hash with the given profile, nozzle and slicer build"""
+        recipe = [SLICE_CACHE_FORMAT, input_hash, profile_path, float(nozzle_size), slicer_version, list(slicer_args)]
+        return hashlib.sha256(json.dumps(recipe).encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    @asynccontextmanager
+    async def hold(self, key: str):
+        """Serialize lookup and slicing of identical requests for a key"""
+        entry = self._key_locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._key_locks[key]
+
+    async def fetch(self, key: str, output_path: str) -> bool:
+        """
+        Place the cached slice for key at output_path
+
+        Returns:
+            True on a hit, False on a miss (or if the cache is disabled)
+        """
+        return await asyncio.to_thread(self._fetch_sync, key, output_path)
+
+    def _fetch_sync(self, key: str, output_path: str) -> bool:
+        self._ensure_loaded()
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            size = self._entries.get(key)
+            if size is not None:
+                self._entries.move_to_end(key)
+
+        if size is None:
+            self.misses += 1
+            return False
+
+        entry_path = self._entry_path(key)
+        try:
+            _link_or_copy(entry_path, output_path)
+            os.utime(entry_path)  # mtime is the persisted recency
+        except FileNotFoundError:
+            # Removed behind our back; treat as a miss
+            with self._lock:
+                if self._entries.pop(key, None) is not None:
+                    self._total_bytes -= size
+            self.misses += 1
+            return False
+
+        self.hits += 1
+        self.bytes_served += size
+        return True
+
+    async def store(self, key: str, sliced_path: str):
+        """Add a freshly sliced file to the cache, evicting old entries to fit"""
+        try:
+            await asyncio.to_thread(self._store_sync, key, sliced_path)
+        except Exception as e:
+            # A failed store only costs a future slice
+            logger.warning(f"Could not store slice {key[:12]} in cache: {e}")
+
+    def _store_sync(self, key: str, sliced_path: str):
+        self._ensure_loaded()
+        if not self.enabled:
+            return
+
+        size = os.path.getsize(sliced_path)
+        if size > self.max_bytes:
+            logger.info(f"Not caching {os.path.basename(sliced_path)}: {size} bytes exceeds cache budget")
+            return
+
+        entry_path = self._entry_path(key)
+        temp_path = entry_path + ".tmp"
+        _link_or_copy(sliced_path, temp_path)
+        os.replace(temp_path, entry_path)
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous
+            self._entries[key] = size
+            self._total_bytes += size
+
+            evicted = []
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            try:
+                os.remove(self._entry_path(old_key))
+            except FileNotFoundError:
+                pass
+        self.stores += 1
+        self.evictions += len(evicted)
+        if evicted:
+            logger.info(f"Slice cache evicted {len(evicted)} entries to stay under {self.max_bytes // (1024 * 1024)}MB")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = len(self._entries)
+            total_bytes = self._total_bytes
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "entries": entries,
+            "size_mb": round(total_bytes / (1024 * 1024), 1),
+            "max_size_mb": round(self.max_bytes / (1024 * 1024), 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "mb_served": round(self.bytes_served / (1024 * 1024), 1)
+        }
+
+# Global slice cache instance
+slice_cache = SliceCache()
@@ -0,0 +1,212 @@
+"""
+Slicing Executor
+Global limit on concurrent OrcaSlicer processes. Every slice waits for a
+slot in a priority queue, so a burst of /3mf/slice or multiply-slice
+requests runs a configured number at a time instead of starting one slicer
+per request and starving the printers' MQTT and camera work.
+
+Slicers run under nice (and optionally taskset, to pin them to a subset of
+cores). Queue wait is tracked separately: a job's slicing timeout starts when
+it gets a slot, not when it was queued.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import shutil
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..services.job_queue_service import JobPriority
+
+logger = logging.getLogger(__name__)
+
+# "45%", "Slicing 12.5 %", "percent=30"
+_PROGRESS_PATTERNS = (
+    re.compile(r'(\d{1,3}(?:\.\d+)?)\s*%'),
+    re.compile(r'percent\s*[=:]\s*(\d{1,3})', re.IGNORECASE),
+)
+
+@dataclass
+class SliceTask:
+    """A slice waiting for or holding an executor slot"""
+    id: str
+    label: str
+    priority: JobPriority
+    queued_at: float = field(default_factory=time.monotonic)
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[float] = None
+    progress: Optional[float] = None
+    stage: Optional[str] = None
+
+    @property
+    def wait_seconds(self) -> float:
+        """Time spent queued (so far, if still queued)"""
+        return (self.started_at or time.monotonic()) - self.queued_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "priority": self.priority.name,
+            "state": "running" if self.started_at else "queued",
+            "created_at": self.created_at.isoformat(),
+            "wait_seconds": round(self.wait_seconds, 1),
+            "run_seconds": round(time.monotonic() - self.started_at, 1) if self.started_at else None,
+            "progress": self.progress,
+            "stage": self.stage
+        }
+
+class SlicingExecutor:
+    """Priority-ordered, bounded admission for OrcaSlicer processes"""
+
+    def __init__(self):
+        self.max_concurrent = 1
+        self.nice = 10
+        self.cpu_cores: Optional[List[int]] = None
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.tasks: Dict[str, SliceTask] = {}
+        self._running = 0
+        self._waiters: list = []  # heap of (-priority, seq, future)
+        self._sequence = itertools.count()
+        self._configured = False
+
+    def configure(self, slicing_config: Optional[Dict[str, Any]]):
+        """Apply the performance.slicing config block (max_concurrent, nice, cpu_cores)"""
+        slicing_config = slicing_config or {}
+        try:
+            self.max_concurrent = max(1, int(slicing_config.get('max_concurrent', self.max_concurrent)))
+            self.nice = max(0, min(19, int(slicing_config.get('nice', self.nice))))
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid slicing config {slicing_config}, keeping max_concurrent={self.max_concurrent}, nice={self.nice}")
+        cores = slicing_config.get('cpu_cores')
+        self.cpu_cores = [int(core) for core in cores] if cores else None
+
+    def _ensure_configured(self):
+        if self._configured:
+            return
+        from ..services.config_service import get_config_service
+        self.configure(get_config_service().get_performance_config().get('slicing'))
+        self._configured = True
+
+    def wrap_command(self, command: List[str]) -> List[str]:
+        """Prefix a slicer command with the configured CPU limits"""
+        self._ensure_configured()
+        prefix = []
+        if self.cpu_cores:
+            if shutil.which("taskset"):
+                prefix += ["taskset", "-c", ",".join(str(core) for core in self.cpu_cores)]
+            else:
+                logger.warning("taskset not found, slicer CPU cores not restricted")
+        if self.nice:
+            if shutil.which("nice"):
+                prefix += ["nice", "-n", str(self.nice)]
+            else:
+                logger.warning("nice not found, slicer priority not lowered")
+        return prefix + list(command)
+
+    @asynccontextmanager
+    async def slot(self, label: str, priority: JobPriority = JobPriority.NORMAL):
+        """
+        Wait for a slicing slot, highest priority first (FIFO within a priority)
+
+        Yields:
+            SliceTask for progress updates; its wait_seconds is final on entry
+        """
+        self._ensure_configured()
+        task = SliceTask(id=str(uuid.uuid4()), label=label, priority=priority)
+        self.tasks[task.id] = task
+        try:
+            await self._acquire(task)
+        except BaseException:
+            del self.tasks[task.id]
+            raise
+
+        task.started_at = time.monotonic()
+        self.total_wait_seconds += task.wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, task.wait_seconds)
+        succeeded = False
+        try:
+            yield task
+            succeeded = True
+        finally:
+            del self.tasks[task.id]
+            if succeeded:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self._release()
+
+    async def _acquire(self, task: SliceTask):
+        # Drop waiters that were cancelled while queued
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+        if self._running < self.max_concurrent and not self._waiters:
+            self._running += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-task.priority.value, next(self._sequence), future))
+        logger.info(f"Slice {task.label} queued ({task.priority.name}, {len(self._waiters)} waiting, "
+                    f"{self._running}/{self.max_concurrent} running)")
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted a slot in the same tick we were cancelled: pass it on
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        """Hand the slot to the next live waiter, or free it"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._running -= 1
+
+    def update_progress(self, task: SliceTask, line: str):
+        """Record progress from a line of slicer output"""
+        line = line.strip()
+        if not line:
+            return
+        for pattern in _PROGRESS_PATTERNS:
+            match = pattern.search(line)
+            if match:
+                progress = min(100.0, float(match.group(1)))
+                if task.progress is None or int(progress // 10) > int(task.progress // 10):
+                    logger.info(f"Slicing {task.label}: {progress:.0f}%")
+                task.progress = progress
+                task.stage = line[:200]
+                return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get slot usage, queue contents and wait statistics"""
+        self._ensure_configured()
+        started = self.completed + self.failed
+        return {
+            "max_concurrent": self.max_concurrent,
+            "nice": self.nice,
+            "cpu_cores": self.cpu_cores,
+            "running": self._running,
+            "queued": len([t for t in self.tasks.values() if not t.started_at]),
+            "completed": self.completed,
+            "failed": self.failed,
+            "average_wait_seconds": round(self.total_wait_seconds / started, 1) if started else None,
+            "max_wait_seconds": round(self.max_wait_seconds, 1),
+            "tasks": [task.to_dict() for task in self.tasks.values()]
+        }
+
+# Global slicing executor instance
+slicing_executor = SlicingExecutor()
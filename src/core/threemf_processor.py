@@ -2,19 +2,83 @@ import os
 import zipfile
 import tempfile
 import shutil
+import struct
+import io
+import re
 import xml.etree.ElementTree as ET
 import numpy as np
 import logging
-from typing import Tuple, List, Dict, Any, Optional
+from typing import Tuple, List, Dict, Any, Optional, BinaryIO, Union
 import uuid
 from pathlib import Path
 import math
 import asyncio
 
 from ..utils.resource_monitor import resource_monitor
+from ..utils.process_pool import cpu_worker_pool
 
 logger = logging.getLogger(__name__)
 
+# How process_3mf produces the output archive:
+# - streaming: regenerate the model and model_settings.config, copy every
+#   other member as raw compressed bytes (no extraction, no recompression)
+# - extract: extract to a temp dir, rewrite files there and re-zip everything
+REWRITE_MODES = ("streaming", "extract")
+
+# Locations of the 3D model inside a 3MF, in order of preference
+MODEL_MEMBERS = ('3D/3dmodel.model', '3D/Objects/3dmodel.model', '3dmodel.model')
+MODEL_SETTINGS_MEMBER = 'Metadata/model_settings.config'
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Rows the vertex buffer starts with (it doubles as needed); parsed vertex
+# elements are also discarded in batches of this size
+VERTEX_BUFFER_ROWS = 16384
+_ZIP_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+
+def _copy_member_raw(source: BinaryIO, info: zipfile.ZipInfo, target: zipfile.ZipFile):
+    """
+    Append a ZIP member to target without decompressing it
+
+    The member's compressed bytes are copied from the source archive behind
+    a fresh local header, so an unchanged member costs one sequential copy
+    instead of inflate + deflate. target must be open for writing with no
+    member stream open, and source must not be read by a ZipFile meanwhile.
+    """
+    if info.flag_bits & 0x01:
+        raise ValueError(f"Cannot copy encrypted member {info.filename}")
+
+    source.seek(info.header_offset)
+    header = _ZIP_LOCAL_HEADER.unpack(source.read(_ZIP_LOCAL_HEADER.size))
+    if header[0] != b'PK\x03\x04':
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    source.seek(header[9] + header[10], os.SEEK_CUR)  # skip name and extra field
+
+    copied = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    copied.compress_type = info.compress_type
+    copied.create_system = info.create_system
+    copied.external_attr = info.external_attr
+    # CRC and sizes are known up front, so they go in the local header and
+    # the source's data descriptor (if any) is not carried over
+    copied.flag_bits = info.flag_bits & ~0x08
+    copied.CRC = info.CRC
+    copied.compress_size = info.compress_size
+    copied.file_size = info.file_size
+    copied.header_offset = target.fp.tell()
+
+    target.fp.write(copied.FileHeader())
+    remaining = info.compress_size
+    while remaining:
+        chunk = source.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated data for {info.filename}")
+        target.fp.write(chunk)
+        remaining -= len(chunk)
+
+    target.filelist.append(copied)
+    target.NameToInfo[copied.filename] = copied
+    target.start_dir = target.fp.tell()
+
 class ThreeMFProcessor:
     """Handles 3MF file manipulation for object multiplication"""
     
@@ -23,7 +87,10 @@ class ThreeMFProcessor:
     EDGE_MARGIN = 10.0  # Safety margin from edges
     USABLE_AREA = BUILD_PLATE_SIZE - (2 * EDGE_MARGIN)
     
-    def __init__(self):
+    def __init__(self, rewrite_mode: str = "streaming"):
+        if rewrite_mode not in REWRITE_MODES:
+            raise ValueError(f"Invalid rewrite mode '{rewrite_mode}', expected one of {REWRITE_MODES}")
+        self.rewrite_mode = rewrite_mode
         self.temp_dir = None
         self.namespace = {'3mf': 'http://schemas.microsoft.com/3dmanufacturing/core/2015/02'}
         self.is_step_import = False
@@ -43,11 +110,6 @@ class ThreeMFProcessor:
         # Start resource monitoring task
         monitoring_task = None
         try:
-            # Check system resources before starting intensive operation
-            is_safe, reason = resource_monitor.check_resources_safe("3MF multiplication")
-            if not is_safe:
-                raise RuntimeError(f"System resources insufficient for 3MF processing: {reason}")
-            
             # Validate file size and object count for Pi limitations
             file_size_mb = os.path.getsize(input_file_path) / (1024 * 1024)
             limits = resource_monitor.get_recommended_limits(file_size_mb, object_count)
@@ -69,81 +131,29 @@ class ThreeMFProcessor:
                     max_duration=limits['multiply_timeout']
                 )
             )
-            # Create temporary directory for processing
+            # Create temporary directory for the output archive
             self.temp_dir = tempfile.mkdtemp()
-            extract_dir = os.path.join(self.temp_dir, 'extracted')
-            output_dir = os.path.join(self.temp_dir, 'output')
-            
-            # Extract 3MF contents
-            logger.info(f"Extracting 3MF file to {extract_dir}")
-            self._extract_3mf(input_file_path, extract_dir)
-            
-            # Check resources after extraction
-            is_safe, reason = resource_monitor.check_resources_safe("After 3MF extraction")
-            if not is_safe:
-                raise RuntimeError(f"System resources depleted during extraction: {reason}")
-            
-            # Copy all files to output directory first (preserve everything)
-            shutil.copytree(extract_dir, output_dir)
-            
-            # Detect if this is a STEP import before processing
-            self.is_step_import = self._detect_step_import(output_dir)
-            
-            # Find and analyze the 3D model file
-            model_path = self._find_model_file(output_dir)
-            if not model_path:
-                raise ValueError("No 3D model file found in 3MF")
-            
-            # Parse and analyze the original model
-            logger.info("Analyzing original 3D model structure...")
-            original_bounds = self._get_object_bounds(model_path)
-            if not original_bounds:
-                raise ValueError("Could not determine object bounds from 3MF file")
-            
-            # Calculate grid positions for objects
-            logger.info(f"Calculating grid layout for {object_count} objects with {spacing_mm}mm spacing")
-            positions = self._calculate_grid_positions(
-                original_bounds, 
-                object_count, 
-                spacing_mm
-            )
-            
-            # Validate positions before processing
-            if len(positions) != object_count:
-                raise ValueError(f"Position count ({len(positions)}) doesn't match requested object count ({object_count})")
-            
-            # Modify the model file to include multiple build items
-            logger.info(f"Creating multiplied build layout for {object_count} objects...")
-            self._create_multiplied_build_items(model_path, positions)
-            
-            # Check resources after multiplication
-            is_safe, reason = resource_monitor.check_resources_safe("After object multiplication")
-            if not is_safe:
-                raise RuntimeError(f"System resources depleted during multiplication: {reason}")
-            
-            # Verify the multiplication worked by checking the file
-            self._verify_multiplication_success(model_path, object_count)
-            
-            # Standardize metadata for consistent object display
-            logger.info("Updating object metadata...")
-            self._standardize_object_metadata(output_dir, object_count, positions, original_bounds)
-            
-            # For STEP files, verify the assembly metadata was updated correctly
-            if self.is_step_import:
-                self._verify_step_assembly_update(output_dir, object_count)
-            
-            # Create output 3MF file
             output_filename = f"multiplied_{object_count}x_{int(spacing_mm)}mm_{uuid.uuid4().hex[:8]}.3mf"
             output_path = os.path.join(self.temp_dir, output_filename)
-            self._create_3mf(output_dir, output_path)
+            
+            # The rewrite runs in a worker process; the pool checks system
+            # resources once a worker slot is free. Cancelling this coroutine
+            # (client gone, timeout) terminates the worker.
+            await cpu_worker_pool.run(
+                self._multiply_file, input_file_path, output_path, object_count, spacing_mm,
+                operation="3MF multiplication"
+            )
             
             logger.info(f"Successfully created 3MF with {object_count} objects")
             return output_path
             
+        except asyncio.CancelledError:
+            logger.info("3MF processing cancelled")
+            self.cleanup()
+            raise
         except Exception as e:
             logger.error(f"Error processing 3MF file: {e}")
-            if self.temp_dir and os.path.exists(self.temp_dir):
-                shutil.rmtree(self.temp_dir)
+            self.cleanup()
             raise
         finally:
             # Cancel resource monitoring task
@@ -160,6 +170,158 @@ class ThreeMFProcessor:
             shutil.rmtree(self.temp_dir)
             self.temp_dir = None
     
+    def _multiply_file(self, input_file_path: str, output_path: str, object_count: int, spacing_mm: float) -> str:
+        """Synchronous multiplication pipeline, run in a CPU pool worker"""
+        if self.rewrite_mode == "extract":
+            self._multiply_extracted(input_file_path, output_path, object_count, spacing_mm)
+        else:
+            self._multiply_streaming(input_file_path, output_path, object_count, spacing_mm)
+        return output_path
+    
+    def _multiply_streaming(self, input_file_path: str, output_path: str, object_count: int, spacing_mm: float):
+        """
+        Rewrite the 3MF straight into the output archive
+
+        Only the model file and model_settings.config are decompressed and
+        regenerated; every other member (G-code, thumbnails, settings) is
+        copied as raw compressed bytes in its original order.
+        """
+        with open(input_file_path, 'rb') as source, zipfile.ZipFile(source, 'r') as zip_in:
+            model_member = self._find_model_member(zip_in.namelist())
+            if not model_member:
+                raise ValueError("No 3D model file found in 3MF")
+            
+            logger.info(f"Reading {model_member} from 3MF")
+            model_bytes = zip_in.read(model_member)
+            model_settings = None
+            if MODEL_SETTINGS_MEMBER in zip_in.NameToInfo:
+                model_settings = zip_in.read(MODEL_SETTINGS_MEMBER).decode('utf-8')
+            
+            # Check resources after reading the model
+            is_safe, reason = resource_monitor.check_resources_safe("After reading 3MF model")
+            if not is_safe:
+                raise RuntimeError(f"System resources depleted while reading 3MF: {reason}")
+            
+            new_model, new_settings = self._multiply_contents(
+                io.BytesIO(model_bytes), model_bytes.decode('utf-8'), model_settings, object_count, spacing_mm
+            )
+            del model_bytes
+            
+            replacements = {model_member: new_model}
+            if new_settings is not None:
+                replacements[MODEL_SETTINGS_MEMBER] = new_settings
+            
+            copied = 0
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zip_out:
+                for info in zip_in.infolist():
+                    if info.filename in replacements:
+                        regenerated = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                        regenerated.compress_type = zipfile.ZIP_DEFLATED
+                        regenerated.external_attr = info.external_attr
+                        zip_out.writestr(regenerated, replacements[info.filename])
+                    else:
+                        _copy_member_raw(source, info, zip_out)
+                        copied += 1
+            
+            logger.info(f"Wrote {output_path}: {len(replacements)} member(s) regenerated, {copied} copied without recompression")
+    
+    def _multiply_extracted(self, input_file_path: str, output_path: str, object_count: int, spacing_mm: float):
+        """Rewrite the 3MF by extracting it to disk, editing files in place and re-zipping"""
+        extract_dir = os.path.join(self.temp_dir, 'extracted')
+        
+        # Extract 3MF contents
+        logger.info(f"Extracting 3MF file to {extract_dir}")
+        self._extract_3mf(input_file_path, extract_dir)
+        
+        # Check resources after extraction
+        is_safe, reason = resource_monitor.check_resources_safe("After 3MF extraction")
+        if not is_safe:
+            raise RuntimeError(f"System resources depleted during extraction: {reason}")
+        
+        model_path = self._find_model_file(extract_dir)
+        if not model_path:
+            raise ValueError("No 3D model file found in 3MF")
+        
+        with open(model_path, 'r', encoding='utf-8') as f:
+            model_content = f.read()
+        
+        model_settings_path = os.path.join(extract_dir, 'Metadata', 'model_settings.config')
+        model_settings = None
+        if os.path.exists(model_settings_path):
+            with open(model_settings_path, 'r', encoding='utf-8') as f:
+                model_settings = f.read()
+        
+        new_model, new_settings = self._multiply_contents(
+            model_path, model_content, model_settings, object_count, spacing_mm
+        )
+        
+        with open(model_path, 'w', encoding='utf-8') as f:
+            f.write(new_model)
+        if new_settings is not None:
+            with open(model_settings_path, 'w', encoding='utf-8') as f:
+                f.write(new_settings)
+        
+        self._create_3mf(extract_dir, output_path)
+    
+    def _multiply_contents(self, bounds_source: Union[str, BinaryIO], model_content: str,
+                           model_settings: Optional[str], object_count: int,
+                           spacing_mm: float) -> Tuple[str, Optional[str]]:
+        """
+        Multiply the build items of a model and sync model_settings.config to match
+        
+        Args:
+            bounds_source: Path or binary stream of the model, used for bounds
+            model_content: Text of the model file
+            model_settings: Text of model_settings.config, if present
+            object_count: Number of objects to create
+            spacing_mm: Spacing between objects in mm
+            
+        Returns:
+            Tuple of (new model text, new model_settings text or None if absent)
+        """
+        # Detect if this is a STEP import before processing
+        self.is_step_import = self._detect_step_import(model_settings)
+        
+        # Parse and analyze the original model
+        logger.info("Analyzing original 3D model structure...")
+        original_bounds = self._get_object_bounds(bounds_source)
+        if not original_bounds:
+            raise ValueError("Could not determine object bounds from 3MF file")
+        
+        # Calculate grid positions for objects
+        logger.info(f"Calculating grid layout for {object_count} objects with {spacing_mm}mm spacing")
+        positions = self._calculate_grid_positions(
+            original_bounds, 
+            object_count, 
+            spacing_mm
+        )
+        
+        # Validate positions before processing
+        if len(positions) != object_count:
+            raise ValueError(f"Position count ({len(positions)}) doesn't match requested object count ({object_count})")
+        
+        # Modify the model to include multiple build items
+        logger.info(f"Creating multiplied build layout for {object_count} objects...")
+        new_model = self._create_multiplied_build_items(model_content, positions)
+        
+        # Check resources after multiplication
+        is_safe, reason = resource_monitor.check_resources_safe("After object multiplication")
+        if not is_safe:
+            raise RuntimeError(f"System resources depleted during multiplication: {reason}")
+        
+        # Verify the multiplication worked by checking the model
+        self._verify_multiplication_success(new_model, object_count)
+        
+        # Standardize metadata for consistent object display
+        logger.info("Updating object metadata...")
+        new_settings = self._standardize_object_metadata(model_settings, new_model, object_count, positions, original_bounds)
+        
+        # For STEP files, verify the assembly metadata was updated correctly
+        if self.is_step_import:
+            self._verify_step_assembly_update(new_settings, object_count)
+        
+        return new_model, new_settings
+    
     def _extract_3mf(self, file_path: str, extract_dir: str):
         """Extract 3MF ZIP contents"""
         os.makedirs(extract_dir, exist_ok=True)
@@ -196,20 +358,28 @@ class ThreeMFProcessor:
         
         return None
     
-    def _detect_step_import(self, output_dir: str) -> bool:
-        """Detect if this 3MF was imported from a STEP file"""
+    def _find_model_member(self, names: List[str]) -> Optional[str]:
+        """Find the 3D model member in a 3MF archive's member list"""
+        for member in MODEL_MEMBERS:
+            if member in names:
+                return member
+        
+        # Fall back to any .model file
+        for name in names:
+            if name.endswith('.model'):
+                return name
+        
+        return None
+    
+    def _detect_step_import(self, model_settings: Optional[str]) -> bool:
+        """Detect if this 3MF was imported from a STEP file, from its model_settings.config text"""
         try:
-            model_settings_path = os.path.join(output_dir, 'Metadata', 'model_settings.config')
-            
-            if not os.path.exists(model_settings_path):
+            if model_settings is None:
                 return False
             
-            with open(model_settings_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = model_settings
             
             # Check for STEP file references in the metadata
-            import re
-            
             # Method 1: Check for .step file extensions in source_file attributes
             step_pattern = r'source_file="[^"]*\.step"'
             step_match = re.search(step_pattern, content, re.IGNORECASE)
@@ -245,40 +415,37 @@ class ThreeMFProcessor:
             logger.warning(f"Could not detect STEP import: {e}")
             return False
     
-    def _get_object_bounds(self, model_path: str) -> Optional[Dict[str, float]]:
-        """Get the bounding box of the printable object from the 3MF model"""
+    def _get_object_bounds(self, model_source: Union[str, BinaryIO]) -> Optional[Dict[str, float]]:
+        """Get the bounding box of the printable object from the 3MF model (path or binary stream)"""
         try:
-            tree = ET.parse(model_path)
-            root = tree.getroot()
+            meshes, components, build_items = self._read_model_geometry(model_source)
             
             # Find the build item to get the transform and object reference
-            build = root.find('.//3mf:build', self.namespace)
-            if build is None:
+            if build_items is None:
                 logger.error("No build section found in 3MF model")
                 return None
             
             # Get the first build item
-            item = build.find('3mf:item', self.namespace)
-            if item is None:
+            if not build_items:
                 logger.error("No build items found in 3MF model")
                 return None
             
             # Get the object ID and transform
-            object_id = item.get('objectid')
-            transform = item.get('transform')
+            object_id, transform = build_items[0]
             
             if not object_id:
                 logger.error("Build item has no object ID")
                 return None
             
             # Find the referenced object
-            obj = root.find(f'.//3mf:object[@id="{object_id}"]', self.namespace)
-            if obj is None:
+            if object_id not in meshes and object_id not in components:
                 logger.error(f"Referenced object {object_id} not found")
                 return None
             
             # Calculate bounds from the object and transform
-            bounds = self._calculate_object_bounds_recursive(root, object_id, transform)
+            bounds = self._calculate_object_bounds_recursive(
+                meshes, components, object_id, self._parse_transform(transform), {}, set()
+            )
             
             if bounds:
                 width = bounds['max_x'] - bounds['min_x']
@@ -304,43 +471,124 @@ class ThreeMFProcessor:
             logger.error(f"Error calculating object bounds: {e}")
             return None
     
-    def _calculate_object_bounds_recursive(self, root, object_id: str, transform: str = None) -> Optional[Dict[str, float]]:
-        """Recursively calculate bounds of an object, following component references"""
-        obj = root.find(f'.//3mf:object[@id="{object_id}"]', self.namespace)
-        if obj is None:
-            return None
+    def _read_model_geometry(self, model_source: Union[str, BinaryIO]):
+        """
+        Stream the model XML and collect only what bounds need
+        
+        Vertices are parsed with iterparse straight into a growing NumPy
+        buffer per object and their elements are discarded as they go, so
+        the DOM never holds the mesh. Triangles are skipped.
+        
+        Returns:
+            Tuple of (meshes, components, build_items):
+            meshes: object id -> (vertices Nx3, raw min xyz, raw max xyz)
+            components: object id -> [(component object id, transform), ...]
+            build_items: [(object id, transform), ...], None if no build section
+        """
+        ns = '{' + self.namespace['3mf'] + '}'
+        object_tag, vertices_tag, vertex_tag = ns + 'object', ns + 'vertices', ns + 'vertex'
+        triangles_tag, triangle_tag = ns + 'triangles', ns + 'triangle'
+        component_tag, build_tag, item_tag = ns + 'component', ns + 'build', ns + 'item'
+        
+        meshes: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        components: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+        build_items: Optional[List[Tuple[str, Optional[str]]]] = None
+        
+        object_id = None
+        container = None  # <vertices> or <triangles> currently being drained
+        buffer = None
+        count = 0
+        
+        for event, elem in ET.iterparse(model_source, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == object_tag:
+                    object_id = elem.get('id')
+                elif tag == vertices_tag or tag == triangles_tag:
+                    container = elem
+                    if tag == vertices_tag:
+                        buffer = np.empty((VERTEX_BUFFER_ROWS, 3))
+                        count = 0
+                elif tag == build_tag:
+                    build_items = []
+                continue
+            
+            if tag == vertex_tag:
+                if count == len(buffer):
+                    buffer = np.resize(buffer, (count * 2, 3))
+                buffer[count] = (float(elem.get('x', 0)), float(elem.get('y', 0)), float(elem.get('z', 0)))
+                count += 1
+                if count % VERTEX_BUFFER_ROWS == 0:
+                    del container[:]  # drop parsed vertex elements
+            elif tag == triangle_tag:
+                if len(container) >= VERTEX_BUFFER_ROWS:
+                    del container[:]
+            elif tag == vertices_tag:
+                if count and object_id is not None:
+                    vertices = buffer[:count].copy()
+                    meshes[object_id] = (vertices, vertices.min(axis=0), vertices.max(axis=0))
+                buffer = None
+                container = None
+                elem.clear()
+            elif tag == triangles_tag:
+                container = None
+                elem.clear()
+            elif tag == component_tag and object_id is not None:
+                components.setdefault(object_id, []).append((elem.get('objectid'), elem.get('transform')))
+            elif tag == item_tag and build_items is not None:
+                build_items.append((elem.get('objectid'), elem.get('transform')))
+            elif tag == object_tag:
+                object_id = None
+        
+        return meshes, components, build_items
+    
+    def _calculate_object_bounds_recursive(self, meshes, components, object_id: str, transform_matrix: np.ndarray,
+                                           cache: Dict[Tuple[str, bytes], Optional[Dict[str, float]]],
+                                           visiting: set) -> Optional[Dict[str, float]]:
+        """
+        Recursively calculate bounds of an object, following component references
+        
+        Results are cached per (object, transform), so a component repeated
+        with the same placement is only transformed once.
+        """
+        key = (object_id, transform_matrix.tobytes())
+        if key in cache:
+            return cache[key]
         
-        # Parse transform if provided
-        transform_matrix = self._parse_transform(transform) if transform else np.eye(4)
+        if object_id not in meshes and object_id not in components:
+            return None
+        if object_id in visiting:
+            logger.warning(f"Component cycle through object {object_id}, ignoring")
+            return None
         
+        visiting.add(object_id)
         all_bounds = []
         
         # Check if object has mesh data
-        mesh = obj.find('3mf:mesh', self.namespace)
-        if mesh is not None:
-            bounds = self._get_mesh_bounds(mesh, transform_matrix)
+        if object_id in meshes:
+            bounds = self._get_mesh_bounds(meshes[object_id], transform_matrix)
             if bounds:
                 all_bounds.append(bounds)
         
         # Check if object has components
-        components = obj.find('3mf:components', self.namespace)
-        if components is not None:
-            for component in components.findall('3mf:component', self.namespace):
-                comp_object_id = component.get('objectid')
-                comp_transform = component.get('transform')
-                
-                # Combine transforms
-                comp_matrix = self._parse_transform(comp_transform) if comp_transform else np.eye(4)
-                combined_matrix = np.dot(transform_matrix, comp_matrix)
-                
-                # Get bounds of referenced object
-                comp_bounds = self._calculate_object_bounds_recursive(root, comp_object_id, self._matrix_to_transform(combined_matrix))
-                if comp_bounds:
-                    all_bounds.append(comp_bounds)
+        for comp_object_id, comp_transform in components.get(object_id, []):
+            # Combine transforms
+            comp_matrix = self._parse_transform(comp_transform) if comp_transform else np.eye(4)
+            combined_matrix = np.dot(transform_matrix, comp_matrix)
+            
+            # Get bounds of referenced object
+            comp_bounds = self._calculate_object_bounds_recursive(
+                meshes, components, comp_object_id, combined_matrix, cache, visiting
+            )
+            if comp_bounds:
+                all_bounds.append(comp_bounds)
+        
+        visiting.discard(object_id)
         
         # Combine all bounds
+        result = None
         if all_bounds:
-            return {
+            result = {
                 'min_x': min(b['min_x'] for b in all_bounds),
                 'min_y': min(b['min_y'] for b in all_bounds),
                 'min_z': min(b['min_z'] for b in all_bounds),
@@ -349,35 +597,36 @@ class ThreeMFProcessor:
                 'max_z': max(b['max_z'] for b in all_bounds)
             }
         
-        return None
+        cache[key] = result
+        return result
     
-    def _get_mesh_bounds(self, mesh, transform_matrix: np.ndarray) -> Optional[Dict[str, float]]:
-        """Get bounds of a mesh with transform applied"""
-        vertices_elem = mesh.find('3mf:vertices', self.namespace)
-        if vertices_elem is None:
+    def _get_mesh_bounds(self, mesh: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                         transform_matrix: np.ndarray) -> Optional[Dict[str, float]]:
+        """Get bounds of a mesh (vertices, raw min, raw max) with transform applied"""
+        vertices, raw_min, raw_max = mesh
+        if not len(vertices):
             return None
         
-        vertices = []
-        for vertex in vertices_elem.findall('3mf:vertex', self.namespace):
-            x = float(vertex.get('x', 0))
-            y = float(vertex.get('y', 0))
-            z = float(vertex.get('z', 0))
-            vertices.append([x, y, z, 1])  # Homogeneous coordinates
+        rotation = transform_matrix[:3, :3]
+        translation = transform_matrix[:3, 3]
         
-        if not vertices:
-            return None
+        if np.count_nonzero(rotation, axis=1).max() <= 1:
+            # Scale/mirror/axis swap only: each output axis depends on one input
+            # axis, so the transformed raw box corners give the exact bounds
+            transformed = np.dot(np.stack([raw_min, raw_max]), rotation.T)
+        else:
+            transformed = np.dot(vertices, rotation.T)
         
-        # Apply transform to all vertices
-        vertices_array = np.array(vertices)
-        transformed_vertices = np.dot(vertices_array, transform_matrix.T)
+        lower = transformed.min(axis=0) + translation
+        upper = transformed.max(axis=0) + translation
         
         return {
-            'min_x': float(np.min(transformed_vertices[:, 0])),
-            'min_y': float(np.min(transformed_vertices[:, 1])),
-            'min_z': float(np.min(transformed_vertices[:, 2])),
-            'max_x': float(np.max(transformed_vertices[:, 0])),
-            'max_y': float(np.max(transformed_vertices[:, 1])),
-            'max_z': float(np.max(transformed_vertices[:, 2]))
+            'min_x': float(lower[0]),
+            'min_y': float(lower[1]),
+            'min_z': float(lower[2]),
+            'max_x': float(upper[0]),
+            'max_y': float(upper[1]),
+            'max_z': float(upper[2])
         }
     
     def _parse_transform(self, transform_str: str) -> np.ndarray:
@@ -538,14 +787,10 @@ class ThreeMFProcessor:
             logger.warning("Cannot invert rotation matrix, using original position")
             return x, y
     
-    def _verify_multiplication_success(self, model_path: str, expected_count: int):
+    def _verify_multiplication_success(self, content: str, expected_count: int):
         """Verify that the multiplication created the correct number of build items"""
         try:
-            with open(model_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
             # Count build items
-            import re
             item_pattern = r'<item\s+[^>]+/>'
             items = re.findall(item_pattern, content)
             actual_count = len(items)
@@ -559,19 +804,13 @@ class ThreeMFProcessor:
             logger.error(f"Failed to verify multiplication: {e}")
             raise
     
-    def _verify_step_assembly_update(self, output_dir: str, expected_count: int):
+    def _verify_step_assembly_update(self, content: Optional[str], expected_count: int):
         """Verify that STEP assembly metadata was updated correctly"""
         try:
-            model_settings_path = os.path.join(output_dir, 'Metadata', 'model_settings.config')
-            
-            if not os.path.exists(model_settings_path):
+            if content is None:
                 raise ValueError("model_settings.config not found for STEP verification")
             
-            with open(model_settings_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
             # Count assemble items
-            import re
             assemble_pattern = r'<assemble_item[^>]+/>'
             assemble_items = re.findall(assemble_pattern, content)
             actual_count = len(assemble_items)
@@ -592,15 +831,11 @@ class ThreeMFProcessor:
             logger.error(f"Failed to verify STEP assembly update: {e}")
             raise
     
-    def _create_multiplied_build_items(self, model_path: str, positions: List[Tuple[float, float]]):
-        """Modify the 3MF model to create multiple build items at specified positions"""
+    def _create_multiplied_build_items(self, content: str, positions: List[Tuple[float, float]]) -> str:
+        """Return the model text with multiple build items at specified positions"""
         try:
-            # Read the file as text to preserve exact formatting and namespaces
-            with open(model_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
+            # Work on the text to preserve exact formatting and namespaces
             # Find the build section using regex
-            import re
             build_pattern = r'<build>(.*?)</build>'
             build_match = re.search(build_pattern, content, re.DOTALL)
             
@@ -693,35 +928,31 @@ class ThreeMFProcessor:
             new_build_content = f"<build>\n{chr(10).join(new_build_items)}\n </build>"
             
             # Replace the build section in the content
-            new_content = re.sub(build_pattern, new_build_content, content, flags=re.DOTALL)
-            
-            # Write the modified content back
-            with open(model_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            new_content = re.sub(build_pattern, lambda _: new_build_content, content, count=1, flags=re.DOTALL)
             
             logger.info(f"Created {len(positions)} build items in model file")
+            return new_content
             
         except Exception as e:
             logger.error(f"Error creating multiplied build items: {e}")
             raise
     
-    def _standardize_object_metadata(self, output_dir: str, object_count: int, positions: List[Tuple[float, float]], bounds: Dict[str, float]):
-        """Update metadata for consistent display - CRITICAL for STEP files"""
+    def _standardize_object_metadata(self, model_settings: Optional[str], model_content: str, object_count: int,
+                                     positions: List[Tuple[float, float]], bounds: Dict[str, float]) -> Optional[str]:
+        """Return updated model_settings.config text for consistent display - CRITICAL for STEP files"""
         try:
-            model_settings_path = os.path.join(output_dir, 'Metadata', 'model_settings.config')
-            
-            if not os.path.exists(model_settings_path):
+            if model_settings is None:
                 logger.warning("model_settings.config not found, skipping metadata update")
-                return
+                return None
             
             # For STEP files, this metadata update is CRITICAL - it overrides build item positions
             if self.is_step_import:
                 logger.info("STEP file detected: Updating assembly metadata to override build positions")
-                self._update_step_assembly_metadata(model_settings_path, output_dir, object_count)
+                return self._update_step_assembly_metadata(model_settings, model_content, object_count)
             else:
                 # For STL files, just do standard metadata sync
                 logger.info("STL file: Performing standard metadata synchronization")
-                self._update_standard_metadata(model_settings_path, output_dir, object_count, positions, bounds)
+                return self._update_standard_metadata(model_settings, object_count, positions, bounds)
             
         except Exception as e:
             logger.error(f"Error updating object metadata: {e}")
@@ -731,29 +962,16 @@ class ThreeMFProcessor:
             else:
                 # For STL files, continue without metadata update
                 logger.info("Continuing without metadata update for STL file")
+                return model_settings
     
-    def _update_step_assembly_metadata(self, model_settings_path: str, output_dir: str, object_count: int):
+    def _update_step_assembly_metadata(self, content: str, model_content: str, object_count: int) -> str:
         """Update assembly section for STEP files - this has final authority over positioning"""
         logger.info(f"Starting STEP assembly metadata update for {object_count} objects")
         try:
-            # Read the current metadata
-            logger.info(f"Reading metadata from: {model_settings_path}")
-            with open(model_settings_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
             logger.info(f"Original metadata length: {len(content)} characters")
             
             # Get the EXACT transforms from the 3D model build items
-            model_path = self._find_model_file(output_dir)
-            if not model_path:
-                raise ValueError("Cannot find 3D model file for STEP assembly update")
-            
-            logger.info(f"Reading 3D model from: {model_path}")
-            with open(model_path, 'r', encoding='utf-8') as f:
-                model_content = f.read()
-            
             # Extract the transforms from build items - these are our target positions
-            import re
             item_pattern = r'<item\s+objectid="[^"]+"\s+transform="([^"]+)"'
             build_transforms = re.findall(item_pattern, model_content)
             
@@ -787,27 +1005,19 @@ class ThreeMFProcessor:
                 new_content = content + "\n" + new_assemble_section
             else:
                 logger.info("Replacing existing assemble section")
-                new_content = re.sub(assemble_pattern, new_assemble_section, content, flags=re.DOTALL)
+                new_content = re.sub(assemble_pattern, lambda _: new_assemble_section, content, flags=re.DOTALL)
             
             logger.info(f"Updated metadata length: {len(new_content)} characters")
-            
-            # Write the updated metadata back
-            with open(model_settings_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            
             logger.info(f"STEP assembly metadata updated: {object_count} instances with synchronized transforms")
+            return new_content
             
         except Exception as e:
             logger.error(f"Failed to update STEP assembly metadata: {e}")
             raise
     
-    def _update_standard_metadata(self, model_settings_path: str, output_dir: str, object_count: int, positions: List[Tuple[float, float]], bounds: Dict[str, float]):
+    def _update_standard_metadata(self, content: str, object_count: int, positions: List[Tuple[float, float]], bounds: Dict[str, float]) -> str:
         """Update metadata for STL files (standard approach)"""
         try:
-            # Read the current metadata
-            with open(model_settings_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
             # Get the original Z position from bounds
             original_z = bounds.get('min_z', 0.0)
             
@@ -821,17 +1031,14 @@ class ThreeMFProcessor:
             new_assemble_section = f"<assemble>\n{chr(10).join(new_assemble_items)}\n  </assemble>"
             
             # Replace the assemble section
-            import re
             assemble_pattern = r'<assemble>.*?</assemble>'
-            new_content = re.sub(assemble_pattern, new_assemble_section, content, flags=re.DOTALL)
-            
-            # Write the updated metadata back
-            with open(model_settings_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            new_content = re.sub(assemble_pattern, lambda _: new_assemble_section, content, flags=re.DOTALL)
             
             logger.info(f"Standard metadata updated: {object_count} items")
+            return new_content
             
         except Exception as e:
             logger.error(f"Failed to update standard metadata: {e}")
             # Don't raise for STL files
+            return content
             pass
\ No newline at end of file
@@ -29,6 +29,8 @@ from src.services.printer_connection_service import initialize_printer_connectio
 from src.services.startup_service import startup_service
 from src.services.live_job_sync_service import live_job_sync_service
 from src.services.print_job_sync_service import print_job_sync_service
+from src.services.fleet_observer_service import fleet_observer_service
+from src.services.job_lifecycle_service import job_lifecycle_service
 from src.services.tunnel_service import initialize_tunnel_service, shutdown_tunnel_service, get_tunnel_service
 from src.services.shopify_order_sync_service import initialize_shopify_sync_service, start_shopify_sync_service, stop_shopify_sync_service, get_shopify_sync_service
 
@@ -59,6 +61,9 @@ async def lifespan(app: FastAPI):
         # Initialize database service
         db_service = await get_database_service()
         logger.info("Database service initialized")
+
+        # Start the write-behind writer for printer connection status
+        await printer_manager.status_writer.start(db_service.database_path)
         
         # Initialize startup service (job queue and resource monitoring)
         try:
@@ -186,7 +191,7 @@ async def lifespan(app: FastAPI):
             except FileNotFoundError:
                 logger.warning("No printers configuration file found, starting with empty configuration")
         
-        # Start live job sync service
+        # Start live job sync service (subscribes to job lifecycle events)
         try:
             await live_job_sync_service.start()
             logger.info("Live job sync service started")
@@ -194,6 +199,13 @@ async def lifespan(app: FastAPI):
             logger.error(f"Failed to start live job sync service: {e}")
             # Continue startup even if sync service fails
         
+        # Start job lifecycle event engine after its subscribers are registered
+        try:
+            await job_lifecycle_service.start()
+            logger.info("Job lifecycle service started")
+        except Exception as e:
+            logger.error(f"Failed to start job lifecycle service: {e}")
+        
         # Start print job status synchronizer service
         try:
             await print_job_sync_service.start()
@@ -202,6 +214,13 @@ async def lifespan(app: FastAPI):
             logger.error(f"Failed to start print job sync service: {e}")
             # Continue startup even if sync service fails
         
+        # Start fleet observer (single live status poll feeding both job sync services)
+        try:
+            await fleet_observer_service.start()
+            logger.info("Fleet observer service started")
+        except Exception as e:
+            logger.error(f"Failed to start fleet observer service: {e}")
+        
         logger.info("Bambu Program API started successfully")
         
     except Exception as e:
@@ -214,6 +233,27 @@ async def lifespan(app: FastAPI):
     try:
         logger.info("Shutting down Bambu Program API...")
         
+        # Stop shared live status producers
+        try:
+            await websocket.manager.shutdown()
+            logger.info("Live status broadcasters stopped")
+        except Exception as e:
+            logger.error(f"Error stopping live status broadcasters: {e}")
+        
+        # Shutdown fleet observer before its subscribers
+        try:
+            await fleet_observer_service.stop()
+            logger.info("Fleet observer service shutdown complete")
+        except Exception as e:
+            logger.error(f"Error shutting down fleet observer service: {e}")
+        
+        # Shutdown job lifecycle events before their subscribers
+        try:
+            await job_lifecycle_service.stop()
+            logger.info("Job lifecycle service shutdown complete")
+        except Exception as e:
+            logger.error(f"Error shutting down job lifecycle service: {e}")
+        
         # Shutdown print job sync service
         try:
             await print_job_sync_service.stop()
@@ -292,6 +332,13 @@ async def lifespan(app: FastAPI):
                 logger.info(f"Disconnected from printer {printer_id}")
             except Exception as e:
                 logger.error(f"Error disconnecting from printer {printer_id}: {e}")
+
+        # Flush connection status changes queued by the disconnects above
+        try:
+            await printer_manager.status_writer.stop()
+            logger.info("Connection status writer shutdown complete")
+        except Exception as e:
+            logger.error(f"Error shutting down connection status writer: {e}")
         
         logger.info("Bambu Program API shutdown complete")
         
@@ -12,6 +12,10 @@ from .database import (
     Product,
     ProductSku,
     PrintFile,
+    PrintFileMetadata,
+    PrintFilePlate,
+    SlicedFile,
+    QueuedJobRecord,
     PrintJob,
     FinishedGoods,
     AssemblyTask,
@@ -27,6 +31,10 @@ __all__ = [
     'Product',
     'ProductSku',
     'PrintFile',
+    'PrintFileMetadata',
+    'PrintFilePlate',
+    'SlicedFile',
+    'QueuedJobRecord',
     'PrintJob',
     'FinishedGoods',
     'AssemblyTask',
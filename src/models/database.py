@@ -681,6 +681,114 @@ class PrintFile(Base):
         )
 
 
+class PrintFileMetadata(Base):
+    """
+    Local cache of metadata parsed from 3MF print files
+    Keyed by SHA-256 of the file contents so identical uploads share one entry
+    """
+    __tablename__ = 'print_file_metadata'
+
+    # Primary key
+    content_hash = Column(String(64), primary_key=True)  # SHA-256 hex digest of the file
+
+    file_size_bytes = Column(Integer, nullable=False)
+    file_path = Column(Text)  # Last path this content was seen at
+    file_mtime_ns = Column(Integer)  # mtime of file_path when it was last verified
+    parser_version = Column(Integer, nullable=False)  # METADATA_PARSER_VERSION that produced metadata_json
+    metadata_json = Column(Text, nullable=False)  # parse_3mf_metadata() result as JSON
+
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    # Table constraints
+    __table_args__ = (
+        Index('idx_print_file_metadata_path', 'file_path'),
+    )
+
+
+class PrintFilePlate(Base):
+    """
+    Per-plate index of a cached 3MF print file
+    One row per plate, keyed like print_file_metadata by content hash
+    """
+    __tablename__ = 'print_file_plates'
+
+    # Composite primary key
+    content_hash = Column(String(64), primary_key=True)  # print_file_metadata.content_hash
+    plate_index = Column(Integer, primary_key=True)  # 1-based plate number
+
+    # Plate information
+    object_count = Column(Integer)
+    print_time_seconds = Column(Integer)
+    filament_weight_grams = Column(Float)
+    layer_count = Column(Integer)
+    gcode_member = Column(Text)  # Archive member holding the plate G-code, null if unsliced
+    filaments_json = Column(Text)  # [{slot, type, color, used_g, used_m}, ...]
+    thumbnails_json = Column(Text)  # {kind: {member, offset, compressed_size, size, compression}}
+
+
+
+class SlicedFile(Base):
+    """
+    Index of sliced .gcode.3mf outputs kept on disk for re-download
+    Files live in the sliced file store directory as <id>.gcode.3mf
+    """
+    __tablename__ = 'sliced_files'
+
+    # Primary key
+    id = Column(String(36), primary_key=True)  # UUID, also the download id
+
+    filename = Column(Text, nullable=False)  # Download filename
+    file_path = Column(Text, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    source = Column(String(50))  # Endpoint that produced it, e.g. 'slice', 'multiply-slice'
+    pinned = Column(Boolean, default=False, nullable=False)  # Pinned files are never evicted
+
+    access_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_accessed_at = Column(DateTime, default=datetime.utcnow)
+
+    # Table constraints
+    __table_args__ = (
+        Index('idx_sliced_files_eviction', 'pinned', 'last_accessed_at'),
+    )
+
+
+class QueuedJobRecord(Base):
+    """
+    Durable copy of a JobQueueService job, so queued and interrupted jobs
+    survive a restart. Jobs name a registered handler instead of holding a
+    function reference; processing jobs hold a lease renewed by heartbeat.
+    """
+    __tablename__ = 'queued_jobs'
+
+    # Primary key
+    id = Column(String(36), primary_key=True)  # UUID, the queue job id
+
+    job_type = Column(String(50), nullable=False)  # Lane, e.g. 'print_start', 'general'
+    handler = Column(String(100), nullable=False)  # Registered handler name
+    priority = Column(Integer, nullable=False)  # JobPriority value
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String(20), nullable=False)  # queued, processing, completed, failed, cancelled
+    retry_count = Column(Integer, default=0, nullable=False)
+    max_retries = Column(Integer, default=3, nullable=False)
+    error_message = Column(Text)
+
+    available_at = Column(DateTime)  # Earliest start for a backed-off retry
+    lease_owner = Column(String(32))  # Worker holding a processing job
+    lease_expires_at = Column(DateTime)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+
+    # Table constraints
+    __table_args__ = (
+        Index('idx_queued_jobs_status', 'status', 'lease_expires_at'),
+    )
+
+
 class PrintJob(Base):
     """
     Local SQLite model for print_jobs table
@@ -224,6 +224,7 @@ class LivePrintStatus(BaseModel):
     progress: Optional[PrintProgress] = Field(None, description="Print progress")
     temperatures: TemperatureStatus = Field(..., description="Live temperature readings")
     light_on: bool = Field(default=False, description="Whether chamber light is on")
+    stale: bool = Field(default=False, description="True if the printer missed the snapshot deadline and this is its last-known status")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Status timestamp")
 
 class LiveStatusUpdate(BaseModel):
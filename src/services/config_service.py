@@ -157,6 +157,18 @@ class ConfigService:
         
         return self.config_data.get('logging', {})
     
+    def get_performance_config(self) -> Dict[str, Any]:
+        """
+        Get performance configuration
+        
+        Returns:
+            Performance configuration
+        """
+        if not self.config_data:
+            self.load_config()
+        
+        return self.config_data.get('performance', {})
+    
     def set_tenant_info(self, tenant_id: str, tenant_name: str = None) -> bool:
         """
         Set tenant information in configuration
@@ -296,7 +308,15 @@ class ConfigService:
                 'path': 'data/tenant.db',
                 'backup_enabled': True,
                 'backup_interval_hours': 24,
-                'cleanup_logs_after_days': 7
+                'cleanup_logs_after_days': 7,
+                'sqlite': {
+                    'journal_mode': 'WAL',
+                    'synchronous': 'NORMAL',
+                    'mmap_size_mb': 64,
+                    'cache_size_kb': 8192,
+                    'temp_store': 'MEMORY',
+                    'busy_timeout_ms': 30000
+                }
             },
             'logging': {
                 'level': 'INFO',
@@ -314,7 +334,46 @@ class ConfigService:
             'performance': {
                 'max_concurrent_syncs': 3,
                 'batch_size': 100,
-                'connection_pool_size': 5
+                'connection_pool_size': 5,
+                'cpu_pool': {
+                    'mode': 'process',
+                    'workers': 2
+                },
+                'slicing': {
+                    'max_concurrent': 1,
+                    'nice': 10,
+                    'cpu_cores': None
+                },
+                'sliced_files': {
+                    'max_size_mb': 4096,
+                    'ttl_hours': 2,
+                    'directory': '~/orcaslicer-temp/sliced-files'
+                },
+                'uploads': {
+                    'max_file_size_mb': 512
+                },
+                'printer_connect': {
+                    'max_parallel': 8,
+                    'jitter_seconds': 2.0
+                },
+                'resource_monitor': {
+                    'sample_interval_seconds': 2.0,
+                    'max_staleness_seconds': 5.0,
+                    'hysteresis_percent': 5.0,
+                    'throttle_thresholds': {
+                        'logging': {'cpu_percent': 95, 'memory_percent': 95},
+                        'printer_poll': {'cpu_percent': 85, 'memory_percent': 85}
+                    }
+                },
+                'slice_cache': {
+                    'enabled': True,
+                    'max_size_mb': 2048,
+                    'directory': '~/orcaslicer-temp/slice-cache'
+                },
+                'sync_logs': {
+                    'batch_size': 200,
+                    'flush_interval_seconds': 2.0
+                }
             }
         }
     
@@ -8,16 +8,19 @@ import logging
 import uuid
 from pathlib import Path
 from contextlib import asynccontextmanager
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable
 from datetime import datetime, timezone
 
 from sqlalchemy import create_engine, text, select
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, selectinload
+from sqlalchemy.orm.instrumentation import manager_of_class
 from sqlalchemy.exc import SQLAlchemyError
 
-from ..models.database import Base, Printer, ColorPreset, BuildPlateType, SyncLog, Product, ProductSku, PrintFile, PrintJob, FinishedGoods, AssemblyTask, WorklistTask
+from ..models.database import Base, Printer, ColorPreset, BuildPlateType, Product, ProductSku, PrintFile, PrintJob, FinishedGoods, AssemblyTask, WorklistTask
 from .config_service import get_config_service
+from .sync_log_writer import SyncLogWriter
+from ..utils.sqlite_profile import get_sqlite_profile
 
 # Import for Supabase client configuration
 try:
@@ -50,6 +53,7 @@ class DatabaseService:
         
         self.database_path = database_path
         self.database_url = f"sqlite+aiosqlite:///{database_path}"
+        self.sqlite_profile = get_sqlite_profile()
         
         # Create async engine with foreign key enforcement
         self.engine = create_async_engine(
@@ -59,7 +63,7 @@ class DatabaseService:
             pool_pre_ping=True,
             connect_args={
                 "check_same_thread": False,
-                "timeout": 30,  # 30 second timeout prevents infinite waits on database locks
+                "timeout": self.sqlite_profile.busy_timeout_seconds,  # prevents infinite waits on database locks
             },
         )
         
@@ -75,13 +79,14 @@ class DatabaseService:
         
         @event.listens_for(self.engine.sync_engine, "connect")
         def set_sqlite_pragma(dbapi_connection, connection_record):
-            """Enable foreign key constraints for SQLite connections"""
-            cursor = dbapi_connection.cursor()
-            cursor.execute("PRAGMA foreign_keys=ON")
-            cursor.close()
+            """Apply the SQLite connection profile (including foreign keys) to every connection"""
+            self.sqlite_profile.apply(dbapi_connection)
+        
+        # Sync log rows are buffered and written in batches
+        self.sync_log_writer = SyncLogWriter(self)
         
         logger.info(f"Database service initialized with path: {database_path}")
-        logger.info("Foreign key constraints will be enabled for all database connections")
+        logger.info(f"SQLite connection profile: {', '.join(self.sqlite_profile.pragmas())}")
     
     async def initialize_database(self):
         """
@@ -94,6 +99,8 @@ class DatabaseService:
                 await conn.run_sync(Base.metadata.create_all)
             logger.info("Database tables initialized successfully with foreign key constraints enabled")
 
+            await self.check_sqlite_profile()
+
             # Run migrations
             await self.migrate_add_filament_level()
             await self.migrate_add_print_file_unique_constraint()
@@ -112,10 +119,47 @@ class DatabaseService:
             logger.error(f"Failed to initialize database: {e}")
             raise
     
+    async def check_sqlite_profile(self) -> Dict[str, Any]:
+        """
+        Read the pragmas a pooled connection is actually running with and
+        compare them against the configured profile
+
+        Returns:
+            Dict with the active pragmas and any mismatches
+        """
+        active = {}
+        async with self.engine.connect() as conn:
+            for pragma in self.sqlite_profile.expected():
+                result = await conn.execute(text(f"PRAGMA {pragma}"))
+                row = result.fetchone()
+                active[pragma] = row[0] if row else None
+
+        mismatches = self.sqlite_profile.mismatches(active)
+        logger.info("Active SQLite pragmas: " + ", ".join(f"{k}={v}" for k, v in active.items()))
+        for pragma, values in mismatches.items():
+            logger.warning(f"SQLite pragma {pragma} is {values['active']}, expected {values['expected']}")
+
+        return {"active": active, "mismatches": mismatches}
+
+    async def checkpoint(self):
+        """
+        Fold the write-ahead log back into the main database file so the
+        file can be copied on its own (backups). No-op outside WAL mode.
+        """
+        if self.sqlite_profile.journal_mode != "WAL":
+            return
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        except Exception as e:
+            logger.warning(f"WAL checkpoint failed: {e}")
+
     async def close(self):
         """
         Close database connections
         """
+        if hasattr(self, 'sync_log_writer'):
+            await self.sync_log_writer.close()
         if hasattr(self, 'engine'):
             await self.engine.dispose()
             logger.info("Database connections closed")
@@ -134,6 +178,60 @@ class DatabaseService:
             finally:
                 await session.close()
     
+    async def _load_models(self, model, where: str, params: Dict[str, Any], order_by: str = None,
+                           fields: Optional[Iterable[str]] = None, limit: int = None) -> List:
+        """
+        Bulk-load detached model instances for a list query
+
+        Values come back exactly as SQLite stores them, as with the previous
+        SELECT * loaders, but instances are filled in one dict update per row
+        instead of an instrumented setattr per column.
+
+        Args:
+            model: Model class to hydrate (Printer, PrintJob, ...)
+            where: SQL condition (without WHERE)
+            params: Bind parameters for the condition
+            order_by: SQL ordering (without ORDER BY)
+            fields: Columns to load; the primary key is always included and
+                columns not requested read as None. None loads every column.
+            limit: Maximum number of rows
+
+        Returns:
+            List of model instances
+        """
+        columns = self._projection(model, fields) if fields is not None else None
+        query = f"SELECT {', '.join(columns) if columns else '*'} FROM {model.__tablename__} WHERE {where}"
+        if order_by:
+            query += f" ORDER BY {order_by}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+
+        async with self.get_session() as session:
+            result = await session.execute(text(query), params)
+            columns = list(result.keys())
+            rows = result.fetchall()
+
+        new_instance = manager_of_class(model).new_instance
+        instances = []
+        for row in rows:
+            instance = new_instance()
+            instance.__dict__.update(zip(columns, row))
+            instances.append(instance)
+        return instances
+
+    def _projection(self, model, fields: Iterable[str]) -> List[str]:
+        """
+        Resolve requested fields to table columns, always including the primary key
+        """
+        table_columns = list(model.__table__.columns.keys())
+        requested = set(fields)
+        unknown = requested - set(table_columns)
+        if unknown:
+            raise ValueError(f"Unknown {model.__tablename__} columns: {', '.join(sorted(unknown))}")
+
+        primary_keys = {column.name for column in model.__table__.primary_key.columns}
+        return [column for column in table_columns if column in requested or column in primary_keys]
+
     # Printer operations
     
     async def get_printer_by_id(self, printer_id: str) -> Optional[Printer]:
@@ -148,51 +246,35 @@ class DatabaseService:
             logger.error(f"Failed to get printer {printer_id}: {e}")
             return None
     
-    async def get_printers_by_tenant(self, tenant_id: str) -> List[Printer]:
+    async def get_printers_by_tenant(self, tenant_id: str, fields: Optional[Iterable[str]] = None) -> List[Printer]:
         """
         Get all active printers for a tenant
         """
         try:
-            async with self.get_session() as session:
-                result = await session.execute(
-                    text("SELECT * FROM printers WHERE tenant_id = :tenant_id AND is_active = 1 ORDER BY sort_order"),
-                    {"tenant_id": tenant_id}
-                )
-                rows = result.fetchall()
-
-                printers = []
-                for row in rows:
-                    printer = Printer()
-                    for column in row._fields:
-                        setattr(printer, column, getattr(row, column))
-                    printers.append(printer)
-
-                return printers
+            return await self._load_models(
+                Printer,
+                where="tenant_id = :tenant_id AND is_active = 1",
+                params={"tenant_id": tenant_id},
+                order_by="sort_order",
+                fields=fields
+            )
         except Exception as e:
             logger.error(f"Failed to get printers for tenant {tenant_id}: {e}")
             return []
 
-    async def get_all_printers_by_tenant(self, tenant_id: str) -> List[Printer]:
+    async def get_all_printers_by_tenant(self, tenant_id: str, fields: Optional[Iterable[str]] = None) -> List[Printer]:
         """
         Get ALL printers for a tenant (including inactive ones)
         Used for calculating next printer_id to avoid UNIQUE constraint violations
         """
         try:
-            async with self.get_session() as session:
-                result = await session.execute(
-                    text("SELECT * FROM printers WHERE tenant_id = :tenant_id ORDER BY sort_order"),
-                    {"tenant_id": tenant_id}
-                )
-                rows = result.fetchall()
-
-                printers = []
-                for row in rows:
-                    printer = Printer()
-                    for column in row._fields:
-                        setattr(printer, column, getattr(row, column))
-                    printers.append(printer)
-
-                return printers
+            return await self._load_models(
+                Printer,
+                where="tenant_id = :tenant_id",
+                params={"tenant_id": tenant_id},
+                order_by="sort_order",
+                fields=fields
+            )
         except Exception as e:
             logger.error(f"Failed to get all printers for tenant {tenant_id}: {e}")
             return []
@@ -337,26 +419,18 @@ class DatabaseService:
             logger.error(f"Failed to get color preset {preset_id}: {e}")
             return None
     
-    async def get_color_presets_by_tenant(self, tenant_id: str) -> List[ColorPreset]:
+    async def get_color_presets_by_tenant(self, tenant_id: str, fields: Optional[Iterable[str]] = None) -> List[ColorPreset]:
         """
         Get all color presets for a tenant
         """
         try:
-            async with self.get_session() as session:
-                result = await session.execute(
-                    text("SELECT * FROM color_presets WHERE tenant_id = :tenant_id ORDER BY color_name"),
-                    {"tenant_id": tenant_id}
-                )
-                rows = result.fetchall()
-                
-                presets = []
-                for row in rows:
-                    preset = ColorPreset()
-                    for column in row._fields:
-                        setattr(preset, column, getattr(row, column))
-                    presets.append(preset)
-                
-                return presets
+            return await self._load_models(
+                ColorPreset,
+                where="tenant_id = :tenant_id",
+                params={"tenant_id": tenant_id},
+                order_by="color_name",
+                fields=fields
+            )
         except Exception as e:
             logger.error(f"Failed to get color presets for tenant {tenant_id}: {e}")
             return []
@@ -481,26 +555,18 @@ class DatabaseService:
             logger.error(f"Failed to get build plate type {build_plate_id}: {e}")
             return None
 
-    async def get_build_plate_types_by_tenant(self, tenant_id: str) -> List[BuildPlateType]:
+    async def get_build_plate_types_by_tenant(self, tenant_id: str, fields: Optional[Iterable[str]] = None) -> List[BuildPlateType]:
         """
         Get all build plate types for a tenant
         """
         try:
-            async with self.get_session() as session:
-                result = await session.execute(
-                    text("SELECT * FROM build_plate_types WHERE tenant_id = :tenant_id ORDER BY name"),
-                    {"tenant_id": tenant_id}
-                )
-                rows = result.fetchall()
-
-                build_plates = []
-                for row in rows:
-                    build_plate = BuildPlateType()
-                    for column in row._fields:
-                        setattr(build_plate, column, getattr(row, column))
-                    build_plates.append(build_plate)
-
-                return build_plates
+            return await self._load_models(
+                BuildPlateType,
+                where="tenant_id = :tenant_id",
+                params={"tenant_id": tenant_id},
+                order_by="name",
+                fields=fields
+            )
         except Exception as e:
             logger.error(f"Failed to get build plate types for tenant {tenant_id}: {e}")
             return []
@@ -631,11 +697,23 @@ class DatabaseService:
             logger.error(f"Failed to get product {product_id}: {e}")
             return None
     
-    async def get_products_by_tenant(self, tenant_id: str) -> List[Product]:
+    async def get_products_by_tenant(self, tenant_id: str, fields: Optional[Iterable[str]] = None) -> List[Product]:
         """
         Get all active products for a tenant with print_files relationship loaded
+
+        When fields is given only those columns are loaded and print_files is
+        not, for callers that only need a few product columns.
         """
         try:
+            if fields is not None:
+                return await self._load_models(
+                    Product,
+                    where="tenant_id = :tenant_id AND is_active = 1",
+                    params={"tenant_id": tenant_id},
+                    order_by="name",
+                    fields=fields
+                )
+
             async with self.get_session() as session:
                 stmt = (
                     select(Product)
@@ -777,50 +855,34 @@ class DatabaseService:
             logger.error(f"Failed to get product SKU {sku_id}: {e}")
             return None
     
-    async def get_product_skus_by_tenant(self, tenant_id: str) -> List[ProductSku]:
+    async def get_product_skus_by_tenant(self, tenant_id: str, fields: Optional[Iterable[str]] = None) -> List[ProductSku]:
         """
         Get all active product SKUs for a tenant
         """
         try:
-            async with self.get_session() as session:
-                result = await session.execute(
-                    text("SELECT * FROM product_skus WHERE tenant_id = :tenant_id AND is_active = 1 ORDER BY sku"),
-                    {"tenant_id": tenant_id}
-                )
-                rows = result.fetchall()
-                
-                skus = []
-                for row in rows:
-                    sku = ProductSku()
-                    for column in row._fields:
-                        setattr(sku, column, getattr(row, column))
-                    skus.append(sku)
-                
-                return skus
+            return await self._load_models(
+                ProductSku,
+                where="tenant_id = :tenant_id AND is_active = 1",
+                params={"tenant_id": tenant_id},
+                order_by="sku",
+                fields=fields
+            )
         except Exception as e:
             logger.error(f"Failed to get product SKUs for tenant {tenant_id}: {e}")
             return []
     
-    async def get_product_skus_by_product(self, product_id: str) -> List[ProductSku]:
+    async def get_product_skus_by_product(self, product_id: str, fields: Optional[Iterable[str]] = None) -> List[ProductSku]:
         """
         Get all active SKUs for a specific product
         """
         try:
-            async with self.get_session() as session:
-                result = await session.execute(
-                    text("SELECT * FROM product_skus WHERE product_id = :product_id AND is_active = 1 ORDER BY sku"),
-                    {"product_id": product_id}
-                )
-                rows = result.fetchall()
-                
-                skus = []
-                for row in rows:
-                    sku = ProductSku()
-                    for column in row._fields:
-                        setattr(sku, column, getattr(row, column))
-                    skus.append(sku)
-                
-                return skus
+            return await self._load_models(
+                ProductSku,
+                where="product_id = :product_id AND is_active = 1",
+                params={"product_id": product_id},
+                order_by="sku",
+                fields=fields
+            )
         except Exception as e:
             logger.error(f"Failed to get SKUs for product {product_id}: {e}")
             return []
@@ -926,50 +988,34 @@ class DatabaseService:
             logger.error(f"Failed to get print file {file_id}: {e}")
             return None
     
-    async def get_print_files_by_tenant(self, tenant_id: str) -> List[PrintFile]:
+    async def get_print_files_by_tenant(self, tenant_id: str, fields: Optional[Iterable[str]] = None) -> List[PrintFile]:
         """
         Get all print files for a tenant
         """
         try:
-            async with self.get_session() as session:
-                result = await session.execute(
-                    text("SELECT * FROM print_files WHERE tenant_id = :tenant_id ORDER BY name"),
-                    {"tenant_id": tenant_id}
-                )
-                rows = result.fetchall()
-
-                files = []
-                for row in rows:
-                    file = PrintFile()
-                    for column in row._fields:
-                        setattr(file, column, getattr(row, column))
-                    files.append(file)
-
-                return files
+            return await self._load_models(
+                PrintFile,
+                where="tenant_id = :tenant_id",
+                params={"tenant_id": tenant_id},
+                order_by="name",
+                fields=fields
+            )
         except Exception as e:
             logger.error(f"Failed to get print files for tenant {tenant_id}: {e}")
             return []
 
-    async def get_print_files_by_product(self, product_id: str) -> List[PrintFile]:
+    async def get_print_files_by_product(self, product_id: str, fields: Optional[Iterable[str]] = None) -> List[PrintFile]:
         """
         Get all print files for a product (supports multiple files per product)
         """
         try:
-            async with self.get_session() as session:
-                result = await session.execute(
-                    text("SELECT * FROM print_files WHERE product_id = :product_id ORDER BY printer_model_id"),
-                    {"product_id": product_id}
-                )
-                rows = result.fetchall()
-
-                files = []
-                for row in rows:
-                    file = PrintFile()
-                    for column in row._fields:
-                        setattr(file, column, getattr(row, column))
-                    files.append(file)
-
-                return files
+            return await self._load_models(
+                PrintFile,
+                where="product_id = :product_id",
+                params={"product_id": product_id},
+                order_by="printer_model_id",
+                fields=fields
+            )
         except Exception as e:
             logger.error(f"Failed to get print files for product {product_id}: {e}")
             return []
@@ -986,24 +1032,13 @@ class DatabaseService:
             PrintFile if found, None otherwise
         """
         try:
-            async with self.get_session() as session:
-                result = await session.execute(
-                    text("""
-                        SELECT * FROM print_files
-                        WHERE product_id = :product_id
-                        AND printer_model_id = :printer_model_id
-                        LIMIT 1
-                    """),
-                    {"product_id": product_id, "printer_model_id": printer_model_id}
-                )
-                row = result.fetchone()
-
-                if row:
-                    file = PrintFile()
-                    for column in row._fields:
-                        setattr(file, column, getattr(row, column))
-                    return file
-                return None
+            files = await self._load_models(
+                PrintFile,
+                where="product_id = :product_id AND printer_model_id = :printer_model_id",
+                params={"product_id": product_id, "printer_model_id": printer_model_id},
+                limit=1
+            )
+            return files[0] if files else None
         except Exception as e:
             logger.error(f"Failed to get print file for product {product_id} and model {printer_model_id}: {e}")
             return None
@@ -1019,24 +1054,13 @@ class DatabaseService:
             PrintFile with NULL printer_model_id if found, None otherwise
         """
         try:
-            async with self.get_session() as session:
-                result = await session.execute(
-                    text("""
-                        SELECT * FROM print_files
-                        WHERE product_id = :product_id
-                        AND printer_model_id IS NULL
-                        LIMIT 1
-                    """),
-                    {"product_id": product_id}
-                )
-                row = result.fetchone()
-
-                if row:
-                    file = PrintFile()
-                    for column in row._fields:
-                        setattr(file, column, getattr(row, column))
-                    return file
-                return None
+            files = await self._load_models(
+                PrintFile,
+                where="product_id = :product_id AND printer_model_id IS NULL",
+                params={"product_id": product_id},
+                limit=1
+            )
+            return files[0] if files else None
         except Exception as e:
             logger.error(f"Failed to get default print file for product {product_id}: {e}")
             return None
@@ -1176,26 +1200,18 @@ class DatabaseService:
             logger.error(f"Failed to get print job {job_id}: {e}")
             return None
     
-    async def get_print_jobs_by_tenant(self, tenant_id: str) -> List[PrintJob]:
+    async def get_print_jobs_by_tenant(self, tenant_id: str, fields: Optional[Iterable[str]] = None) -> List[PrintJob]:
         """
         Get all print jobs for a tenant
         """
         try:
-            async with self.get_session() as session:
-                result = await session.execute(
-                    text("SELECT * FROM print_jobs WHERE tenant_id = :tenant_id ORDER BY time_submitted DESC"),
-                    {"tenant_id": tenant_id}
-                )
-                rows = result.fetchall()
-                
-                jobs = []
-                for row in rows:
-                    job = PrintJob()
-                    for column in row._fields:
-                        setattr(job, column, getattr(row, column))
-                    jobs.append(job)
-                
-                return jobs
+            return await self._load_models(
+                PrintJob,
+                where="tenant_id = :tenant_id",
+                params={"tenant_id": tenant_id},
+                order_by="time_submitted DESC",
+                fields=fields
+            )
         except Exception as e:
             logger.error(f"Failed to get print jobs for tenant {tenant_id}: {e}")
             return []
@@ -1231,26 +1247,18 @@ class DatabaseService:
             logger.error(f"Failed to create print job: {e}")
             return None
 
-    async def get_print_jobs_by_status(self, tenant_id: str, status: str) -> List[PrintJob]:
+    async def get_print_jobs_by_status(self, tenant_id: str, status: str, fields: Optional[Iterable[str]] = None) -> List[PrintJob]:
         """
         Get print jobs by status
         """
         try:
-            async with self.get_session() as session:
-                result = await session.execute(
-                    text("SELECT * FROM print_jobs WHERE tenant_id = :tenant_id AND status = :status ORDER BY priority DESC, time_submitted"),
-                    {"tenant_id": tenant_id, "status": status}
-                )
-                rows = result.fetchall()
-                
-                jobs = []
-                for row in rows:
-                    job = PrintJob()
-                    for column in row._fields:
-                        setattr(job, column, getattr(row, column))
-                    jobs.append(job)
-                
-                return jobs
+            return await self._load_models(
+                PrintJob,
+                where="tenant_id = :tenant_id AND status = :status",
+                params={"tenant_id": tenant_id, "status": status},
+                order_by="priority DESC, time_submitted",
+                fields=fields
+            )
         except Exception as e:
             logger.error(f"Failed to get print jobs by status {status}: {e}")
             return []
@@ -1443,19 +1451,19 @@ class DatabaseService:
     ):
         """
         Log sync operation for monitoring and debugging
+        
+        The row is buffered and written with the next batch (see
+        SyncLogWriter); call sync_log_writer.flush() to write it now.
         """
         try:
-            async with self.get_session() as session:
-                sync_log = SyncLog(
-                    operation_type=operation_type,
-                    table_name=table_name,
-                    record_id=record_id,
-                    tenant_id=tenant_id,
-                    status=status,
-                    error_message=error_message
-                )
-                session.add(sync_log)
-                await session.commit()
+            self.sync_log_writer.add(
+                operation_type=operation_type,
+                table_name=table_name,
+                record_id=record_id,
+                tenant_id=tenant_id,
+                status=status,
+                error_message=error_message
+            )
         except Exception as e:
             # Don't let logging failures break the main operation
             logger.error(f"Failed to log sync operation: {e}")
@@ -1465,39 +1473,19 @@ class DatabaseService:
         Get synchronization statistics
         """
         try:
+            # Recent sync activity and last sync time come from the log writer's rollup
+            rollup = await self.sync_log_writer.get_rollup()
+            
             async with self.get_session() as session:
-                # Get recent sync activity
-                recent_logs = await session.execute(
-                    text("""
-                        SELECT operation_type, status, COUNT(*) as count
-                        FROM sync_logs 
-                        WHERE created_at >= datetime('now', '-1 hour')
-                        GROUP BY operation_type, status
-                        ORDER BY count DESC
-                    """)
-                )
-                
                 # Get total printer count
                 printer_count = await session.execute(
                     text("SELECT COUNT(*) FROM printers WHERE is_active = 1")
                 )
                 
-                # Get last sync time
-                last_sync = await session.execute(
-                    text("SELECT MAX(created_at) FROM sync_logs WHERE status = 'SUCCESS'")
-                )
-                
                 return {
                     'total_printers': printer_count.scalar() or 0,
-                    'last_sync': last_sync.scalar(),
-                    'recent_activity': [
-                        {
-                            'operation': row[0],
-                            'status': row[1],
-                            'count': row[2]
-                        } 
-                        for row in recent_logs.fetchall()
-                    ]
+                    'last_sync': rollup['last_sync'],
+                    'recent_activity': rollup['recent_activity']
                 }
         except Exception as e:
             logger.error(f"Failed to get sync stats: {e}")
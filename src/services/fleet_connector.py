@@ -0,0 +1,223 @@
+"""
+Fleet Connector
+Connects many printers at once for database syncs. Each connect can spend
+3s on the TCP pre-check, 30s in client.connect and 10s verifying MQTT, so
+connecting a farm one printer at a time after a power blip takes minutes.
+
+A bounded number of connects run in parallel, each starting after a random
+delay so the printers are not all hit at the same instant. Per-printer
+circuit breakers are honoured (an open breaker skips the printer instead of
+spending an attempt), and starts are paced to stay inside the connection
+manager's global attempt budget. Progress and the per-printer outcome of
+the current and last run are kept for /sync/printer-connections.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..core.connection_manager import connection_manager
+
+logger = logging.getLogger(__name__)
+
+class ConnectOutcome(Enum):
+    PENDING = "pending"
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    ALREADY_CONNECTED = "already_connected"
+    FAILED = "failed"
+    CIRCUIT_OPEN = "circuit_open"
+
+FINAL_OUTCOMES = (ConnectOutcome.CONNECTED, ConnectOutcome.ALREADY_CONNECTED,
+                  ConnectOutcome.FAILED, ConnectOutcome.CIRCUIT_OPEN)
+
+@dataclass
+class PrinterConnectResult:
+    """Outcome of one printer in a fleet connect run"""
+    key: str
+    name: Optional[str]
+    outcome: ConnectOutcome = ConnectOutcome.PENDING
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def finish(self, outcome: ConnectOutcome, error: Optional[str] = None):
+        self.outcome = outcome
+        self.error = error
+        self.finished_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        breaker = connection_manager.circuit_breakers.get(self.key)
+        duration = None
+        if self.started_at is not None:
+            duration = round((self.finished_at or time.monotonic()) - self.started_at, 1)
+        return {
+            "key": self.key,
+            "name": self.name,
+            "outcome": self.outcome.value,
+            "error": self.error,
+            "duration_seconds": duration,
+            "circuit_state": breaker.state.value if breaker else None
+        }
+
+@dataclass
+class FleetConnectRun:
+    """Progress of one fleet connect"""
+    user_action: bool = False
+    printers: Dict[str, PrinterConnectResult] = field(default_factory=dict)
+    started_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+
+    def count(self, *outcomes: ConnectOutcome) -> int:
+        return sum(1 for result in self.printers.values() if result.outcome in outcomes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or datetime.now()
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": round((end - self.started_at).total_seconds(), 1),
+            "user_action": self.user_action,
+            "total": len(self.printers),
+            "completed": self.count(*FINAL_OUTCOMES),
+            "outcomes": {outcome.value: self.count(outcome) for outcome in ConnectOutcome},
+            "printers": [result.to_dict() for result in self.printers.values()]
+        }
+
+class FleetConnector:
+    """Bounded, jittered parallel printer connects"""
+
+    def __init__(self):
+        self.max_parallel = 8
+        self.jitter_seconds = 2.0
+        self.current_run: Optional[FleetConnectRun] = None
+        self.last_run: Optional[FleetConnectRun] = None
+        self._in_flight = 0
+        self._configured = False
+
+    def configure(self, connect_config: Optional[Dict[str, Any]]):
+        """Apply the performance.printer_connect config block (max_parallel, jitter_seconds)"""
+        connect_config = connect_config or {}
+        try:
+            self.max_parallel = max(1, int(connect_config.get('max_parallel', self.max_parallel)))
+            self.jitter_seconds = max(0.0, float(connect_config.get('jitter_seconds', self.jitter_seconds)))
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid printer connect config {connect_config}, keeping max_parallel={self.max_parallel}, "
+                           f"jitter_seconds={self.jitter_seconds}")
+
+    def _ensure_configured(self):
+        if self._configured:
+            return
+        from .config_service import get_config_service
+        self.configure(get_config_service().get_performance_config().get('printer_connect'))
+        self._configured = True
+
+    async def run(self, targets: List[Tuple[str, Optional[str]]],
+                  connect: Callable[[str], Awaitable[Optional[str]]],
+                  already_connected: List[Tuple[str, Optional[str]]] = (),
+                  user_action: bool = False) -> FleetConnectRun:
+        """
+        Connect a set of printers in parallel
+
+        Args:
+            targets: (printer_key, name) pairs to connect
+            connect: Connects one printer by key; returns None on success or
+                an error message
+            already_connected: (printer_key, name) pairs reported as-is
+            user_action: Let breakers past their cooldown through, as for a
+                manual reconnect
+
+        Returns:
+            The finished run with a per-printer outcome
+        """
+        self._ensure_configured()
+        run = FleetConnectRun(user_action=user_action)
+        for key, name in already_connected:
+            run.printers[key] = PrinterConnectResult(key, name, ConnectOutcome.ALREADY_CONNECTED)
+        for key, name in targets:
+            run.printers[key] = PrinterConnectResult(key, name)
+
+        self.current_run = run
+        logger.info(f"Connecting {len(targets)} printers, {self.max_parallel} at a time "
+                    f"({len(already_connected)} already connected)")
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        try:
+            await asyncio.gather(*(
+                self._connect_one(run.printers[key], connect, semaphore, user_action)
+                for key, _ in targets
+            ))
+        finally:
+            run.finished_at = datetime.now()
+            self.current_run = None
+            self.last_run = run
+
+        logger.info(f"Fleet connect finished in {(run.finished_at - run.started_at).total_seconds():.1f}s: "
+                    f"{run.count(ConnectOutcome.CONNECTED)} connected, {run.count(ConnectOutcome.FAILED)} failed, "
+                    f"{run.count(ConnectOutcome.CIRCUIT_OPEN)} skipped (circuit open)")
+        return run
+
+    async def _connect_one(self, result: PrinterConnectResult,
+                           connect: Callable[[str], Awaitable[Optional[str]]],
+                           semaphore: asyncio.Semaphore, user_action: bool):
+        if self.jitter_seconds:
+            await asyncio.sleep(random.uniform(0, self.jitter_seconds))
+
+        async with semaphore:
+            breaker = connection_manager.get_circuit_breaker(result.key)
+            if not breaker.can_execute(user_action):
+                result.finish(ConnectOutcome.CIRCUIT_OPEN, f"Circuit breaker is {breaker.state.value}")
+                logger.info(f"Skipping printer {result.key}: circuit breaker is {breaker.state.value}")
+                return
+
+            await self._reserve_attempt(result.key)
+            result.outcome = ConnectOutcome.CONNECTING
+            result.started_at = time.monotonic()
+            try:
+                error = await connect(result.key)
+            except Exception as e:
+                error = str(e)
+            finally:
+                self._in_flight -= 1
+
+            if error is None:
+                result.finish(ConnectOutcome.CONNECTED)
+            else:
+                result.finish(ConnectOutcome.FAILED, error)
+
+    async def _reserve_attempt(self, printer_key: str):
+        """Wait until the global attempt budget has room, counting connects in flight"""
+        while True:
+            # Connects go through printer_manager.connect_printer, which checks the user-action limit
+            wait = connection_manager.get_global_wait(pending=self._in_flight, user_action=True)
+            if wait <= 0:
+                self._in_flight += 1
+                return
+            logger.debug(f"Printer {printer_key} waiting {wait:.1f}s for global connection budget")
+            await asyncio.sleep(wait)
+
+    def get_progress(self) -> Dict[str, Any]:
+        """Get settings and the current and last run"""
+        self._ensure_configured()
+        return {
+            "max_parallel": self.max_parallel,
+            "jitter_seconds": self.jitter_seconds,
+            "in_progress": self.current_run is not None,
+            "in_flight": self._in_flight,
+            "current_run": self.current_run.to_dict() if self.current_run else None,
+            "last_run": self.last_run.to_dict() if self.last_run else None
+        }
+
+    def get_outcome(self, printer_key: str) -> Optional[str]:
+        """Outcome of a printer in the current (or else last) run"""
+        for run in (self.current_run, self.last_run):
+            if run and printer_key in run.printers:
+                return run.printers[printer_key].outcome.value
+        return None
+
+# Global fleet connector instance
+fleet_connector = FleetConnector()
@@ -0,0 +1,133 @@
+"""
+Fleet Observer Service
+
+Single polling pipeline for live printer status. Each tick takes one fleet
+snapshot via printer_manager.get_all_live_status() and hands it to every
+subscriber in turn.
+
+Key Features:
+- One fleet poll per tick, shared by all job sync consumers
+- Subscribers run sequentially, so they never write print_jobs concurrently
+- A failing subscriber is logged and does not affect the others
+- print_jobs_lock serializes snapshot delivery with job lifecycle event
+  handling; the snapshot is taken while holding it, so subscribers never
+  write data older than a lifecycle update that already went through
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..core.printer_client import printer_manager
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class FleetSnapshot:
+    """Live status of every configured printer at one point in time"""
+    seq: int
+    taken_at: datetime
+    statuses: List[Dict[str, Any]]
+    by_printer: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def get(self, printer_id: str) -> Optional[Dict[str, Any]]:
+        """Get the status for one printer, or None if it is not in the snapshot"""
+        return self.by_printer.get(str(printer_id))
+
+FleetSubscriber = Callable[[FleetSnapshot], Awaitable[None]]
+
+class FleetObserverService:
+    """
+    Polls the fleet once per interval and publishes the snapshot to subscribers
+    """
+
+    def __init__(self):
+        self.is_running = False
+        self.observe_task: Optional[asyncio.Task] = None
+        self.observe_interval = 10  # seconds between fleet snapshots
+        self.subscribers: Dict[str, FleetSubscriber] = {}  # name -> callback, called in subscription order
+        self.latest_snapshot: Optional[FleetSnapshot] = None
+        self.seq = 0
+        # Held by every job sync writer of print_jobs (snapshot subscribers and lifecycle handlers)
+        self.print_jobs_lock = asyncio.Lock()
+
+    def subscribe(self, name: str, callback: FleetSubscriber):
+        """Register a consumer; re-subscribing under the same name replaces it"""
+        self.subscribers[name] = callback
+        logger.info(f"Fleet observer subscriber registered: {name}")
+
+    def unsubscribe(self, name: str):
+        """Remove a consumer"""
+        if self.subscribers.pop(name, None):
+            logger.info(f"Fleet observer subscriber removed: {name}")
+
+    async def start(self):
+        """Start the fleet observation loop"""
+        if self.is_running:
+            logger.warning("Fleet observer service is already running")
+            return
+
+        self.is_running = True
+        self.observe_task = asyncio.create_task(self._observe_loop())
+        logger.info("Fleet observer service started")
+
+    async def stop(self):
+        """Stop the fleet observation loop"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        if self.observe_task:
+            self.observe_task.cancel()
+            try:
+                await self.observe_task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Fleet observer service stopped")
+
+    async def _observe_loop(self):
+        """Main observation loop"""
+        while self.is_running:
+            try:
+                await self.observe_once()
+                await asyncio.sleep(self.observe_interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in fleet observer loop: {e}")
+                await asyncio.sleep(self.observe_interval)
+
+    async def observe_once(self) -> Optional[FleetSnapshot]:
+        """Take one fleet snapshot and deliver it to every subscriber"""
+        if not self.subscribers:
+            logger.debug("No fleet observer subscribers, skipping snapshot")
+            return None
+
+        async with self.print_jobs_lock:
+            return await self._observe_locked()
+
+    async def _observe_locked(self) -> FleetSnapshot:
+        statuses = await printer_manager.get_all_live_status()
+
+        self.seq += 1
+        snapshot = FleetSnapshot(
+            seq=self.seq,
+            taken_at=datetime.now(timezone.utc),
+            statuses=statuses,
+            by_printer={str(status.get("printer_id")): status for status in statuses if status.get("printer_id")}
+        )
+        self.latest_snapshot = snapshot
+        logger.debug(f"Fleet snapshot {snapshot.seq}: {len(statuses)} printers")
+
+        for name, callback in list(self.subscribers.items()):
+            try:
+                await callback(snapshot)
+            except Exception as e:
+                logger.error(f"Fleet observer subscriber {name} failed on snapshot {snapshot.seq}: {e}", exc_info=True)
+
+        return snapshot
+
+# Global service instance
+fleet_observer_service = FleetObserverService()
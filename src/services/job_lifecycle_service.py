@@ -0,0 +1,252 @@
+"""
+Job Lifecycle Service
+
+Event-driven detection of print job transitions. Every MQTT report published
+to the printer state store is run through a small per-printer state machine
+keyed on gcode_state, and lifecycle events are emitted as soon as the
+transition arrives instead of being found by interval diffing.
+
+Key Features:
+- job_started, layer_advanced, paused, resumed, finished and failed events
+- Events are dispatched in arrival order by a single task, one at a time
+- Handlers subscribe per event type and are isolated from each other's errors
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..core.printer_client import printer_manager
+from ..core.printer_state_store import PrinterStateSnapshot
+
+logger = logging.getLogger(__name__)
+
+class JobLifecycleEventType(Enum):
+    JOB_STARTED = "job_started"
+    LAYER_ADVANCED = "layer_advanced"
+    PAUSED = "paused"
+    RESUMED = "resumed"
+    FINISHED = "finished"
+    FAILED = "failed"
+
+class JobPhase(Enum):
+    IDLE = "idle"
+    PRINTING = "printing"
+    PAUSED = "paused"
+    FINISHED = "finished"
+    FAILED = "failed"
+
+# Raw Bambu gcode_state values (upper-cased) mapped to lifecycle phases
+GCODE_STATE_PHASES = {
+    "RUNNING": JobPhase.PRINTING,
+    "PREPARE": JobPhase.PRINTING,
+    "PRINTING": JobPhase.PRINTING,
+    "PAUSE": JobPhase.PAUSED,
+    "PAUSED": JobPhase.PAUSED,
+    "FINISH": JobPhase.FINISHED,
+    "FINISHED": JobPhase.FINISHED,
+    "FAILED": JobPhase.FAILED,
+}
+
+ACTIVE_PHASES = (JobPhase.PRINTING, JobPhase.PAUSED)
+
+@dataclass
+class JobLifecycleEvent:
+    """A print job transition on one printer"""
+    event_type: JobLifecycleEventType
+    printer_id: str
+    filename: str
+    print_id: str = ""
+    status: str = "printing"
+    progress_percentage: float = 0.0
+    current_layer: Optional[int] = None
+    total_layers: Optional[int] = None
+    remaining_time: Optional[int] = None
+    raw_gcode_state: str = ""
+    error_code: int = 0
+    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+@dataclass
+class PrinterJobTracker:
+    """Last observed job state for one printer"""
+    phase: JobPhase = JobPhase.IDLE
+    filename: str = ""
+    print_id: str = ""
+    progress_percentage: float = 0.0
+    current_layer: int = 0
+    total_layers: int = 0
+    remaining_time: Optional[int] = None
+
+JobLifecycleHandler = Callable[[JobLifecycleEvent], Awaitable[None]]
+
+class JobLifecycleService:
+    """
+    Turns printer state snapshots into job lifecycle events
+    """
+
+    def __init__(self):
+        self.is_running = False
+        self.dispatch_task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.event_queue: Optional[asyncio.Queue] = None
+        self.trackers: Dict[str, PrinterJobTracker] = {}  # printer_id -> tracker
+        self.handlers: Dict[JobLifecycleEventType, List[JobLifecycleHandler]] = {
+            event_type: [] for event_type in JobLifecycleEventType
+        }
+
+    def subscribe(self, event_type: JobLifecycleEventType, handler: JobLifecycleHandler):
+        """Register an async handler for one event type"""
+        if handler not in self.handlers[event_type]:
+            self.handlers[event_type].append(handler)
+
+    def unsubscribe(self, event_type: JobLifecycleEventType, handler: JobLifecycleHandler):
+        """Remove a handler for one event type"""
+        if handler in self.handlers[event_type]:
+            self.handlers[event_type].remove(handler)
+
+    async def start(self):
+        """Start listening to printer state and dispatching events"""
+        if self.is_running:
+            logger.warning("Job lifecycle service is already running")
+            return
+
+        self.loop = asyncio.get_running_loop()
+        self.event_queue = asyncio.Queue()
+        self.is_running = True
+        self.dispatch_task = asyncio.create_task(self._dispatch_loop())
+        printer_manager.state_store.add_listener(self._on_snapshot)
+
+        # Pick up jobs already in progress from reports received before startup
+        for snapshot in printer_manager.state_store.get_all():
+            self.observe(snapshot.printer_id, snapshot.print_data)
+
+        logger.info("Job lifecycle service started")
+
+    async def stop(self):
+        """Stop listening and drain the dispatcher"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        printer_manager.state_store.remove_listener(self._on_snapshot)
+        if self.dispatch_task:
+            self.dispatch_task.cancel()
+            try:
+                await self.dispatch_task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Job lifecycle service stopped")
+
+    def _on_snapshot(self, snapshot: PrinterStateSnapshot):
+        """State store listener - may run on a paho MQTT thread"""
+        if self.is_running and self.loop:
+            self.loop.call_soon_threadsafe(self.observe, snapshot.printer_id, snapshot.print_data)
+
+    def observe(self, printer_id: str, print_data: Dict[str, Any]) -> List[JobLifecycleEvent]:
+        """Advance the printer's state machine with one report and queue any events"""
+        raw_state = print_data.get("gcode_state")
+        if not isinstance(raw_state, str):
+            return []
+
+        raw_state = raw_state.upper()
+        phase = GCODE_STATE_PHASES.get(raw_state, JobPhase.IDLE)
+        filename = print_data.get("gcode_file") or ""
+        tracker = self.trackers.setdefault(printer_id, PrinterJobTracker())
+        events: List[JobLifecycleEvent] = []
+
+        def emit(event_type: JobLifecycleEventType, status: str):
+            events.append(JobLifecycleEvent(
+                event_type=event_type,
+                printer_id=printer_id,
+                filename=tracker.filename,
+                print_id=tracker.print_id,
+                status=status,
+                progress_percentage=tracker.progress_percentage,
+                current_layer=tracker.current_layer or None,
+                total_layers=tracker.total_layers or None,
+                remaining_time=tracker.remaining_time,
+                raw_gcode_state=raw_state,
+                error_code=print_data.get("mc_print_error_code", 0) or 0
+            ))
+
+        # A different file while still active means the previous job ended unseen
+        if tracker.phase in ACTIVE_PHASES and phase in ACTIVE_PHASES and filename and filename != tracker.filename:
+            emit(JobLifecycleEventType.FAILED, "idle")
+            tracker.phase = JobPhase.IDLE
+
+        if phase in ACTIVE_PHASES:
+            if tracker.phase not in ACTIVE_PHASES:
+                if not filename:
+                    return []
+                tracker.filename = filename
+                tracker.print_id = str(print_data.get("task_id", "") or "")
+                tracker.progress_percentage = 0.0
+                tracker.current_layer = 0
+                self._update_progress(tracker, print_data)
+                emit(JobLifecycleEventType.JOB_STARTED, phase.value)
+                if phase == JobPhase.PAUSED:
+                    emit(JobLifecycleEventType.PAUSED, phase.value)
+            else:
+                previous_layer = tracker.current_layer
+                self._update_progress(tracker, print_data)
+                if phase != tracker.phase:
+                    emit(JobLifecycleEventType.PAUSED if phase == JobPhase.PAUSED else JobLifecycleEventType.RESUMED, phase.value)
+                elif phase == JobPhase.PRINTING and tracker.current_layer > previous_layer:
+                    emit(JobLifecycleEventType.LAYER_ADVANCED, phase.value)
+        elif tracker.phase in ACTIVE_PHASES:
+            # Terminal report: progress may already be reset, so keep the last active values
+            self._update_progress(tracker, print_data, allow_decrease=False)
+            if phase == JobPhase.FINISHED:
+                emit(JobLifecycleEventType.FINISHED, phase.value)
+            else:
+                # FAILED, or printer went back to IDLE (stopped/cancelled)
+                emit(JobLifecycleEventType.FAILED, phase.value)
+
+        tracker.phase = phase
+
+        for event in events:
+            logger.debug(f"Job lifecycle event {event.event_type.value} on printer {printer_id}: {event.filename}")
+            self.event_queue.put_nowait(event)
+
+        return events
+
+    def _update_progress(self, tracker: PrinterJobTracker, print_data: Dict[str, Any], allow_decrease: bool = True):
+        """Copy progress fields from a report into the tracker"""
+        try:
+            progress = float(print_data.get("mc_percent", tracker.progress_percentage) or 0)
+            layer = int(print_data.get("layer_num", tracker.current_layer) or 0)
+            total_layers = int(print_data.get("total_layer_num", tracker.total_layers) or 0)
+        except (TypeError, ValueError):
+            return
+
+        if allow_decrease or progress > tracker.progress_percentage:
+            tracker.progress_percentage = progress
+        if allow_decrease or layer > tracker.current_layer:
+            tracker.current_layer = layer
+        if total_layers:
+            tracker.total_layers = total_layers
+
+        remaining = print_data.get("mc_remaining_time")
+        if allow_decrease and isinstance(remaining, (int, float)):
+            tracker.remaining_time = int(remaining * 60) if remaining else None
+
+    async def _dispatch_loop(self):
+        """Deliver queued events to handlers in order"""
+        while self.is_running:
+            try:
+                event = await self.event_queue.get()
+                for handler in list(self.handlers[event.event_type]):
+                    try:
+                        await handler(event)
+                    except Exception as e:
+                        logger.error(f"Job lifecycle handler failed for {event.event_type.value} on printer {event.printer_id}: {e}", exc_info=True)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in job lifecycle dispatch loop: {e}")
+
+# Global service instance
+job_lifecycle_service = JobLifecycleService()
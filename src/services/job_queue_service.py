@@ -1,16 +1,36 @@
 """
 Job queue management service to prevent resource conflicts and ensure orderly processing
+
+Each job type has its own lane: a heap ordered by priority, then by arrival,
+with a concurrency limit tracked by a counter. The dispatcher sleeps until
+something can change (a job is added, finishes, or a retry becomes due)
+instead of polling, so a job in an idle lane starts immediately. Failed
+jobs are retried with exponential backoff.
+
+Jobs are persisted in the queued_jobs table and name a handler registered
+with @job_handler rather than holding a function, so queued work survives
+a restart. Started jobs hold a lease that a heartbeat renews. On startup
+queued jobs are replayed. A job whose lease lapsed (it was running when the
+process died) runs again only if its handler was registered with
+replay_interrupted=True; otherwise it is marked failed, since running it
+twice may repeat side effects such as starting a print.
 """
 
 import asyncio
+import heapq
+import itertools
+import json
 import logging
 import time
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any, Set, Union
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 import uuid
 
+from sqlalchemy import text
+
+from .database_service import get_database_service
 from ..utils.resource_monitor import resource_monitor
 
 logger = logging.getLogger(__name__)
@@ -28,6 +48,49 @@ class JobPriority(Enum):
     HIGH = 3
     URGENT = 4
 
+# Registered job handlers by name (see job_handler)
+_JOB_HANDLERS: Dict[str, Callable] = {}
+
+# Handlers that are safe to run again after being interrupted part way
+_REPLAY_INTERRUPTED: Set[str] = set()
+
+def job_handler(name: str, replay_interrupted: bool = False):
+    """
+    Register an async function as a named job handler
+
+    Jobs store the handler name, so a queued job can be replayed after a
+    restart as long as the module registering its handler is imported at
+    startup.
+
+    Args:
+        name: Handler name stored with each job
+        replay_interrupted: Run a job again if it was interrupted while
+            running (crash or lost lease). Only for idempotent handlers;
+            otherwise such jobs are marked failed.
+    """
+    def register(func: Callable) -> Callable:
+        existing = _JOB_HANDLERS.get(name)
+        if existing is not None and existing is not func:
+            raise ValueError(f"Job handler '{name}' is already registered")
+        _JOB_HANDLERS[name] = func
+        if replay_interrupted:
+            _REPLAY_INTERRUPTED.add(name)
+        else:
+            _REPLAY_INTERRUPTED.discard(name)
+        return func
+    return register
+
+def _handler_name(handler: Union[str, Callable]) -> str:
+    """Resolve a handler (name or registered function) to its registered name"""
+    if isinstance(handler, str):
+        if handler not in _JOB_HANDLERS:
+            raise ValueError(f"No job handler registered as '{handler}'")
+        return handler
+    for name, func in _JOB_HANDLERS.items():
+        if func is handler:
+            return name
+    raise ValueError(f"Job handler {getattr(handler, '__name__', handler)} is not registered; use @job_handler")
+
 @dataclass
 class QueuedJob:
     """Represents a job in the processing queue"""
@@ -36,6 +99,7 @@ class QueuedJob:
     priority: JobPriority
     payload: Dict[str, Any]
     callback: Callable
+    handler: str = ""  # Registered handler name
     created_at: datetime = field(default_factory=datetime.now)
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
@@ -43,25 +107,56 @@ class QueuedJob:
     error_message: Optional[str] = None
     retry_count: int = 0
     max_retries: int = 3
+    retry_at: Optional[float] = None  # time.monotonic() when a backed-off retry is due
 
 class JobQueueService:
     """
     Manages job queues to prevent resource conflicts and ensure orderly processing
     """
     
+    # Retry backoff: base * 2^(retry - 1), capped
+    RETRY_BASE_DELAY = 2.0
+    RETRY_MAX_DELAY = 60.0
+    
+    # How long to wait before re-checking resources when they are constrained
+    RESOURCE_RECHECK_INTERVAL = 30.0
+    
+    # Processing jobs hold a lease for LEASE_SECONDS, renewed every HEARTBEAT_INTERVAL
+    LEASE_SECONDS = 30
+    HEARTBEAT_INTERVAL = 10.0
+    
+    # Finished jobs are kept in queued_jobs this long
+    HISTORY_RETENTION = timedelta(days=7)
+    
     def __init__(self):
-        self.job_queues: Dict[str, List[QueuedJob]] = {
+        # Lanes: heaps of (-priority, sequence, job)
+        self.job_queues: Dict[str, List[tuple]] = {
             "3mf_processing": [],
             "slicing": [],
             "print_start": [],
             "general": []
         }
         self.active_jobs: Dict[str, QueuedJob] = {}
+        self.active_counts: Dict[str, int] = {name: 0 for name in self.job_queues}
         self.completed_jobs: List[QueuedJob] = []
         self.max_completed_history = 10  # CRITICAL: Reduced from 100 to 10 to prevent memory leak
         self.processing_task: Optional[asyncio.Task] = None
         self.is_running = False
         
+        # Jobs waiting out a retry backoff: heap of (retry_at, sequence, job)
+        self.retry_jobs: List[tuple] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._job_tasks: set = set()
+        
+        # Durable queue state
+        self.worker_id = uuid.uuid4().hex
+        self._finished_updates: List[Dict[str, Any]] = []
+        self.heartbeat_task: Optional[asyncio.Task] = None
+        self.replayed_jobs = 0
+        self.reclaimed_jobs = 0
+        self.interrupted_jobs_failed = 0
+        
         # Resource limits for concurrent jobs
         self.max_concurrent_jobs = {
             "3mf_processing": 1,  # Only one 3MF processing at a time (resource intensive)
@@ -76,25 +171,44 @@ class JobQueueService:
             return
             
         self.is_running = True
+        self._wakeup = asyncio.Event()
+        try:
+            await self._replay_jobs()
+        except Exception as e:
+            logger.error(f"Failed to replay persisted jobs: {e}")
         self.processing_task = asyncio.create_task(self._process_queue())
+        self.heartbeat_task = asyncio.create_task(self._heartbeat_loop())
         logger.info("Job queue service started")
         
     async def stop(self):
-        """Stop the job queue processing"""
+        """Stop the job queue processing
+        
+        Jobs still running keep their rows in processing; their leases lapse
+        and the next start handles them as interrupted (see job_handler).
+        """
         self.is_running = False
-        if self.processing_task:
-            self.processing_task.cancel()
-            try:
-                await self.processing_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self.processing_task, self.heartbeat_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        await self._flush_finished()
         logger.info("Job queue service stopped")
         
+    def _notify(self):
+        """Wake the dispatcher"""
+        self._wakeup.set()
+        
+    def _enqueue(self, job: QueuedJob):
+        heapq.heappush(self.job_queues[job.job_type], (-job.priority.value, next(self._sequence), job))
+        
     async def add_job(
         self, 
         job_type: str, 
         payload: Dict[str, Any], 
-        callback: Callable,
+        handler: Union[str, Callable],
         priority: JobPriority = JobPriority.NORMAL,
         max_retries: int = 3
     ) -> str:
@@ -103,42 +217,63 @@ class JobQueueService:
         
         Args:
             job_type: Type of job (determines which queue to use)
-            payload: Job data/parameters
-            callback: Async function to execute for this job
+            payload: Job data/parameters (JSON-serializable; replayed jobs
+                receive it decoded from JSON)
+            handler: Name of a handler registered with @job_handler, or the
+                registered function itself
             priority: Job priority
             max_retries: Maximum number of retry attempts
             
         Returns:
             Job ID for tracking
         """
-        # Validate job type
-        if job_type not in self.job_queues:
-            job_type = "general"
-            
-        job_id = str(uuid.uuid4())
-        job = QueuedJob(
-            id=job_id,
-            job_type=job_type,
-            priority=priority,
-            payload=payload,
-            callback=callback,
-            max_retries=max_retries
-        )
+        return (await self.add_jobs([{
+            "job_type": job_type,
+            "payload": payload,
+            "handler": handler,
+            "priority": priority,
+            "max_retries": max_retries
+        }]))[0]
         
-        # Insert job in priority order
-        queue = self.job_queues[job_type]
-        inserted = False
-        for i, existing_job in enumerate(queue):
-            if job.priority.value > existing_job.priority.value:
-                queue.insert(i, job)
-                inserted = True
-                break
-                
-        if not inserted:
-            queue.append(job)
+    async def add_jobs(self, jobs: List[Dict[str, Any]]) -> List[str]:
+        """
+        Add several jobs, persisting them in one transaction
+        
+        Args:
+            jobs: Dicts of add_job arguments (job_type, payload, handler,
+                optional priority and max_retries)
             
-        logger.info(f"Added job {job_id} to {job_type} queue (priority: {priority.name}, queue size: {len(queue)})")
-        return job_id
+        Returns:
+            Job IDs, in the order given
+        """
+        created = []
+        for spec in jobs:
+            # Validate job type
+            job_type = spec["job_type"] if spec["job_type"] in self.job_queues else "general"
+            handler = _handler_name(spec["handler"])
+            created.append(QueuedJob(
+                id=str(uuid.uuid4()),
+                job_type=job_type,
+                priority=spec.get("priority", JobPriority.NORMAL),
+                payload=spec["payload"],
+                callback=_JOB_HANDLERS[handler],
+                handler=handler,
+                max_retries=spec.get("max_retries", 3)
+            ))
+        
+        try:
+            await self._persist_new(created)
+        except Exception as e:
+            # Keep accepting work; it just won't survive a restart
+            logger.error(f"Failed to persist {len(created)} queued jobs: {e}")
+        
+        for job in created:
+            # Insert job in priority order (FIFO within a priority)
+            self._enqueue(job)
+            logger.info(f"Added job {job.id} to {job.job_type} queue (priority: {job.priority.name}, "
+                        f"queue size: {len(self.job_queues[job.job_type])})")
+        self._notify()
+        return [job.id for job in created]
         
     async def cancel_job(self, job_id: str) -> bool:
         """
@@ -155,14 +290,19 @@ class JobQueueService:
             logger.warning(f"Cannot cancel job {job_id}: already processing")
             return False
             
-        # Find and remove from queues
-        for queue_name, queue in self.job_queues.items():
-            for i, job in enumerate(queue):
+        # Find and remove from queues (including jobs waiting to retry)
+        for queue_name, queue in list(self.job_queues.items()) + [("retry", self.retry_jobs)]:
+            for i, entry in enumerate(queue):
+                job = entry[2]
                 if job.id == job_id:
                     job.status = JobStatus.CANCELLED
                     job.completed_at = datetime.now()
+                    job.retry_at = None
                     self.completed_jobs.append(job)
-                    del queue[i]
+                    queue[i] = queue[-1]
+                    queue.pop()
+                    heapq.heapify(queue)
+                    await self._persist_finished(job)
                     logger.info(f"Cancelled job {job_id} from {queue_name} queue")
                     return True
                     
@@ -195,9 +335,10 @@ class JobQueueService:
             
         # Check queued jobs
         for queue_name, queue in self.job_queues.items():
-            for job in queue:
+            for entry in queue:
+                job = entry[2]
                 if job.id == job_id:
-                    position = queue.index(job) + 1
+                    position = sum(1 for other in queue if other[:2] < entry[:2]) + 1
                     return {
                         "id": job.id,
                         "status": job.status.value,
@@ -208,6 +349,21 @@ class JobQueueService:
                         "retry_count": job.retry_count
                     }
                     
+        # Check jobs waiting out a retry backoff
+        for _, _, job in self.retry_jobs:
+            if job.id == job_id:
+                return {
+                    "id": job.id,
+                    "status": job.status.value,
+                    "job_type": job.job_type,
+                    "priority": job.priority.name,
+                    "queue_position": None,
+                    "retry_in_seconds": round(max(0.0, job.retry_at - time.monotonic()), 1),
+                    "created_at": job.created_at.isoformat(),
+                    "retry_count": job.retry_count,
+                    "error_message": job.error_message
+                }
+                    
         # Check completed jobs
         for job in self.completed_jobs:
             if job.id == job_id:
@@ -236,7 +392,8 @@ class JobQueueService:
         for queue_name, queue in self.job_queues.items():
             queue_info[queue_name] = {
                 "queued_count": len(queue),
-                "active_count": len([j for j in self.active_jobs.values() if j.job_type == queue_name]),
+                "retry_waiting_count": sum(1 for _, _, job in self.retry_jobs if job.job_type == queue_name),
+                "active_count": self.active_counts[queue_name],
                 "max_concurrent": self.max_concurrent_jobs[queue_name]
             }
             
@@ -244,6 +401,9 @@ class JobQueueService:
             "is_running": self.is_running,
             "total_active_jobs": len(self.active_jobs),
             "total_completed_jobs": len(self.completed_jobs),
+            "replayed_jobs": self.replayed_jobs,
+            "reclaimed_jobs": self.reclaimed_jobs,
+            "interrupted_jobs_failed": self.interrupted_jobs_failed,
             "queue_details": queue_info,
             "resource_status": self._get_resource_status()
         }
@@ -258,7 +418,8 @@ class JobQueueService:
                 "reason": reason if not is_safe else None,
                 "cpu_percent": resources.cpu_percent,
                 "memory_percent": resources.memory_percent,
-                "memory_available_mb": resources.memory_available_mb
+                "memory_available_mb": resources.memory_available_mb,
+                "sampler": resource_monitor.get_stats()
             }
         except Exception as e:
             return {
@@ -270,56 +431,97 @@ class JobQueueService:
             }
         
     async def _process_queue(self):
-        """Main queue processing loop"""
+        """Main queue processing loop: dispatch what can run, then sleep until something changes"""
         logger.info("Started job queue processing loop")
         
         while self.is_running:
             try:
-                # Check if system resources are available
-                is_safe, reason = resource_monitor.check_resources_safe("Job queue processing")
-                if not is_safe:
-                    logger.warning(f"Delaying job processing due to resource constraints: {reason}")
-                    await asyncio.sleep(30)  # Wait 30 seconds before retrying (increased from 10s)
-                    continue
-                    
-                # Process each queue type
-                for queue_name, queue in self.job_queues.items():
-                    if not queue:
-                        continue
-                        
-                    # Check if we can start more jobs of this type
-                    active_count = len([j for j in self.active_jobs.values() if j.job_type == queue_name])
-                    max_concurrent = self.max_concurrent_jobs[queue_name]
-                    
-                    if active_count >= max_concurrent:
-                        continue
-                        
-                    # Get the highest priority job
-                    job = queue.pop(0)
-                    
-                    # Start processing the job
-                    asyncio.create_task(self._process_job(job))
-                    
-                await asyncio.sleep(5)  # Check every 5 seconds (reduced from 1s to save CPU)
+                # Clear before dispatching so a notify during dispatch is not lost
+                self._wakeup.clear()
+                timeout = await self._dispatch()
                 
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in job queue processing loop: {e}")
                 await asyncio.sleep(5)  # Wait before retrying
                 
         logger.info("Job queue processing loop stopped")
         
+    async def _dispatch(self) -> Optional[float]:
+        """
+        Start every job that has a free slot in its lane
+        
+        Returns:
+            Seconds until the loop must run again without a wakeup (next
+            retry due or resource re-check), or None to wait for a wakeup
+        """
+        await self._flush_finished()
+        
+        # Move retries whose backoff has elapsed back into their lanes
+        now = time.monotonic()
+        while self.retry_jobs and self.retry_jobs[0][0] <= now:
+            _, _, job = heapq.heappop(self.retry_jobs)
+            job.retry_at = None
+            self._enqueue(job)
+        next_retry = self.retry_jobs[0][0] - now if self.retry_jobs else None
+        
+        if not any(self.job_queues.values()):
+            return next_retry
+            
+        # Check if system resources are available
+        is_safe, reason = resource_monitor.check_resources_safe("Job queue processing")
+        if not is_safe:
+            logger.warning(f"Delaying job processing due to resource constraints: {reason}")
+            return self.RESOURCE_RECHECK_INTERVAL
+            
+        started = []
+        for queue_name, queue in self.job_queues.items():
+            max_concurrent = self.max_concurrent_jobs[queue_name]
+            while queue and self.active_counts[queue_name] < max_concurrent:
+                # Get the highest priority job
+                _, _, job = heapq.heappop(queue)
+                job.status = JobStatus.PROCESSING
+                job.started_at = datetime.now()
+                self.active_jobs[job.id] = job
+                self.active_counts[job.job_type] += 1
+                started.append(job)
+        
+        if started:
+            # Take leases for the whole batch in one transaction, before any job can finish
+            try:
+                await self._persist_started(started)
+            except Exception as e:
+                logger.error(f"Failed to record lease for {len(started)} jobs: {e}")
+            for job in started:
+                self._start_job(job)
+                
+        return next_retry
+        
+    def _start_job(self, job: QueuedJob):
+        """Run a job already marked active"""
+        task = asyncio.create_task(self._process_job(job))
+        self._job_tasks.add(task)
+        task.add_done_callback(self._job_tasks.discard)
+        
+    def _retry_delay(self, retry_count: int) -> float:
+        """Backoff before retry number retry_count (1-based)"""
+        return min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * (2 ** (retry_count - 1)))
+        
     async def _process_job(self, job: QueuedJob):
         """
         Process a single job
         
         Args:
-            job: Job to process
+            job: Job to process (already marked active by _start_job)
         """
-        job.status = JobStatus.PROCESSING
-        job.started_at = datetime.now()
-        self.active_jobs[job.id] = job
-        
         logger.info(f"Starting job {job.id} ({job.job_type}, attempt {job.retry_count + 1})")
+        cancelled = False
         
         try:
             # Execute the job callback
@@ -330,6 +532,14 @@ class JobQueueService:
             job.completed_at = datetime.now()
             logger.info(f"Job {job.id} completed successfully")
             
+        except asyncio.CancelledError:
+            # The job may have stopped part way through. Its row keeps the lease,
+            # which is no longer renewed; once it lapses the job is handled like
+            # one interrupted by a crash (see _reclaim_expired_leases).
+            logger.warning(f"Job {job.id} was cancelled while running")
+            cancelled = True
+            raise
+            
         except Exception as e:
             logger.error(f"Job {job.id} failed: {e}")
             job.error_message = str(e)
@@ -337,25 +547,29 @@ class JobQueueService:
             
             # Check if we should retry
             if job.retry_count <= job.max_retries:
-                logger.info(f"Retrying job {job.id} (attempt {job.retry_count + 1}/{job.max_retries + 1})")
-                # Reset job status and re-queue it
+                delay = self._retry_delay(job.retry_count)
+                logger.info(f"Retrying job {job.id} in {delay:.0f}s (attempt {job.retry_count + 1}/{job.max_retries + 1})")
+                # Reset job status and hold it until its backoff has elapsed
                 job.status = JobStatus.QUEUED
                 job.started_at = None
-                job.error_message = None
-                
-                # Add back to queue (at the end for fairness)
-                self.job_queues[job.job_type].append(job)
+                job.retry_at = time.monotonic() + delay
+                heapq.heappush(self.retry_jobs, (job.retry_at, next(self._sequence), job))
             else:
                 logger.error(f"Job {job.id} failed permanently after {job.retry_count} attempts")
                 job.status = JobStatus.FAILED
                 job.completed_at = datetime.now()
                 
         finally:
-            # Remove from active jobs if completed or failed permanently
+            # Free the lane slot whatever happened
+            self.active_jobs.pop(job.id, None)
+            self.active_counts[job.job_type] -= 1
+            
+            # Written by the dispatcher, batched with other jobs that finished meanwhile
+            if not cancelled:
+                self._finished_updates.append(self._finish_params(job))
+            self._notify()
+            
             if job.status in [JobStatus.COMPLETED, JobStatus.FAILED]:
-                if job.id in self.active_jobs:
-                    del self.active_jobs[job.id]
-                    
                 # Add to completed jobs history
                 # Clear payload data to free memory before storing
                 job.payload = {"cleared": True, "original_size": len(str(job.payload))}
@@ -372,5 +586,254 @@ class JobQueueService:
                         old_job.callback = None
                     self.completed_jobs = self.completed_jobs[-self.max_completed_history:]
 
+    # Persistence
+    
+    async def _persist_new(self, jobs: List[QueuedJob]):
+        """Insert new jobs in one transaction"""
+        now = datetime.utcnow()
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            await session.execute(
+                text("""
+                    INSERT INTO queued_jobs
+                        (id, job_type, handler, priority, payload, status, retry_count, max_retries, created_at)
+                    VALUES (:id, :job_type, :handler, :priority, :payload, 'queued', 0, :max_retries, :now)
+                """),
+                [{"id": job.id, "job_type": job.job_type, "handler": job.handler,
+                  "priority": job.priority.value, "payload": json.dumps(job.payload, default=str),
+                  "max_retries": job.max_retries, "now": now} for job in jobs]
+            )
+            await session.commit()
+    
+    async def _persist_started(self, jobs: List[QueuedJob]):
+        """Mark a dispatched batch processing and lease it to this worker"""
+        now = datetime.utcnow()
+        expires = now + timedelta(seconds=self.LEASE_SECONDS)
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            await session.execute(
+                text("""
+                    UPDATE queued_jobs
+                    SET status = 'processing', lease_owner = :owner, lease_expires_at = :expires,
+                        started_at = :now, available_at = NULL
+                    WHERE id = :id
+                """),
+                [{"id": job.id, "owner": self.worker_id, "expires": expires, "now": now} for job in jobs]
+            )
+            await session.commit()
+    
+    def _finish_params(self, job: QueuedJob) -> Dict[str, Any]:
+        """Row update for a job leaving processing: back to queued for a retry, or final"""
+        available_at = None
+        if job.status == JobStatus.QUEUED and job.retry_at is not None:
+            available_at = datetime.utcnow() + timedelta(seconds=max(0.0, job.retry_at - time.monotonic()))
+        return {
+            "id": job.id,
+            "status": job.status.value,
+            "retry_count": job.retry_count,
+            "error": job.error_message,
+            "available_at": available_at,
+            "completed_at": None if job.status == JobStatus.QUEUED else datetime.utcnow()
+        }
+    
+    async def _write_finished(self, updates: List[Dict[str, Any]]):
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            await session.execute(
+                text("""
+                    UPDATE queued_jobs
+                    SET status = :status, retry_count = :retry_count, error_message = :error,
+                        available_at = :available_at, completed_at = :completed_at,
+                        lease_owner = NULL, lease_expires_at = NULL
+                    WHERE id = :id
+                """),
+                updates
+            )
+            await session.commit()
+    
+    async def _flush_finished(self):
+        """Write all buffered finished/retrying job updates in one transaction"""
+        if not self._finished_updates:
+            return
+        updates, self._finished_updates = self._finished_updates, []
+        try:
+            await self._write_finished(updates)
+        except Exception as e:
+            # Unwritten jobs are replayed after a restart (at-least-once)
+            logger.error(f"Failed to persist {len(updates)} finished jobs: {e}")
+    
+    async def _persist_finished(self, job: QueuedJob):
+        """Record one job's status immediately"""
+        try:
+            await self._write_finished([self._finish_params(job)])
+        except Exception as e:
+            logger.error(f"Failed to persist job {job.id} ({job.status.value}): {e}")
+    
+    async def _replay_jobs(self):
+        """Load unfinished jobs from queued_jobs and prune old history"""
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            await session.execute(
+                text("""
+                    DELETE FROM queued_jobs
+                    WHERE status IN ('completed', 'failed', 'cancelled') AND completed_at < :cutoff
+                """),
+                {"cutoff": datetime.utcnow() - self.HISTORY_RETENTION}
+            )
+            await session.commit()
+        
+        replayed = await self._claim_jobs("status = 'queued'")
+        reclaimed = await self._reclaim_expired_leases()
+        if replayed or reclaimed:
+            logger.info(f"Replayed {replayed} queued and {reclaimed} interrupted jobs from the database")
+        self.replayed_jobs += replayed
+    
+    async def _reclaim_expired_leases(self) -> int:
+        """
+        Requeue (or fail) processing jobs whose lease was not renewed
+
+        That includes this worker's own jobs that were cancelled while
+        running; jobs still active here are skipped by _claim_jobs.
+        """
+        reclaimed = await self._claim_jobs(
+            "status = 'processing' AND lease_expires_at < :now",
+            {"now": datetime.utcnow()},
+            interrupted=True
+        )
+        self.reclaimed_jobs += reclaimed
+        return reclaimed
+    
+    async def _claim_jobs(self, condition: str, params: Optional[Dict[str, Any]] = None,
+                          interrupted: bool = False) -> int:
+        """
+        Load persisted jobs matching condition into the in-memory lanes
+
+        Args:
+            condition: SQL condition selecting queued_jobs rows
+            params: Parameters for condition
+            interrupted: The rows were running when their worker stopped; only
+                jobs whose handler allows replaying interrupted work are loaded,
+                the rest are marked failed
+        """
+        known = set(self.active_jobs)
+        known.update(entry[2].id for queue in self.job_queues.values() for entry in queue)
+        known.update(entry[2].id for entry in self.retry_jobs)
+        known.update(update["id"] for update in self._finished_updates)
+        
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            result = await session.execute(
+                text(f"""
+                    SELECT id, job_type, handler, priority, payload, retry_count, max_retries,
+                           error_message, available_at, created_at
+                    FROM queued_jobs WHERE {condition}
+                    ORDER BY created_at
+                """),
+                params or {}
+            )
+            rows = [row for row in result.fetchall() if row.id not in known]
+            
+            missing = [row.id for row in rows if row.handler not in _JOB_HANDLERS]
+            if missing:
+                await session.execute(
+                    text("""
+                        UPDATE queued_jobs
+                        SET status = 'failed', error_message = 'No handler registered for ' || handler,
+                            completed_at = :now, lease_owner = NULL, lease_expires_at = NULL
+                        WHERE id = :id
+                    """),
+                    [{"id": job_id, "now": datetime.utcnow()} for job_id in missing]
+                )
+            claimed = [row for row in rows if row.handler in _JOB_HANDLERS]
+            abandoned = []
+            if interrupted:
+                abandoned = [row.id for row in claimed if row.handler not in _REPLAY_INTERRUPTED]
+                claimed = [row for row in claimed if row.handler in _REPLAY_INTERRUPTED]
+            if abandoned:
+                await session.execute(
+                    text("""
+                        UPDATE queued_jobs
+                        SET status = 'failed', error_message = 'Interrupted while running; not replayed',
+                            completed_at = :now, lease_owner = NULL, lease_expires_at = NULL
+                        WHERE id = :id
+                    """),
+                    [{"id": job_id, "now": datetime.utcnow()} for job_id in abandoned]
+                )
+            if claimed:
+                await session.execute(
+                    text("""
+                        UPDATE queued_jobs
+                        SET status = 'queued', lease_owner = NULL, lease_expires_at = NULL
+                        WHERE id = :id
+                    """),
+                    [{"id": row.id} for row in claimed]
+                )
+            await session.commit()
+        
+        for job_id in missing:
+            logger.error(f"Dropping persisted job {job_id}: its handler is not registered")
+        for job_id in abandoned:
+            logger.error(f"Job {job_id} was interrupted while running; marked failed instead of running it again")
+        self.interrupted_jobs_failed += len(abandoned)
+        
+        now = datetime.utcnow()
+        for row in claimed:
+            job = QueuedJob(
+                id=row.id,
+                job_type=row.job_type if row.job_type in self.job_queues else "general",
+                priority=JobPriority(row.priority),
+                payload=json.loads(row.payload),
+                callback=_JOB_HANDLERS[row.handler],
+                handler=row.handler,
+                created_at=_parse_datetime(row.created_at) or datetime.now(),
+                error_message=row.error_message,
+                retry_count=row.retry_count,
+                max_retries=row.max_retries
+            )
+            available_at = _parse_datetime(row.available_at)
+            if available_at and available_at > now:
+                job.retry_at = time.monotonic() + (available_at - now).total_seconds()
+                heapq.heappush(self.retry_jobs, (job.retry_at, next(self._sequence), job))
+            else:
+                self._enqueue(job)
+        
+        if claimed:
+            self._notify()
+        return len(claimed)
+    
+    async def _heartbeat_loop(self):
+        """Renew this worker's leases and reclaim jobs whose leases have lapsed"""
+        while self.is_running:
+            try:
+                await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+                if self.active_jobs:
+                    # Only jobs still running here; a cancelled job's lease is left to lapse
+                    expires = datetime.utcnow() + timedelta(seconds=self.LEASE_SECONDS)
+                    db_service = await get_database_service()
+                    async with db_service.get_session() as session:
+                        await session.execute(
+                            text("""
+                                UPDATE queued_jobs SET lease_expires_at = :expires
+                                WHERE id = :id AND status = 'processing' AND lease_owner = :owner
+                            """),
+                            [{"id": job_id, "expires": expires, "owner": self.worker_id}
+                             for job_id in list(self.active_jobs)]
+                        )
+                        await session.commit()
+                
+                reclaimed = await self._reclaim_expired_leases()
+                if reclaimed:
+                    logger.warning(f"Reclaimed {reclaimed} jobs whose worker lease expired")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in job queue heartbeat: {e}")
+
+def _parse_datetime(value) -> Optional[datetime]:
+    """DateTime columns come back from raw queries as ISO strings"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
 # Global job queue service instance
-job_queue_service = JobQueueService()
\ No newline at end of file
+job_queue_service = JobQueueService()
@@ -2,15 +2,19 @@
 Service for synchronizing live printer status with print job database
 """
 
-import asyncio
 import logging
 import math
-from typing import Dict, List, Optional, Set, Any
+from typing import Dict, Optional, Set, Any
 from datetime import datetime, timezone
 from dataclasses import dataclass
 
 from src.core.printer_client import printer_manager
+from src.core.printer_identity import PrinterIdentity
 from src.services.database_service import get_database_service
+from src.services.job_lifecycle_service import (
+    job_lifecycle_service, JobLifecycleEvent, JobLifecycleEventType
+)
+from src.services.fleet_observer_service import fleet_observer_service
 
 logger = logging.getLogger(__name__)
 
@@ -29,13 +33,28 @@ class LiveJobInfo:
 
 
 class LiveJobSyncService:
-    """Service to sync live printer jobs with database"""
+    """Service to sync live printer jobs with database
+
+    Driven by job lifecycle events, so starts, pauses and completions are
+    written as soon as the printer reports the gcode_state transition.
+
+    This service owns print_jobs status transitions; PrintJobSyncService
+    only fills in progress between layers while it runs. Handlers hold
+    fleet_observer_service.print_jobs_lock, so their writes never interleave
+    with a fleet snapshot being applied.
+    """
     
     def __init__(self):
         self.running = False
-        self.sync_task: Optional[asyncio.Task] = None
-        self.sync_interval = 10  # Sync every 10 seconds
         self.tracked_jobs: Dict[str, LiveJobInfo] = {}  # printer_id -> job_info
+        self.event_handlers = {
+            JobLifecycleEventType.JOB_STARTED: self._on_job_started,
+            JobLifecycleEventType.LAYER_ADVANCED: self._on_job_progress,
+            JobLifecycleEventType.RESUMED: self._on_job_progress,
+            JobLifecycleEventType.PAUSED: self._on_job_paused,
+            JobLifecycleEventType.FINISHED: self._on_job_ended,
+            JobLifecycleEventType.FAILED: self._on_job_ended,
+        }
         
     async def start(self):
         """Start the live job synchronization service"""
@@ -44,149 +63,62 @@ class LiveJobSyncService:
             return
             
         self.running = True
-        self.sync_task = asyncio.create_task(self._sync_loop())
+        for event_type, handler in self.event_handlers.items():
+            job_lifecycle_service.subscribe(event_type, handler)
         logger.info("Live job sync service started")
     
     async def stop(self):
         """Stop the live job synchronization service"""
         self.running = False
-        if self.sync_task:
-            self.sync_task.cancel()
-            try:
-                await self.sync_task
-            except asyncio.CancelledError:
-                pass
+        for event_type, handler in self.event_handlers.items():
+            job_lifecycle_service.unsubscribe(event_type, handler)
         logger.info("Live job sync service stopped")
-    
-    async def _sync_loop(self):
-        """Main synchronization loop"""
-        while self.running:
-            try:
-                await self._sync_live_jobs()
-                await asyncio.sleep(self.sync_interval)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in live job sync loop: {e}")
-                await asyncio.sleep(self.sync_interval)
-    
-    async def _sync_live_jobs(self):
-        """Sync current printer jobs with database"""
-        try:
-            logger.debug("Starting live job sync cycle")
-
-            # Get live status from all printers
-            all_live_status = await printer_manager.get_all_live_status()
-            logger.debug(f"Retrieved live status from {len(all_live_status)} printers")
-
-            current_jobs: Dict[str, LiveJobInfo] = {}
-
-            for status_data in all_live_status:
-                printer_id = status_data.get("printer_id")
-                if not printer_id:
-                    logger.debug("Skipping status data without printer_id")
-                    continue
-
-                job_status = status_data.get("status", "idle")
-                current_job = status_data.get("current_job")
-                progress_data = status_data.get("progress")
-
-                logger.debug(f"Printer {printer_id} status: {job_status}, has_current_job: {bool(current_job)}")
-
-                # Only track active printing jobs
-                if job_status in ["printing", "paused"] and current_job:
-                    filename = current_job.get("filename", "")
-                    if filename:
-                        progress_percentage = 0.0
-                        current_layer = None
-                        total_layers = None
-                        remaining_time = None
-
-                        if progress_data:
-                            progress_percentage = progress_data.get("percentage", 0.0)
-                            current_layer = progress_data.get("current_layer")
-                            total_layers = progress_data.get("total_layers")
-                            remaining_time = progress_data.get("remaining_time")
-
-                        job_info = LiveJobInfo(
-                            printer_id=printer_id,
-                            filename=filename,
-                            status=job_status,
-                            progress_percentage=progress_percentage,
-                            current_layer=current_layer,
-                            total_layers=total_layers,
-                            remaining_time=remaining_time,
-                            print_id=current_job.get("print_id", "")
-                        )
-
-                        current_jobs[printer_id] = job_info
-                        logger.debug(f"Tracking job on printer {printer_id}: {filename} at {progress_percentage}%")
-                    else:
-                        logger.debug(f"Printer {printer_id} has current_job but no filename")
-                else:
-                    logger.debug(f"Printer {printer_id} not printing or no current_job (status: {job_status})")
-
-            logger.debug(f"Found {len(current_jobs)} active print jobs")
 
-            # Process job changes
-            await self._process_job_changes(current_jobs, all_live_status)
-
-            # Update tracked jobs
-            self.tracked_jobs = current_jobs
-            logger.debug("Live job sync cycle completed successfully")
-
-        except Exception as e:
-            logger.error(f"Failed to sync live jobs: {e}", exc_info=True)
-    
-    async def _process_job_changes(self, current_jobs: Dict[str, LiveJobInfo], all_live_status: List[Dict[str, Any]]):
-        """Process changes in active jobs"""
-        # Find new jobs (started printing)
-        for printer_id, job_info in current_jobs.items():
-            if printer_id not in self.tracked_jobs:
-                await self._handle_new_job(job_info)
-            else:
-                await self._handle_job_update(job_info)
-
-        # Find completed/stopped/paused jobs
-        for printer_id in self.tracked_jobs:
-            if printer_id not in current_jobs:
-                old_job = self.tracked_jobs[printer_id]
-
-                # Find current printer status from all_live_status
-                current_printer_status = "idle"
-                printer_state_data = None
-                for status_data in all_live_status:
-                    if status_data.get("printer_id") == printer_id:
-                        current_printer_status = status_data.get("status", "idle")
-                        printer_state_data = status_data  # Pass full state data
-                        break
-
-                # If printer is paused, mark job as paused (not completed!)
-                if current_printer_status == "paused":
-                    await self._handle_job_paused(old_job)
-                else:
-                    # Printer is idle/stopped, pass state data to determine final status
-                    await self._handle_job_completed(old_job, printer_state_data)
-
-        # Also check for jobs that were at high progress and printer went idle
-        # This handles the case where websocket doesn't reach 100% but printer finished
-        for printer_id in self.tracked_jobs:
-            if printer_id not in current_jobs:
-                old_job = self.tracked_jobs[printer_id]
-
-                # Find current printer status from all_live_status
-                current_printer_status = None
-                for status_data in all_live_status:
-                    if status_data.get("printer_id") == printer_id:
-                        current_printer_status = status_data.get("status", "idle")
-                        break
-
-                # If printer went to idle and job was at high progress, this confirms completion
-                if (old_job.status in ["printing", "paused"] and
-                    current_printer_status == "idle" and
-                    old_job.progress_percentage >= 95.0):
-                    logger.info(f"Confirming completion: Printer {printer_id} went idle with job at {old_job.progress_percentage}%")
-                    # Job completion is already handled above, but this log helps with debugging
+    def _job_info_from_event(self, event: JobLifecycleEvent) -> LiveJobInfo:
+        """Build the job info the handlers work with from a lifecycle event"""
+        return LiveJobInfo(
+            printer_id=event.printer_id,
+            filename=event.filename,
+            status=event.status,
+            progress_percentage=event.progress_percentage,
+            current_layer=event.current_layer,
+            total_layers=event.total_layers,
+            remaining_time=event.remaining_time,
+            print_id=event.print_id
+        )
+
+    async def _on_job_started(self, event: JobLifecycleEvent):
+        """Create or promote the database job for a newly started print"""
+        job_info = self._job_info_from_event(event)
+        self.tracked_jobs[event.printer_id] = job_info
+        async with fleet_observer_service.print_jobs_lock:
+            await self._handle_new_job(job_info)
+
+    async def _on_job_progress(self, event: JobLifecycleEvent):
+        """Write progress on each new layer and on resume"""
+        job_info = self._job_info_from_event(event)
+        self.tracked_jobs[event.printer_id] = job_info
+        async with fleet_observer_service.print_jobs_lock:
+            await self._handle_job_update(job_info)
+
+    async def _on_job_paused(self, event: JobLifecycleEvent):
+        """Mark the job paused"""
+        job_info = self._job_info_from_event(event)
+        self.tracked_jobs[event.printer_id] = job_info
+        async with fleet_observer_service.print_jobs_lock:
+            await self._handle_job_paused(job_info)
+
+    async def _on_job_ended(self, event: JobLifecycleEvent):
+        """Finalize the job when the printer finishes, fails or is stopped"""
+        job_info = self._job_info_from_event(event)
+        self.tracked_jobs.pop(event.printer_id, None)
+        # The completion handler decides completed/failed/cancelled from the raw state
+        printer_state_data = {
+            "raw_gcode_state": event.raw_gcode_state,
+            "error_code": event.error_code
+        }
+        async with fleet_observer_service.print_jobs_lock:
+            await self._handle_job_completed(job_info, printer_state_data)
     
     async def _handle_new_job(self, job_info: LiveJobInfo):
         """Handle a new print job that started"""
@@ -311,34 +243,50 @@ class LiveJobSyncService:
         except Exception as e:
             logger.error(f"Failed to handle job pause {job_info.filename}: {e}")
 
+    async def _resolve_printer_identity(self, session, numeric_id: str) -> Optional[PrinterIdentity]:
+        """Map a numeric printer_id to its UUID and tenant, via the in-memory index
+
+        Only a cache miss queries SQLite; the result is added to the index.
+        """
+        identity = printer_manager.identity_index.by_numeric_id(numeric_id)
+        if identity:
+            return identity
+
+        from sqlalchemy import text
+
+        printer_uuid_query = text("""
+        SELECT id, tenant_id FROM printers
+        WHERE printer_id = :numeric_id
+        LIMIT 1
+        """)
+
+        printer_result = await session.execute(
+            printer_uuid_query,
+            {"numeric_id": int(numeric_id) if numeric_id.isdigit() else None}
+        )
+        printer_row = printer_result.fetchone()
+
+        if not printer_row:
+            return None
+
+        return printer_manager.identity_index.register(numeric_id, printer_row[0], printer_row[1])
+
     async def _find_existing_job(self, job_info: LiveJobInfo) -> Optional[Dict]:
         """Find existing database job that matches the live job"""
         try:
             from sqlalchemy import text
 
-            # The printer_id from live status is numeric, but jobs use UUID
-            # First, try to find the printer UUID from the numeric ID
-            printer_uuid_query = text("""
-            SELECT id FROM printers
-            WHERE printer_id = :numeric_id
-            LIMIT 1
-            """)
-
             db_service = await get_database_service()
             async with db_service.get_session() as session:
-                # Get printer UUID from numeric ID
-                printer_result = await session.execute(
-                    printer_uuid_query,
-                    {"numeric_id": int(job_info.printer_id) if job_info.printer_id.isdigit() else None}
-                )
-                printer_row = printer_result.fetchone()
+                # The printer_id from live status is numeric, but jobs use UUID
+                identity = await self._resolve_printer_identity(session, job_info.printer_id)
 
-                if not printer_row:
+                if not identity:
                     logger.warning(f"Could not find printer UUID for numeric ID: {job_info.printer_id}")
                     # Fall back to using the ID as-is (in case it's already a UUID)
                     printer_uuid = job_info.printer_id
                 else:
-                    printer_uuid = printer_row[0]
+                    printer_uuid = identity.uuid
                     logger.debug(f"Mapped printer numeric ID {job_info.printer_id} to UUID {printer_uuid}")
 
                 # Now find the job using the printer UUID
@@ -379,28 +327,17 @@ class LiveJobSyncService:
             from sqlalchemy import text
             import uuid
 
-            # First get the printer UUID from numeric ID
-            printer_uuid_query = text("""
-            SELECT id, tenant_id FROM printers
-            WHERE printer_id = :numeric_id
-            LIMIT 1
-            """)
-
             db_service = await get_database_service()
             async with db_service.get_session() as session:
                 # Get printer UUID and tenant_id from numeric ID
-                printer_result = await session.execute(
-                    printer_uuid_query,
-                    {"numeric_id": int(job_info.printer_id) if job_info.printer_id.isdigit() else None}
-                )
-                printer_row = printer_result.fetchone()
+                identity = await self._resolve_printer_identity(session, job_info.printer_id)
 
-                if not printer_row:
+                if not identity:
                     logger.error(f"Cannot create external job: printer with numeric ID {job_info.printer_id} not found")
                     return
 
-                printer_uuid = printer_row[0]
-                tenant_id = printer_row[1] if printer_row[1] else ''
+                printer_uuid = identity.uuid
+                tenant_id = identity.tenant_id if identity.tenant_id else ''
 
                 # Now create the job with the correct printer UUID
                 insert_query = text("""
@@ -538,25 +475,15 @@ class LiveJobSyncService:
 
             db_service = await get_database_service()
 
-            # First, get the printer UUID from numeric ID
-            printer_uuid_query = text("""
-            SELECT id, tenant_id FROM printers
-            WHERE printer_id = :numeric_id
-            LIMIT 1
-            """)
-
             async with db_service.get_session() as session:
-                printer_result = await session.execute(
-                    printer_uuid_query,
-                    {"numeric_id": int(printer_numeric_id) if printer_numeric_id.isdigit() else None}
-                )
-                printer_row = printer_result.fetchone()
+                # First, get the printer UUID from numeric ID
+                identity = await self._resolve_printer_identity(session, printer_numeric_id)
 
-                if not printer_row:
+                if not identity:
                     logger.warning(f"Printer with numeric ID {printer_numeric_id} not found, skipping filament deduction")
                     return
 
-                printer_uuid = printer_row[0]
+                printer_uuid = identity.uuid
 
                 # Get filament weight from print_files via print_jobs
                 query = text("""
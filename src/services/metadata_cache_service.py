@@ -0,0 +1,420 @@
+"""
+Metadata Cache Service
+
+Persistent cache in front of parse_3mf_metadata. Results are stored in the
+print_file_metadata table keyed by the SHA-256 of the file contents, so
+re-uploading or re-parsing the same sliced plate is a lookup instead of a
+full ZIP/JSON/XML parse. The per-plate index of each file is stored
+alongside it in print_file_plates.
+
+Key Features:
+- Unchanged files (same path, size and mtime) are found without hashing
+- Identical content at a new path (re-upload, temp file) is found by hash
+- Entries from an older METADATA_PARSER_VERSION are treated as misses
+- Hashing runs in a worker thread and parsing in the CPU worker pool, off the event loop
+- Plate lookups (object count, time, filament per slot) never re-open the file
+- Hit counts and last_used_at are buffered and written in batches, so a hit
+  does not open a write transaction
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from .database_service import get_database_service
+from ..utils.metadata_parser import parse_3mf_metadata, parse_3mf_metadata_and_plates, METADATA_PARSER_VERSION
+from ..utils.process_pool import cpu_worker_pool
+from ..utils.file_hash import hash_file
+
+logger = logging.getLogger(__name__)
+
+class MetadataCacheService:
+    """
+    Content-addressed cache of 3MF metadata backed by SQLite
+    """
+
+    def __init__(self):
+        self.print_files_dir = Path("/home/pi/PrintFarmSoftware/files/print_files")
+        self.hits = 0
+        self.misses = 0
+        self.hit_flush_interval = 30.0
+        self.hit_batch_size = 100
+        self._pending_hits: Dict[str, Dict[str, Any]] = {}  # content_hash -> update row
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._timer_task: Optional[asyncio.Task] = None
+
+    async def get_metadata(self, file_path: str, content: Optional[bytes] = None,
+                           remember_path: bool = True, content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get metadata for a 3MF file, parsing it only on a cache miss
+
+        Args:
+            file_path: Path to the 3MF file
+            content: File contents if the caller already has them in memory
+                (avoids re-reading the file to hash it)
+            remember_path: Record file_path/mtime for the fast path; pass False
+                for temporary files that will be deleted
+            content_hash: SHA-256 of the file if the caller already computed
+                it (e.g. while streaming an upload)
+
+        Returns:
+            Same dictionary as parse_3mf_metadata()
+        """
+        _, metadata = await self._resolve(file_path, content, remember_path, content_hash)
+        return metadata
+
+    async def _resolve(self, file_path: str, content: Optional[bytes] = None,
+                       remember_path: bool = True,
+                       content_hash: Optional[str] = None) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Look up or parse a file, returning (content_hash, metadata)
+
+        content_hash is None when nothing was cached for the file (missing
+        file, or a parse that found nothing), in which case it has no plates.
+        """
+        file_path = str(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            # Let the parser produce its usual empty result and log
+            return None, await asyncio.to_thread(parse_3mf_metadata, file_path)
+
+        db_service = await get_database_service()
+
+        # Fast path: same file, untouched since it was last hashed
+        if remember_path and content is None and content_hash is None:
+            async with db_service.get_session() as session:
+                result = await session.execute(
+                    text("""
+                        SELECT content_hash, metadata_json FROM print_file_metadata
+                        WHERE file_path = :file_path AND file_size_bytes = :size
+                        AND file_mtime_ns = :mtime_ns AND parser_version = :version
+                        LIMIT 1
+                    """),
+                    {"file_path": file_path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                     "version": METADATA_PARSER_VERSION}
+                )
+                row = result.fetchone()
+            if row:
+                await self._record_hit(row.content_hash)
+                return row.content_hash, json.loads(row.metadata_json)
+
+        if content_hash is None:
+            if content is not None:
+                content_hash = hashlib.sha256(content).hexdigest()
+            else:
+                content_hash = await asyncio.to_thread(hash_file, file_path)
+
+        async with db_service.get_session() as session:
+            result = await session.execute(
+                text("""
+                    SELECT metadata_json FROM print_file_metadata
+                    WHERE content_hash = :content_hash AND file_size_bytes = :size
+                    AND parser_version = :version
+                """),
+                {"content_hash": content_hash, "size": stat.st_size, "version": METADATA_PARSER_VERSION}
+            )
+            row = result.fetchone()
+
+        if row:
+            await self._record_hit(content_hash, file_path if remember_path else None, stat.st_mtime_ns)
+            return content_hash, json.loads(row.metadata_json)
+
+        self.misses += 1
+        metadata, plates = await cpu_worker_pool.run(
+            parse_3mf_metadata_and_plates, file_path,
+            operation="3MF metadata parse", check_resources=False
+        )
+
+        # Don't cache a parse that found nothing - it is more likely a bad or
+        # partial file than a real result worth remembering
+        if not any(value is not None for value in metadata.values()):
+            return None, metadata
+
+        await self._store(content_hash, stat.st_size, file_path if remember_path else None,
+                          stat.st_mtime_ns, metadata, plates)
+        return content_hash, metadata
+
+    async def get_plates(self, file_path: str) -> List[Dict[str, Any]]:
+        """
+        Get the per-plate index of a 3MF file, parsing it only on a cache miss
+
+        Returns:
+            Plate entries ordered by plate_index (see _index_plates in
+            metadata_parser); empty if the file has no sliced plates
+        """
+        content_hash, _ = await self._resolve(file_path)
+        if content_hash is None:
+            return []
+        return await self._load_plates(content_hash)
+
+    async def get_plate(self, file_path: str, plate_index: int = 1) -> Optional[Dict[str, Any]]:
+        """Get one plate's index entry, or None if the file has no such plate"""
+        content_hash, _ = await self._resolve(file_path)
+        if content_hash is None:
+            return None
+        plates = await self._load_plates(content_hash, plate_index)
+        return plates[0] if plates else None
+
+    async def _load_plates(self, content_hash: str, plate_index: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Read plate rows for a content hash, optionally a single plate"""
+        query = """
+            SELECT plate_index, object_count, print_time_seconds, filament_weight_grams,
+                   layer_count, gcode_member, filaments_json, thumbnails_json
+            FROM print_file_plates WHERE content_hash = :content_hash
+        """
+        params = {"content_hash": content_hash}
+        if plate_index is not None:
+            query += " AND plate_index = :plate_index"
+            params["plate_index"] = plate_index
+
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            result = await session.execute(text(query + " ORDER BY plate_index"), params)
+            rows = result.fetchall()
+
+        return [
+            {
+                "plate_index": row.plate_index,
+                "object_count": row.object_count,
+                "print_time_seconds": row.print_time_seconds,
+                "filament_weight_grams": row.filament_weight_grams,
+                "filaments": json.loads(row.filaments_json or "[]"),
+                "layer_count": row.layer_count,
+                "gcode_member": row.gcode_member,
+                "thumbnails": json.loads(row.thumbnails_json or "{}"),
+            }
+            for row in rows
+        ]
+
+    async def _record_hit(self, content_hash: str, file_path: Optional[str] = None, mtime_ns: Optional[int] = None):
+        """
+        Count a hit and, if given, move the fast-path pointer to a new path
+
+        The hit count and last_used_at are buffered for flush_hits. A path
+        move is written straight away: until it is, every lookup at the new
+        path misses the fast path and hashes the file again.
+        """
+        self.hits += 1
+        pending = self._pending_hits.setdefault(content_hash, {"content_hash": content_hash, "hits": 0})
+        pending["hits"] += 1
+        pending["last_used_at"] = datetime.utcnow()
+
+        if file_path:
+            db_service = await get_database_service()
+            async with db_service.get_session() as session:
+                await session.execute(
+                    text("""
+                        UPDATE print_file_metadata
+                        SET file_path = :file_path, file_mtime_ns = :mtime_ns
+                        WHERE content_hash = :content_hash
+                    """),
+                    {"file_path": file_path, "mtime_ns": mtime_ns, "content_hash": content_hash}
+                )
+                await session.commit()
+
+        if self._timer_task is None or self._timer_task.done():
+            self._timer_task = asyncio.create_task(self._flush_loop())
+        if len(self._pending_hits) >= self.hit_batch_size and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush_hits())
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.hit_flush_interval)
+                await self.flush_hits()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in metadata cache hit flush loop: {e}")
+
+    def _lock(self) -> asyncio.Lock:
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        return self._flush_lock
+
+    async def flush_hits(self):
+        """Write buffered hit counts and last_used_at in one transaction"""
+        async with self._lock():
+            if not self._pending_hits:
+                return
+            rows, self._pending_hits = list(self._pending_hits.values()), {}
+            try:
+                db_service = await get_database_service()
+                async with db_service.get_session() as session:
+                    await session.execute(
+                        text("""
+                            UPDATE print_file_metadata
+                            SET hit_count = hit_count + :hits, last_used_at = :last_used_at
+                            WHERE content_hash = :content_hash
+                        """),
+                        rows
+                    )
+                    await session.commit()
+            except Exception as e:
+                # Hit counts are bookkeeping only - don't retry or fail lookups over them
+                logger.warning(f"Failed to write {len(rows)} metadata cache hit counts: {e}")
+
+    async def close(self):
+        """Stop the flush timer and write buffered hit counts"""
+        for task in (self._timer_task, self._flush_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._timer_task = None
+        self._flush_task = None
+        await self.flush_hits()
+
+    async def _store(self, content_hash: str, size: int, file_path: Optional[str], mtime_ns: int,
+                     metadata: Dict[str, Any], plates: List[Dict[str, Any]]):
+        """Insert or replace the cache entry and plate index for a content hash"""
+        db_service = await get_database_service()
+        now = datetime.utcnow()
+        async with db_service.get_session() as session:
+            await session.execute(
+                text("""
+                    INSERT OR REPLACE INTO print_file_metadata
+                        (content_hash, file_size_bytes, file_path, file_mtime_ns, parser_version,
+                         metadata_json, hit_count, created_at, last_used_at)
+                    VALUES (:content_hash, :size, :file_path, :mtime_ns, :version,
+                            :metadata_json, 0, :now, :now)
+                """),
+                {"content_hash": content_hash, "size": size, "file_path": file_path,
+                 "mtime_ns": mtime_ns if file_path else None, "version": METADATA_PARSER_VERSION,
+                 "metadata_json": json.dumps(metadata), "now": now}
+            )
+            await session.execute(
+                text("DELETE FROM print_file_plates WHERE content_hash = :content_hash"),
+                {"content_hash": content_hash}
+            )
+            if plates:
+                await session.execute(
+                    text("""
+                        INSERT INTO print_file_plates
+                            (content_hash, plate_index, object_count, print_time_seconds,
+                             filament_weight_grams, layer_count, gcode_member, filaments_json, thumbnails_json)
+                        VALUES (:content_hash, :plate_index, :object_count, :print_time_seconds,
+                                :filament_weight_grams, :layer_count, :gcode_member, :filaments_json, :thumbnails_json)
+                    """),
+                    [
+                        {"content_hash": content_hash, "plate_index": plate["plate_index"],
+                         "object_count": plate["object_count"], "print_time_seconds": plate["print_time_seconds"],
+                         "filament_weight_grams": plate["filament_weight_grams"], "layer_count": plate["layer_count"],
+                         "gcode_member": plate["gcode_member"], "filaments_json": json.dumps(plate["filaments"]),
+                         "thumbnails_json": json.dumps(plate["thumbnails"])}
+                        for plate in plates
+                    ]
+                )
+            await session.commit()
+
+    async def invalidate(self, content_hash: Optional[str] = None, file_path: Optional[str] = None) -> int:
+        """
+        Drop cache entries
+
+        Args:
+            content_hash: Drop the entry for this content
+            file_path: Drop the entry last seen at this path
+            (neither: drop everything)
+
+        Returns:
+            Number of entries removed
+        """
+        if content_hash:
+            self._pending_hits.pop(content_hash, None)
+        elif not file_path:
+            self._pending_hits.clear()
+
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            if content_hash:
+                await session.execute(
+                    text("DELETE FROM print_file_plates WHERE content_hash = :content_hash"),
+                    {"content_hash": content_hash}
+                )
+                result = await session.execute(
+                    text("DELETE FROM print_file_metadata WHERE content_hash = :content_hash"),
+                    {"content_hash": content_hash}
+                )
+            elif file_path:
+                await session.execute(
+                    text("""
+                        DELETE FROM print_file_plates WHERE content_hash IN
+                            (SELECT content_hash FROM print_file_metadata WHERE file_path = :file_path)
+                    """),
+                    {"file_path": str(file_path)}
+                )
+                result = await session.execute(
+                    text("DELETE FROM print_file_metadata WHERE file_path = :file_path"),
+                    {"file_path": str(file_path)}
+                )
+            else:
+                await session.execute(text("DELETE FROM print_file_plates"))
+                result = await session.execute(text("DELETE FROM print_file_metadata"))
+            await session.commit()
+
+        removed = result.rowcount or 0
+        logger.info(f"Invalidated {removed} metadata cache entries")
+        return removed
+
+    async def rebuild(self, directory: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Clear the cache and re-parse every 3MF file in the print files directory
+
+        Returns:
+            Dict with counts of files parsed and failed
+        """
+        directory = Path(directory) if directory else self.print_files_dir
+        removed = await self.invalidate()
+
+        parsed = 0
+        failed = []
+        if directory.exists():
+            for file_path in sorted(directory.glob("*.3mf")):
+                try:
+                    await self.get_metadata(str(file_path))
+                    parsed += 1
+                except Exception as e:
+                    logger.warning(f"Failed to rebuild metadata cache for {file_path}: {e}")
+                    failed.append(str(file_path))
+
+        logger.info(f"Rebuilt metadata cache: {parsed} files parsed, {len(failed)} failed")
+        return {"entries_removed": removed, "files_parsed": parsed, "files_failed": failed}
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters"""
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            result = await session.execute(
+                text("""
+                    SELECT COUNT(*) AS entries, COALESCE(SUM(hit_count), 0) AS total_hits,
+                           (SELECT COUNT(*) FROM print_file_plates) AS plates
+                    FROM print_file_metadata
+                """)
+            )
+            row = result.fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "entries": row.entries,
+            "plates": row.plates,
+            "lifetime_hits": row.total_hits + sum(pending["hits"] for pending in self._pending_hits.values()),
+            "pending_hit_entries": len(self._pending_hits),
+            "parser_version": METADATA_PARSER_VERSION,
+            "session_hits": self.hits,
+            "session_misses": self.misses,
+            "session_hit_rate": round(self.hits / lookups, 3) if lookups else None
+        }
+
+# Global service instance
+metadata_cache_service = MetadataCacheService()
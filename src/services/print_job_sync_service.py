@@ -5,13 +5,17 @@ This service monitors live printer data and updates corresponding print job reco
 in the database to keep status and progress in sync with actual printer state.
 
 Key Features:
-- Monitors live printer status via WebSocket/MQTT
+- Consumes live printer status from the shared fleet observer snapshot
 - Matches database print jobs with current printer jobs
 - Updates progress, status, and completion timestamps
 - Handles job completion and error states
+
+While the live job sync service is consuming job lifecycle events, it owns
+status transitions (start, pause, completion, failure, along with their
+inventory side effects) and this service only updates the progress of jobs
+that are printing. Both write under fleet_observer_service.print_jobs_lock.
 """
 
-import asyncio
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone
@@ -20,6 +24,8 @@ from dataclasses import dataclass
 from ..core.printer_client import printer_manager
 from ..services.database_service import get_database_service
 from ..services.config_service import get_config_service
+from ..services.fleet_observer_service import fleet_observer_service, FleetSnapshot
+from ..services.job_lifecycle_service import job_lifecycle_service
 
 logger = logging.getLogger(__name__)
 
@@ -37,11 +43,11 @@ class PrintJobSyncService:
     """
     Service to synchronize print job database records with live printer status
     """
+
+    SUBSCRIBER_NAME = "print_job_sync"
     
     def __init__(self):
         self.is_running = False
-        self.sync_task: Optional[asyncio.Task] = None
-        self.sync_interval = 10  # seconds between sync checks
         self.tenant_id: Optional[str] = None
         
     async def start(self):
@@ -65,7 +71,7 @@ class PrintJobSyncService:
             return
         
         self.is_running = True
-        self.sync_task = asyncio.create_task(self._sync_loop())
+        fleet_observer_service.subscribe(self.SUBSCRIBER_NAME, self._sync_print_jobs)
         logger.info(f"Print job sync service started for tenant {self.tenant_id}")
         
     async def stop(self):
@@ -74,35 +80,13 @@ class PrintJobSyncService:
             return
             
         self.is_running = False
-        if self.sync_task:
-            self.sync_task.cancel()
-            try:
-                await self.sync_task
-            except asyncio.CancelledError:
-                pass
+        fleet_observer_service.unsubscribe(self.SUBSCRIBER_NAME)
         logger.info("Print job sync service stopped")
-        
-    async def _sync_loop(self):
-        """Main synchronization loop"""
-        logger.info("Print job sync loop started")
-        
-        while self.is_running:
-            try:
-                await self._sync_print_jobs()
-                await asyncio.sleep(self.sync_interval)
                 
-            except asyncio.CancelledError:
-                logger.info("Print job sync loop cancelled")
-                break
-            except Exception as e:
-                logger.error(f"Error in print job sync loop: {e}")
-                # Continue running even if one sync fails
-                await asyncio.sleep(self.sync_interval)
-                
-    async def _sync_print_jobs(self):
+    async def _sync_print_jobs(self, snapshot: FleetSnapshot):
         """Perform one sync cycle of print job status updates"""
         try:
-            logger.debug("Starting print job sync cycle")
+            logger.debug(f"Starting print job sync cycle for fleet snapshot {snapshot.seq}")
 
             # Get database service
             db_service = await get_database_service()
@@ -118,8 +102,8 @@ class PrintJobSyncService:
 
             logger.debug(f"Processing {len(active_jobs)} active database jobs")
 
-            # Get live printer data
-            live_printer_data = await self._get_live_printer_data()
+            # Live printer data from the shared fleet snapshot
+            live_printer_data = snapshot.statuses
             if not live_printer_data:
                 logger.debug("No live printer data available")
                 return
@@ -159,17 +143,6 @@ class PrintJobSyncService:
             logger.error(f"Error getting active print jobs: {e}")
             return []
             
-    async def _get_live_printer_data(self) -> List[Dict[str, Any]]:
-        """Get live status data from all printers"""
-        try:
-            live_data = await printer_manager.get_all_live_status()
-            logger.debug(f"Retrieved live data from {len(live_data)} printers")
-            return live_data
-            
-        except Exception as e:
-            logger.error(f"Error getting live printer data: {e}")
-            return []
-            
     async def _match_jobs_with_live_data(self, active_jobs: List[Any], live_data: List[Dict[str, Any]]) -> List[JobMatch]:
         """Match database jobs with live printer data"""
         matches = []
@@ -241,14 +214,20 @@ class PrintJobSyncService:
         try:
             if not hasattr(job, 'printer_id') or not job.printer_id:
                 return None
+
+            # Served from the in-memory identity index on the hot path
+            numeric_id = printer_manager.identity_index.get_numeric_id(job.printer_id)
+            if numeric_id:
+                return numeric_id
                 
             # Get database service to look up the printer
             db_service = await get_database_service()
             if not db_service:
                 return None
                 
-            # Get all printers for this tenant
+            # Cache miss: load all printers for this tenant into the index
             printers = await db_service.get_printers_by_tenant(self.tenant_id)
+            printer_manager.identity_index.register_many(printers)
             
             # Find the printer record by UUID
             for printer in printers:
@@ -288,6 +267,11 @@ class PrintJobSyncService:
             
         return False
         
+    def _lifecycle_owns_status(self) -> bool:
+        """Whether status transitions are written from job lifecycle events instead"""
+        from .live_job_sync_service import live_job_sync_service
+        return job_lifecycle_service.is_running and live_job_sync_service.running
+        
     def _should_update_job(self, job, live_data: Dict[str, Any]) -> bool:
         """Determine if a job needs to be updated based on live data"""
         
@@ -299,6 +283,11 @@ class PrintJobSyncService:
         current_status = job.status.lower()
         current_progress = getattr(job, 'progress_percentage', 0) or 0
         
+        if self._lifecycle_owns_status():
+            # Progress only; transitions come from lifecycle events
+            return (live_status == 'printing' and current_status == 'printing'
+                    and abs(live_progress_percent - current_progress) > 1)
+        
         # Check if status changed
         status_map = {
             'printing': 'printing',
@@ -345,6 +334,8 @@ class PrintJobSyncService:
             }
             
             new_status = status_map.get(live_status, match.db_status)
+            if self._lifecycle_owns_status():
+                new_status = match.db_status
             
             # Prepare update data
             update_data = {
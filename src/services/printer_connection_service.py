@@ -10,6 +10,7 @@ from datetime import datetime
 
 from ..core.printer_client import printer_manager
 from .database_service import get_database_service
+from .fleet_connector import fleet_connector, ConnectOutcome
 from ..models.database import Printer
 
 logger = logging.getLogger(__name__)
@@ -37,6 +38,9 @@ class PrinterConnectionService:
         self.chronic_failure_printers: set = set()  # Track printers with chronic MQTT issues
         self.connection_timestamps: Dict[str, float] = {}  # Track when printers were last connected
 
+        # One database sync at a time; a resync during startup waits for it
+        self._sync_lock = asyncio.Lock()
+
         logger.info("Printer connection service initialized")
     
     async def initialize(self, tenant_id: str):
@@ -59,10 +63,18 @@ class PrinterConnectionService:
             logger.error(f"Failed to initialize printer connection service: {e}")
             raise
     
-    async def sync_printers_from_database(self) -> Dict[str, Any]:
+    async def sync_printers_from_database(self, user_action: bool = False) -> Dict[str, Any]:
         """
         Sync printer manager with current database state
         
+        Printers that need a connection are connected in parallel through
+        the fleet connector; see fleet_connector.get_progress() for a sync
+        in progress.
+        
+        Args:
+            user_action: Sync was requested by a user (lets printers whose
+                circuit breaker has cooled down be retried)
+        
         Returns:
             Dictionary with sync results
         """
@@ -70,26 +82,36 @@ class PrinterConnectionService:
             logger.error("Service not properly initialized")
             return {'success': False, 'error': 'Service not initialized'}
         
+        async with self._sync_lock:
+            return await self._sync_printers(user_action)
+    
+    async def _sync_printers(self, user_action: bool) -> Dict[str, Any]:
         try:
             # Get all active printers for this tenant from database
             printers = await self.db_service.get_printers_by_tenant(self.tenant_id)
             active_printers = [p for p in printers if p.is_active]
+
+            # Warm the identity index with every printer, active or not
+            printer_manager.identity_index.register_many(printers)
             
             logger.info(f"Found {len(active_printers)} active printers in database for tenant {self.tenant_id}")
             
             # Track current vs desired state
             current_printer_ids = set(printer_manager.printer_configs.keys())
             desired_printer_ids = set()
+            to_connect: Dict[str, Printer] = {}
+            already_connected = []
             
             results = {
                 'total': len(active_printers),
                 'connected': 0,
                 'failed': 0,
+                'skipped': 0,
                 'removed': 0,
                 'errors': []
             }
             
-            # Process each printer from database
+            # Bring configurations up to date and collect printers to connect
             for printer in active_printers:
                 # Use printer_id directly as the key for the printer manager
                 # This matches what the API expects (integer printer_id from Supabase)
@@ -110,32 +132,39 @@ class PrinterConnectionService:
                         # Disconnect existing connection
                         printer_manager.disconnect_printer(printer_key)
                         
-                        # Update configuration
+                        # Update configuration and reconnect
                         await self._add_printer_to_manager(printer)
-                        
-                        # Attempt reconnection
-                        if await self._connect_printer(printer):
-                            results['connected'] += 1
-                        else:
-                            results['failed'] += 1
-                    else:
+                        to_connect[printer_key] = printer
+                    elif printer_key not in printer_manager.clients:
                         # Configuration unchanged, ensure connected
-                        if printer_key not in printer_manager.clients:
-                            if await self._connect_printer(printer):
-                                results['connected'] += 1
-                            else:
-                                results['failed'] += 1
-                        else:
-                            results['connected'] += 1
+                        to_connect[printer_key] = printer
+                    else:
+                        already_connected.append((printer_key, printer.name))
                 else:
                     # New printer, add and connect
                     logger.info(f"Adding new printer {printer_key} from database")
                     await self._add_printer_to_manager(printer)
-                    
-                    if await self._connect_printer(printer):
-                        results['connected'] += 1
-                    else:
-                        results['failed'] += 1
+                    to_connect[printer_key] = printer
+            
+            # Connect everything that needs it in parallel
+            async def connect(printer_key: str) -> Optional[str]:
+                return await self._connect_printer_with_error(to_connect[printer_key])
+            
+            run = await fleet_connector.run(
+                [(key, printer.name) for key, printer in to_connect.items()],
+                connect,
+                already_connected=already_connected,
+                user_action=user_action
+            )
+            
+            results['connected'] = run.count(ConnectOutcome.CONNECTED, ConnectOutcome.ALREADY_CONNECTED)
+            results['failed'] = run.count(ConnectOutcome.FAILED)
+            results['skipped'] = run.count(ConnectOutcome.CIRCUIT_OPEN)
+            results['errors'] = [
+                {'printer_id': result.key, 'error': result.error}
+                for result in run.printers.values() if result.error
+            ]
+            results['printers'] = [result.to_dict() for result in run.printers.values()]
             
             # Remove printers that are no longer in database
             printers_to_remove = current_printer_ids - desired_printer_ids
@@ -145,7 +174,7 @@ class PrinterConnectionService:
                 results['removed'] += 1
             
             logger.info(f"Printer sync completed: {results['connected']} connected, "
-                       f"{results['failed']} failed, {results['removed']} removed")
+                       f"{results['failed']} failed, {results['skipped']} skipped, {results['removed']} removed")
             
             results['success'] = True
             return results
@@ -195,6 +224,15 @@ class PrinterConnectionService:
         Returns:
             True if connected successfully, False otherwise
         """
+        return await self._connect_printer_with_error(printer) is None
+    
+    async def _connect_printer_with_error(self, printer: Printer) -> Optional[str]:
+        """
+        Attempt to connect to a printer with validation
+        
+        Returns:
+            None if connected successfully, otherwise the error message
+        """
         printer_key = str(printer.printer_id) if printer.printer_id else printer.id
         
         try:
@@ -203,7 +241,7 @@ class PrinterConnectionService:
             if validation_error:
                 logger.warning(f"Printer {printer_key} validation failed: {validation_error}")
                 await self._update_connection_status(printer.id, False, validation_error)
-                return False
+                return validation_error
             
             logger.info(f"Attempting to connect to printer {printer_key} at {printer.ip_address}")
             
@@ -218,14 +256,14 @@ class PrinterConnectionService:
                 import time
                 self.connection_timestamps[printer_key] = time.time()
                 logger.info(f"✅ Successfully connected and verified printer {printer_key}")
-                return True
+                return None
             else:
                 # Connection appeared to succeed but verification failed
                 printer_manager.disconnect_printer(printer_key)
                 error_msg = "Connection established but printer not responding correctly"
                 await self._update_connection_status(printer.id, False, error_msg)
                 logger.warning(f"⚠️ Printer {printer_key} connection verification failed")
-                return False
+                return error_msg
             
         except Exception as e:
             error_msg = str(e)
@@ -233,7 +271,7 @@ class PrinterConnectionService:
             
             # Update database with failure
             await self._update_connection_status(printer.id, False, error_msg)
-            return False
+            return error_msg
     
     def _validate_printer_credentials(self, printer: Printer) -> Optional[str]:
         """
@@ -533,6 +571,7 @@ class PrinterConnectionService:
             
             # Create Printer model from data
             printer = Printer.from_dict(printer_data)
+            printer_manager.identity_index.invalidate(numeric_id=printer.printer_id, uuid=printer.id)
             
             # Add to manager and connect
             await self._add_printer_to_manager(printer)
@@ -555,6 +594,9 @@ class PrinterConnectionService:
             printer = Printer.from_dict(printer_data)
             printer_key = str(printer.printer_id) if printer.printer_id else printer.id
 
+            # The numeric ID or UUID may have changed; re-register below or on next lookup
+            printer_manager.identity_index.invalidate(numeric_id=printer.printer_id, uuid=printer.id)
+
             # Check if printer exists in manager
             if printer_key in printer_manager.printer_configs:
                 existing_config = printer_manager.printer_configs[printer_key]
@@ -590,6 +632,7 @@ class PrinterConnectionService:
                     existing_config['model'] = printer.model
                     existing_config['enabled'] = printer.is_active
                     existing_config['tenant_id'] = printer.tenant_id
+                    printer_manager.identity_index.register(printer.printer_id, printer.id, printer.tenant_id)
 
                     # No need to disconnect/reconnect - instant update!
             else:
@@ -616,6 +659,8 @@ class PrinterConnectionService:
 
             logger.info(f"Handling printer deletion: {printer_data.get('name')} (Key: {printer_key})")
 
+            printer_manager.identity_index.invalidate(numeric_id=printer_id, uuid=printer_data.get('id'))
+
             # Robust cleanup to prevent stale connections that cause system-wide issues
             cleaned_up = False
 
@@ -678,7 +723,8 @@ class PrinterConnectionService:
                 'tenant_id': self.tenant_id,
                 'total_configured': len(printer_manager.printer_configs),
                 'total_connected': len(printer_manager.clients),
-                'printers': []
+                'printers': [],
+                'fleet_connect': fleet_connector.get_progress()
             }
             
             # Get status for each printer
@@ -689,7 +735,8 @@ class PrinterConnectionService:
                     'printer_id': config.get('printer_id'),
                     'ip_address': config.get('ip'),
                     'connected': printer_key in printer_manager.clients,
-                    'enabled': config.get('enabled', True)
+                    'enabled': config.get('enabled', True),
+                    'connect_outcome': fleet_connector.get_outcome(printer_key)
                 }
                 status['printers'].append(printer_status)
             
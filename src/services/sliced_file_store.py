@@ -0,0 +1,392 @@
+"""
+Sliced File Store
+
+Keeps sliced .gcode.3mf outputs on disk, indexed in the sliced_files table,
+so a file can be downloaded again (or sent to another printer) without
+re-slicing and nothing is orphaned when the process restarts.
+
+Key Features:
+- Files are moved into the store directory, not copied
+- Unpinned files expire a TTL after their last access
+- Least recently accessed unpinned files are evicted beyond a byte budget
+- Periodic sweep drops index rows without files, files without rows and
+  stale leftovers in the OrcaSlicer work directory. Files a request is
+  still using (held with hold_work_file) are never swept, however long the
+  request waits for a slicer slot.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import text
+
+from .database_service import get_database_service
+
+logger = logging.getLogger(__name__)
+
+# Where the slicing endpoints stage inputs and outputs
+WORK_DIR = os.path.expanduser("~/orcaslicer-temp")
+
+# Unheld top-level work directory files older than this are removed
+ORPHAN_GRACE_SECONDS = 3600
+
+SWEEP_INTERVAL_SECONDS = 600
+
+_COLUMNS = "id, filename, file_path, size_bytes, source, pinned, access_count, created_at, last_accessed_at"
+
+class SlicedFileStore:
+    """
+    Persistent, size- and TTL-bounded store of sliced files
+    """
+
+    def __init__(self):
+        self.directory = os.path.join(WORK_DIR, "sliced-files")
+        self.max_bytes = 4096 * 1024 * 1024
+        self.ttl = timedelta(hours=2)
+        self.is_running = False
+        self.sweep_task: Optional[asyncio.Task] = None
+        self.evicted_expired = 0
+        self.evicted_for_space = 0
+        self.orphans_removed = 0
+        self._held_work_files: Set[str] = set()
+        self._lock = asyncio.Lock()
+        self._configured = False
+
+    def configure(self, store_config: Optional[Dict[str, Any]]):
+        """Apply the performance.sliced_files config block (max_size_mb, ttl_hours, directory)"""
+        store_config = store_config or {}
+        if store_config.get('directory'):
+            self.directory = os.path.expanduser(store_config['directory'])
+        try:
+            self.max_bytes = int(float(store_config.get('max_size_mb', self.max_bytes / (1024 * 1024))) * 1024 * 1024)
+            self.ttl = timedelta(hours=float(store_config.get('ttl_hours', self.ttl.total_seconds() / 3600)))
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid sliced file store config {store_config}, keeping defaults")
+
+    def _ensure_configured(self):
+        if self._configured:
+            return
+        from .config_service import get_config_service
+        self.configure(get_config_service().get_performance_config().get('sliced_files'))
+        os.makedirs(self.directory, exist_ok=True)
+        self._configured = True
+
+    async def start(self):
+        """Sweep once, then keep sweeping in the background"""
+        if self.is_running:
+            return
+
+        self._ensure_configured()
+        self.is_running = True
+        await self.sweep()
+        self.sweep_task = asyncio.create_task(self._sweep_loop())
+        logger.info(f"Sliced file store started: {self.directory}, "
+                    f"{self.max_bytes // (1024 * 1024)}MB budget, TTL {self.ttl}")
+
+    async def stop(self):
+        """Stop the background sweep"""
+        self.is_running = False
+        if self.sweep_task:
+            self.sweep_task.cancel()
+            try:
+                await self.sweep_task
+            except asyncio.CancelledError:
+                pass
+            self.sweep_task = None
+        logger.info("Sliced file store stopped")
+
+    async def _sweep_loop(self):
+        while self.is_running:
+            try:
+                await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+                await self.sweep()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error sweeping sliced file store: {e}")
+
+    async def add(self, file_path: str, filename: str, source: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Move a sliced file into the store
+
+        Args:
+            file_path: Sliced file; it is moved, so the caller must not delete it
+            filename: Name to offer on download
+            source: What produced it (e.g. 'slice', 'multiply-slice')
+
+        Returns:
+            Index entry for the stored file (see _row_to_dict)
+        """
+        self._ensure_configured()
+        file_id = str(uuid.uuid4())
+        stored_path = os.path.join(self.directory, f"{file_id}.gcode.3mf")
+        await asyncio.to_thread(os.replace, file_path, stored_path)
+        size = os.path.getsize(stored_path)
+        now = datetime.utcnow()
+
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            await session.execute(
+                text("""
+                    INSERT INTO sliced_files
+                        (id, filename, file_path, size_bytes, source, pinned, access_count, created_at, last_accessed_at)
+                    VALUES (:id, :filename, :file_path, :size, :source, 0, 0, :now, :now)
+                """),
+                {"id": file_id, "filename": filename, "file_path": stored_path, "size": size,
+                 "source": source, "now": now}
+            )
+            await session.commit()
+
+        logger.info(f"Stored sliced file {filename} as {file_id} ({size / (1024 * 1024):.1f}MB)")
+        await self.evict(keep_id=file_id)
+        return await self.get(file_id, touch=False)
+
+    async def get(self, file_id: str, touch: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Look up a stored file, recording the access unless touch is False
+
+        Returns None if the id is unknown or its file has gone missing.
+        """
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            result = await session.execute(
+                text(f"SELECT {_COLUMNS} FROM sliced_files WHERE id = :id"),
+                {"id": file_id}
+            )
+            row = result.fetchone()
+            if not row:
+                return None
+
+            if not os.path.exists(row.file_path):
+                await session.execute(text("DELETE FROM sliced_files WHERE id = :id"), {"id": file_id})
+                await session.commit()
+                logger.warning(f"Sliced file {file_id} missing on disk, removed from index")
+                return None
+
+            if touch:
+                await session.execute(
+                    text("""
+                        UPDATE sliced_files SET access_count = access_count + 1, last_accessed_at = :now
+                        WHERE id = :id
+                    """),
+                    {"now": datetime.utcnow(), "id": file_id}
+                )
+                await session.commit()
+
+        return self._row_to_dict(row)
+
+    async def set_pinned(self, file_id: str, pinned: bool) -> bool:
+        """Pin (exempt from eviction) or unpin a file; False if the id is unknown"""
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            result = await session.execute(
+                text("UPDATE sliced_files SET pinned = :pinned, last_accessed_at = :now WHERE id = :id"),
+                {"pinned": 1 if pinned else 0, "now": datetime.utcnow(), "id": file_id}
+            )
+            await session.commit()
+        return bool(result.rowcount)
+
+    async def delete(self, file_id: str) -> bool:
+        """Remove a file and its index entry; False if the id is unknown"""
+        entry = await self.get(file_id, touch=False)
+        if not entry:
+            return False
+        await self._remove([entry])
+        return True
+
+    async def list_files(self) -> List[Dict[str, Any]]:
+        """All stored files, most recently accessed first"""
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            result = await session.execute(
+                text(f"SELECT {_COLUMNS} FROM sliced_files ORDER BY last_accessed_at DESC")
+            )
+            return [self._row_to_dict(row) for row in result.fetchall()]
+
+    async def evict(self, keep_id: Optional[str] = None) -> int:
+        """
+        Remove expired files, then the least recently accessed until under budget
+
+        Pinned files are never removed, nor is keep_id (the file just added).
+
+        Returns:
+            Number of files removed
+        """
+        self._ensure_configured()
+        async with self._lock:
+            db_service = await get_database_service()
+            async with db_service.get_session() as session:
+                result = await session.execute(
+                    text(f"""
+                        SELECT {_COLUMNS} FROM sliced_files
+                        WHERE pinned = 0 AND last_accessed_at < :cutoff
+                    """),
+                    {"cutoff": datetime.utcnow() - self.ttl}
+                )
+                expired = [self._row_to_dict(row) for row in result.fetchall() if row.id != keep_id]
+
+                result = await session.execute(text("SELECT COALESCE(SUM(size_bytes), 0) AS total FROM sliced_files"))
+                total_bytes = result.fetchone().total - sum(entry["size_bytes"] for entry in expired)
+
+                over_budget = []
+                if total_bytes > self.max_bytes:
+                    result = await session.execute(
+                        text(f"""
+                            SELECT {_COLUMNS} FROM sliced_files
+                            WHERE pinned = 0 AND last_accessed_at >= :cutoff
+                            ORDER BY last_accessed_at
+                        """),
+                        {"cutoff": datetime.utcnow() - self.ttl}
+                    )
+                    for row in result.fetchall():
+                        if total_bytes <= self.max_bytes:
+                            break
+                        if row.id == keep_id:
+                            continue
+                        over_budget.append(self._row_to_dict(row))
+                        total_bytes -= row.size_bytes
+
+            await self._remove(expired + over_budget)
+
+        self.evicted_expired += len(expired)
+        self.evicted_for_space += len(over_budget)
+        if expired or over_budget:
+            logger.info(f"Evicted {len(expired)} expired and {len(over_budget)} least recently used sliced files")
+        if total_bytes > self.max_bytes:
+            logger.warning(f"Sliced file store over budget ({total_bytes / (1024 * 1024):.0f}MB) with only pinned files left")
+        return len(expired) + len(over_budget)
+
+    async def sweep(self) -> Dict[str, int]:
+        """
+        Evict, then reconcile the index with the disk
+
+        Returns:
+            Counts of files evicted, stale rows dropped and orphan files removed
+        """
+        evicted = await self.evict()
+
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            result = await session.execute(text("SELECT id, file_path FROM sliced_files"))
+            rows = result.fetchall()
+            missing = [row.id for row in rows if not os.path.exists(row.file_path)]
+            for file_id in missing:
+                await session.execute(text("DELETE FROM sliced_files WHERE id = :id"), {"id": file_id})
+            await session.commit()
+
+        known_paths = {row.file_path for row in rows}
+        orphans = await asyncio.to_thread(self._remove_orphans, known_paths, frozenset(self._held_work_files))
+        self.orphans_removed += orphans
+
+        if missing or orphans:
+            logger.info(f"Sliced file sweep: {len(missing)} stale index rows, {orphans} orphan files removed")
+        return {"evicted": evicted, "stale_rows": len(missing), "orphans_removed": orphans}
+
+    def hold_work_file(self, path: str):
+        """Keep a file staged in the work directory safe from the orphan sweep until released"""
+        self._held_work_files.add(os.path.abspath(path))
+
+    def release_work_files(self, *paths: Optional[str]):
+        """Let the orphan sweep consider these work files again (None is ignored)"""
+        for path in paths:
+            if path:
+                self._held_work_files.discard(os.path.abspath(path))
+
+    def _remove_orphans(self, known_paths: set, held_paths: frozenset = frozenset()) -> int:
+        """Delete unindexed store files and stale, unheld top-level work directory files"""
+        removed = 0
+        cutoff = time.time() - ORPHAN_GRACE_SECONDS
+        candidates = []
+
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path not in known_paths:
+                candidates.append(path)
+
+        if os.path.isdir(WORK_DIR):
+            for name in os.listdir(WORK_DIR):
+                path = os.path.join(WORK_DIR, name)
+                if name.endswith('.3mf') and os.path.isfile(path) and os.path.abspath(path) not in held_paths:
+                    candidates.append(path)
+
+        for path in candidates:
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError as e:
+                logger.debug(f"Could not remove orphan {path}: {e}")
+        return removed
+
+    async def _remove(self, entries: List[Dict[str, Any]]):
+        """Delete files and their index rows"""
+        if not entries:
+            return
+        for entry in entries:
+            try:
+                os.remove(entry["file_path"])
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove sliced file {entry['file_path']}: {e}")
+
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            for entry in entries:
+                await session.execute(text("DELETE FROM sliced_files WHERE id = :id"), {"id": entry["id"]})
+            await session.commit()
+
+    def _row_to_dict(self, row) -> Dict[str, Any]:
+        last_accessed = row.last_accessed_at
+        if isinstance(last_accessed, str):
+            last_accessed = datetime.fromisoformat(last_accessed)
+        created = row.created_at
+        if isinstance(created, str):
+            created = datetime.fromisoformat(created)
+        return {
+            "id": row.id,
+            "filename": row.filename,
+            "file_path": row.file_path,
+            "size_bytes": row.size_bytes,
+            "source": row.source,
+            "pinned": bool(row.pinned),
+            "access_count": row.access_count,
+            "created_at": created.isoformat() if created else None,
+            "last_accessed_at": last_accessed.isoformat() if last_accessed else None,
+            "expires_at": None if row.pinned or not last_accessed else (last_accessed + self.ttl).isoformat()
+        }
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get store size, budget and eviction counters"""
+        self._ensure_configured()
+        db_service = await get_database_service()
+        async with db_service.get_session() as session:
+            result = await session.execute(
+                text("""
+                    SELECT COUNT(*) AS files, COALESCE(SUM(size_bytes), 0) AS total_bytes,
+                           COALESCE(SUM(pinned), 0) AS pinned
+                    FROM sliced_files
+                """)
+            )
+            row = result.fetchone()
+
+        return {
+            "directory": self.directory,
+            "files": row.files,
+            "pinned": row.pinned,
+            "size_mb": round(row.total_bytes / (1024 * 1024), 1),
+            "max_size_mb": round(self.max_bytes / (1024 * 1024), 1),
+            "ttl_hours": self.ttl.total_seconds() / 3600,
+            "held_work_files": len(self._held_work_files),
+            "evicted_expired": self.evicted_expired,
+            "evicted_for_space": self.evicted_for_space,
+            "orphans_removed": self.orphans_removed
+        }
+
+# Global service instance
+sliced_file_store = SlicedFileStore()
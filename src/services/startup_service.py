@@ -7,6 +7,10 @@ import logging
 from typing import List, Callable
 
 from .job_queue_service import job_queue_service
+from .metadata_cache_service import metadata_cache_service
+from .sliced_file_store import sliced_file_store
+from ..utils.process_pool import cpu_worker_pool
+from ..utils.resource_monitor import resource_monitor
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +38,12 @@ class StartupService:
             
         logger.info("Starting up services...")
         
+        # Start resource sampler first: the other services' checks read its snapshot
+        try:
+            await resource_monitor.start()
+        except Exception as e:
+            logger.error(f"Failed to start resource sampler: {e}")
+            
         # Start job queue service
         try:
             await job_queue_service.start()
@@ -42,6 +52,18 @@ class StartupService:
             logger.error(f"Failed to start job queue service: {e}")
             raise
             
+        # Start CPU worker pool (3MF multiplication, metadata parsing)
+        try:
+            await cpu_worker_pool.start()
+        except Exception as e:
+            logger.error(f"Failed to start CPU worker pool: {e}")
+            
+        # Start sliced file store sweeps (TTL/size eviction, orphan cleanup)
+        try:
+            await sliced_file_store.start()
+        except Exception as e:
+            logger.error(f"Failed to start sliced file store: {e}")
+            
         # Run custom startup tasks
         for task in self.startup_tasks:
             try:
@@ -84,6 +106,30 @@ class StartupService:
         except Exception as e:
             logger.error(f"Failed to stop job queue service: {e}")
             
+        # Stop sliced file store sweeps
+        try:
+            await sliced_file_store.stop()
+        except Exception as e:
+            logger.error(f"Failed to stop sliced file store: {e}")
+            
+        # Write buffered metadata cache hit counts before the database closes
+        try:
+            await metadata_cache_service.close()
+        except Exception as e:
+            logger.error(f"Failed to flush metadata cache hit counts: {e}")
+            
+        # Stop CPU worker pool
+        try:
+            await cpu_worker_pool.stop()
+        except Exception as e:
+            logger.error(f"Failed to stop CPU worker pool: {e}")
+            
+        # Stop resource sampler
+        try:
+            await resource_monitor.stop()
+        except Exception as e:
+            logger.error(f"Failed to stop resource sampler: {e}")
+            
         self.is_started = False
         logger.info("All services shut down")
 
@@ -0,0 +1,238 @@
+"""
+Sync Log Writer
+
+Buffers sync_logs rows and writes them in batches. Every upsert and delete
+in DatabaseService logs a row; committing each one in its own transaction
+doubled the write transactions of every sync. Rows are stamped when they
+are logged and inserted with a single executemany once the buffer reaches
+batch_size or flush_interval_seconds have passed, and on shutdown.
+
+The writer also keeps per-minute counts of the last hour, which
+get_sync_stats reads instead of re-aggregating the table on every call.
+"""
+
+import asyncio
+import logging
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_WINDOW_MINUTES = 60
+
+_EPOCH = datetime(1970, 1, 1)
+
+def _minute(moment: datetime) -> int:
+    """Minute index of a naive UTC datetime"""
+    return int((moment - _EPOCH).total_seconds() // 60)
+
+class SyncLogWriter:
+    """Batched sync_logs inserts with a rolling one-hour activity rollup"""
+
+    def __init__(self, db_service):
+        self.db_service = db_service
+        self.batch_size = 200
+        self.flush_interval = 2.0
+        self.rows_logged = 0
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.flushes = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._minutes: "OrderedDict[int, Counter]" = OrderedDict()  # minute -> (operation, status) counts
+        self._last_success: Optional[datetime] = None
+        self._seeded = False
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._timer_task: Optional[asyncio.Task] = None
+        self._configured = False
+
+    def configure(self, log_config: Optional[Dict[str, Any]]):
+        """Apply the performance.sync_logs config block (batch_size, flush_interval_seconds)"""
+        log_config = log_config or {}
+        try:
+            self.batch_size = max(1, int(log_config.get('batch_size', self.batch_size)))
+            self.flush_interval = max(0.1, float(log_config.get('flush_interval_seconds', self.flush_interval)))
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid sync log config {log_config}, keeping batch_size={self.batch_size}, "
+                           f"flush_interval_seconds={self.flush_interval}")
+
+    def _ensure_configured(self):
+        if self._configured:
+            return
+        self._configured = True
+        try:
+            from .config_service import get_config_service
+            self.configure(get_config_service().get_performance_config().get('sync_logs'))
+        except Exception as e:
+            logger.debug(f"Sync log writer using default config: {e}")
+
+    def add(self, operation_type: str, table_name: str, record_id: Optional[str] = None,
+            tenant_id: Optional[str] = None, status: str = "SUCCESS", error_message: Optional[str] = None):
+        """Buffer a sync_logs row; it is written by the next flush"""
+        self._ensure_configured()
+        now = datetime.utcnow()
+        self._buffer.append({
+            "operation_type": operation_type,
+            "table_name": table_name,
+            "record_id": record_id,
+            "tenant_id": tenant_id,
+            "status": status,
+            "error_message": error_message,
+            "created_at": now
+        })
+        self.rows_logged += 1
+        self._count(now, operation_type, status)
+
+        if self._timer_task is None or self._timer_task.done():
+            self._timer_task = asyncio.create_task(self._flush_loop())
+        if len(self._buffer) >= self.batch_size and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in sync log flush loop: {e}")
+
+    def _lock(self) -> asyncio.Lock:
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        return self._flush_lock
+
+    async def flush(self):
+        """Insert all buffered rows in one transaction"""
+        async with self._lock():
+            await self._write_buffer()
+
+    async def _write_buffer(self):
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        try:
+            async with self.db_service.get_session() as session:
+                await session.execute(
+                    text("""
+                        INSERT INTO sync_logs
+                            (operation_type, table_name, record_id, tenant_id, status, error_message, created_at)
+                        VALUES (:operation_type, :table_name, :record_id, :tenant_id, :status, :error_message, :created_at)
+                    """),
+                    rows
+                )
+                await session.commit()
+            self.rows_written += len(rows)
+            self.flushes += 1
+        except Exception as e:
+            # Don't let logging failures break the main operation
+            self.rows_dropped += len(rows)
+            logger.error(f"Failed to write {len(rows)} sync log entries: {e}")
+
+    async def close(self):
+        """Stop the flush timer and write what is buffered"""
+        for task in (self._timer_task, self._flush_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._timer_task = None
+        self._flush_task = None
+        await self.flush()
+
+    # Rollups
+
+    def _count(self, created_at: datetime, operation_type: str, status: str, count: int = 1):
+        minute = _minute(created_at)
+        self._minutes.setdefault(minute, Counter())[(operation_type, status)] += count
+        if status == "SUCCESS" and (self._last_success is None or created_at > self._last_success):
+            self._last_success = created_at
+        self._prune()
+
+    def _prune(self):
+        oldest = _minute(datetime.utcnow()) - ROLLUP_WINDOW_MINUTES
+        while self._minutes:
+            minute = next(iter(self._minutes))
+            if minute >= oldest:
+                break
+            del self._minutes[minute]
+
+    async def _seed(self):
+        """
+        Rebuild the counts from the table once, so a restart does not reset them
+
+        Runs under the flush lock after writing the buffer, so the table
+        holds everything logged so far except rows added during the query,
+        which are still buffered and counted on top.
+        """
+        await self._write_buffer()
+        async with self.db_service.get_session() as session:
+            result = await session.execute(
+                text("""
+                    SELECT strftime('%Y-%m-%d %H:%M:00', created_at) AS minute, operation_type, status, COUNT(*)
+                    FROM sync_logs
+                    WHERE created_at >= :since
+                    GROUP BY minute, operation_type, status
+                """),
+                {"since": datetime.utcnow() - timedelta(minutes=ROLLUP_WINDOW_MINUTES)}
+            )
+            rows = result.fetchall()
+            last_sync = await session.execute(
+                text("SELECT MAX(created_at) FROM sync_logs WHERE status = 'SUCCESS'")
+            )
+            last_success = last_sync.scalar()
+
+        self._minutes = OrderedDict()
+        self._last_success = None
+        for minute, operation_type, status, count in sorted(rows):
+            self._count(datetime.fromisoformat(minute), operation_type, status, count)
+        for row in self._buffer:
+            self._count(row["created_at"], row["operation_type"], row["status"])
+        if isinstance(last_success, str):
+            last_success = datetime.fromisoformat(last_success)
+        if last_success and (self._last_success is None or last_success > self._last_success):
+            self._last_success = last_success
+
+    async def get_rollup(self) -> Dict[str, Any]:
+        """
+        Activity over the last hour, as get_sync_stats reports it
+
+        Returns:
+            {'last_sync': str or None, 'recent_activity': [{'operation', 'status', 'count'}]}
+        """
+        if not self._seeded:
+            async with self._lock():
+                if not self._seeded:
+                    await self._seed()
+                    self._seeded = True
+
+        self._prune()
+        totals = Counter()
+        for counts in self._minutes.values():
+            totals.update(counts)
+        return {
+            # Same format as the DateTime column, which the table query returned
+            'last_sync': str(self._last_success) if self._last_success else None,
+            'recent_activity': [
+                {'operation': operation, 'status': status, 'count': count}
+                for (operation, status), count in totals.most_common()
+            ]
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer size and write counters"""
+        return {
+            "batch_size": self.batch_size,
+            "flush_interval_seconds": self.flush_interval,
+            "buffered": len(self._buffer),
+            "rows_logged": self.rows_logged,
+            "rows_written": self.rows_written,
+            "rows_dropped": self.rows_dropped,
+            "flushes": self.flushes
+        }
@@ -0,0 +1,15 @@
+"""
+Content hashing for files on disk
+"""
+
+import hashlib
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def hash_file(file_path: str) -> str:
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
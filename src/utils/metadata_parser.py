@@ -17,18 +17,252 @@ The parser extracts the following metadata:
 - Bed/plate type
 - Print profile used
 - Object count (number of objects/instances in the print)
+
+parse_3mf_metadata_and_plates() additionally returns a per-plate index
+(object count, print time, filament per slot, layer count, thumbnail
+locations) for multi-plate projects.
 """
 
+import io
 import zipfile
 import xml.etree.ElementTree as ET
 import json
 import logging
 import re
+import struct
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, BinaryIO, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever parse_3mf_metadata output changes so cached results are re-parsed
+# 2: per-plate index; object_count is that of the first plate
+METADATA_PARSER_VERSION = 2
+
+# Top-level keys read from Metadata/project_settings.config
+PROJECT_SETTINGS_KEYS = ('curr_bed_type', 'default_print_profile', 'printer_model')
+
+# project_settings.config larger than this (uncompressed bytes) is streamed
+# instead of loaded whole; below it json.load is faster and memory is trivial
+PROJECT_SETTINGS_STREAM_THRESHOLD = 512 * 1024
+
+# Per-plate members of a sliced project, e.g. Metadata/plate_2.gcode,
+# Metadata/plate_2_small.png, Metadata/plate_no_light_2.png, Metadata/top_2.png
+_PLATE_MEMBER = re.compile(r'^Metadata/(plate|plate_no_light|top|pick)_(\d+)(_small)?\.(gcode|png)$')
+_GCODE_LABEL_IDS = re.compile(r'; model label id:\s*([0-9,\s]+)')
+_GCODE_LAYER_COUNT = re.compile(r'; total layer number:\s*(\d+)')
+GCODE_HEADER_BYTES = 10000
+_ZIP_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+
+_JSON_STRUCTURE = re.compile(r'["\[\]{}]')
+_JSON_STRING_END = re.compile(r'["\\]')
+_JSON_SCALAR_END = re.compile(r'[,}\]\s]')
+_JSON_WHITESPACE = re.compile(r'\s*')
+_JSON_NUMBER_CHARS = frozenset('0123456789.eE+-')
+_JSON_MEMBER_KEY = re.compile(r'\s*"((?:[^"\\]|\\.)*)"\s*:\s*')
+_JSON_MEMBER_END = re.compile(r'\s*([,}])')
+_OVERSIZED = object()
+
+
+class _JsonObjectScanner:
+    """
+    Incremental scanner over the members of a top-level JSON object.
+
+    Text is read in fixed-size chunks and consumed text is discarded, so
+    memory stays at roughly one chunk plus one member value. Values larger
+    than max_value_size are skipped by matching brackets and strings
+    without building Python objects.
+    """
+
+    def __init__(self, stream: BinaryIO, chunk_size: int, max_value_size: int):
+        self.reader = io.TextIOWrapper(stream, encoding='utf-8-sig')
+        self.chunk_size = chunk_size
+        self.max_value_size = max_value_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping consumed text; False at end of input"""
+        if self.eof:
+            return False
+        chunk = self.reader.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Next non-whitespace character without consuming it ('' at end)"""
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos} of buffered JSON")
+        self.pos += 1
+
+    def _skip_string(self):
+        """Skip a string starting at the opening quote"""
+        self.pos += 1
+        while True:
+            match = _JSON_STRING_END.search(self.buffer, self.pos)
+            if match is None:
+                self.pos = len(self.buffer)
+            elif match.group() == '"':
+                self.pos = match.end()
+                return
+            elif match.end() < len(self.buffer):
+                self.pos = match.end() + 1  # backslash plus the escaped character
+                continue
+            else:
+                self.pos = match.start()  # keep the backslash until its escaped char arrives
+            if not self._fill():
+                raise ValueError("Unterminated string in JSON")
+
+    def _skip_value(self):
+        """Skip one value of any type"""
+        first = self._peek()
+        if first == '"':
+            self._skip_string()
+        elif first in '{[':
+            depth = 0
+            while True:
+                match = _JSON_STRUCTURE.search(self.buffer, self.pos)
+                if match is None:
+                    self.pos = len(self.buffer)
+                    if not self._fill():
+                        raise ValueError("Unterminated array or object in JSON")
+                    continue
+                char = match.group()
+                if char == '"':
+                    self.pos = match.start()
+                    self._skip_string()
+                    continue
+                self.pos = match.end()
+                depth += 1 if char in '{[' else -1
+                if depth == 0:
+                    return
+        elif first:
+            while True:
+                match = _JSON_SCALAR_END.search(self.buffer, self.pos)
+                if match:
+                    self.pos = match.start()
+                    return
+                self.pos = len(self.buffer)
+                if not self._fill():
+                    return
+        else:
+            raise ValueError("Unexpected end of JSON")
+
+    def _read_value(self) -> Any:
+        """Decode one value, or skip it if it grows past max_value_size"""
+        self._peek()
+        start = self.pos
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number cut off at the chunk boundary still decodes ("12" of
+                # "12.5"); only trust it once a non-number character follows
+                if self.eof or (end < len(self.buffer) and self.buffer[end] not in _JSON_NUMBER_CHARS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if len(self.buffer) - start > self.max_value_size:
+                self._skip_value()
+                return _OVERSIZED
+            if not self._fill():
+                self.eof = True
+            start = self.pos
+
+    def members(self, wanted: set):
+        """Yield (key, value) for wanted keys of the top-level object"""
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            # Fast path: a whole member already buffered is matched and decoded
+            # with two regexes and one C decode. Unwanted values are decoded
+            # and dropped too - far faster than scanning them in Python, and
+            # memory is still bounded by the largest single value.
+            key_match = _JSON_MEMBER_KEY.match(self.buffer, self.pos)
+            if key_match:
+                try:
+                    value, end = self.decoder.raw_decode(self.buffer, key_match.end())
+                    end_match = _JSON_MEMBER_END.match(self.buffer, end)
+                except json.JSONDecodeError:
+                    end_match = None
+                if end_match:
+                    key = key_match.group(1)
+                    if '\\' in key:
+                        key = json.loads(f'"{key}"')
+                    self.pos = end_match.end()
+                    if key in wanted:
+                        yield key, value
+                    if end_match.group(1) == '}':
+                        return
+                    continue
+
+            # Slow path: the member spans a chunk boundary (or is malformed)
+            if self._peek() != '"':
+                raise ValueError("Expected object key in JSON")
+            key = self._read_value()
+            self._expect(':')
+            value = self._read_value()
+            if key in wanted and value is not _OVERSIZED:
+                yield key, value
+
+            separator = self._peek()
+            self.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError("Expected ',' or '}' in JSON object")
+
+
+def extract_json_keys(
+    stream: BinaryIO,
+    keys: Iterable[str],
+    chunk_size: int = 64 * 1024,
+    max_value_size: int = 1024 * 1024
+) -> Dict[str, Any]:
+    """
+    Read selected top-level keys from a JSON object without loading it.
+
+    Stops reading as soon as every requested key has been found. Values
+    larger than max_value_size are skipped rather than decoded and are
+    left out of the result.
+
+    Args:
+        stream: Binary file-like object positioned at the start of the JSON
+        keys: Top-level keys to extract
+        chunk_size: Characters read per chunk
+        max_value_size: Largest value (in characters) that will be decoded
+
+    Returns:
+        Dictionary of the requested keys that are present
+
+    Raises:
+        ValueError: If the input is not a well-formed JSON object
+    """
+    wanted = set(keys)
+    found = {}
+    scanner = _JsonObjectScanner(stream, chunk_size, max_value_size)
+    for key, value in scanner.members(wanted):
+        found[key] = value
+        if len(found) == len(wanted):
+            break
+    return found
+
 
 def _map_printer_name_to_id(printer_name: str) -> Optional[str]:
     """
@@ -79,6 +313,26 @@ def parse_3mf_metadata(file_path: str) -> Dict[str, Any]:
         >>> print(f"Print time: {metadata['print_time_seconds']} seconds")
         >>> print(f"Filament: {metadata['filament_weight_grams']}g of {metadata['filament_type']}")
     """
+    metadata, _ = parse_3mf_metadata_and_plates(file_path)
+    return metadata
+
+
+def parse_3mf_metadata_and_plates(file_path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Parse 3MF file metadata and its per-plate index in one pass.
+
+    The archive is opened once and slice_info.config is parsed once; the
+    plate index comes from a single walk over the ZIP central directory
+    plus the header of each plate's G-code.
+
+    Args:
+        file_path: Path to the 3MF file
+
+    Returns:
+        Tuple of (metadata, plates). metadata is the parse_3mf_metadata()
+        dictionary; plates is a list of plate entries ordered by plate index
+        (see _index_plates), empty if the file has no sliced plates.
+    """
     metadata = {
         'print_time_seconds': None,
         'filament_weight_grams': None,
@@ -91,12 +345,13 @@ def parse_3mf_metadata(file_path: str) -> Dict[str, Any]:
         'default_print_profile': None,
         'object_count': None,
     }
+    plates = []
 
     # Validate file exists
     file_path_obj = Path(file_path)
     if not file_path_obj.exists():
         logger.error(f"3MF file not found: {file_path}")
-        return metadata
+        return metadata, plates
 
     # Validate file extension
     if file_path_obj.suffix.lower() != '.3mf':
@@ -104,14 +359,17 @@ def parse_3mf_metadata(file_path: str) -> Dict[str, Any]:
         # Continue anyway - file might still be a valid 3MF
 
     try:
-        # Open 3MF file as ZIP archive
-        with zipfile.ZipFile(file_path, 'r') as zip_ref:
+        # Open 3MF file as ZIP archive. The raw handle is shared with the
+        # ZipFile so thumbnail offsets can be read from local headers.
+        with open(file_path, 'rb') as raw, zipfile.ZipFile(raw, 'r') as zip_ref:
             # Parse slice_info.config (fast, small XML file)
             # This contains printer_model_id from the slicing profile
-            try:
-                metadata.update(_parse_slice_info(zip_ref))
-            except Exception as e:
-                logger.warning(f"Failed to parse slice_info.config from {file_path}: {e}")
+            slice_info = _read_slice_info(zip_ref)
+            if slice_info is not None:
+                try:
+                    metadata.update(_parse_slice_info(slice_info))
+                except Exception as e:
+                    logger.warning(f"Failed to parse slice_info.config from {file_path}: {e}")
 
             # Parse project_settings.config (larger JSON file)
             # This contains the actual target printer model, which overrides
@@ -122,28 +380,44 @@ def parse_3mf_metadata(file_path: str) -> Dict[str, Any]:
             except Exception as e:
                 logger.warning(f"Failed to parse project_settings.config from {file_path}: {e}")
 
-            # Count objects in the 3MF file
+            # Index plates; the object count is that of the first plate,
+            # which is the one printed by default
             try:
-                object_count = _count_objects_in_3mf(zip_ref)
-                metadata['object_count'] = object_count
+                plates = _index_plates(zip_ref, raw, slice_info)
+                if plates:
+                    metadata['object_count'] = plates[0]['object_count']
             except Exception as e:
-                logger.warning(f"Failed to count objects in {file_path}: {e}")
+                logger.warning(f"Failed to index plates in {file_path}: {e}")
 
         # Log successful extraction
         non_null_count = sum(1 for v in metadata.values() if v is not None)
-        logger.info(f"Extracted {non_null_count}/10 metadata fields from {file_path_obj.name}")
+        logger.info(f"Extracted {non_null_count}/10 metadata fields and {len(plates)} plate(s) from {file_path_obj.name}")
 
-        return metadata
+        return metadata, plates
 
     except zipfile.BadZipFile:
         logger.error(f"Invalid ZIP/3MF file: {file_path}")
-        return metadata
+        return metadata, plates
     except Exception as e:
         logger.error(f"Unexpected error parsing 3MF file {file_path}: {e}")
-        return metadata
+        return metadata, plates
 
 
-def _parse_slice_info(zip_ref: zipfile.ZipFile) -> Dict[str, Any]:
+def _read_slice_info(zip_ref: zipfile.ZipFile) -> Optional[ET.Element]:
+    """
+    Load Metadata/slice_info.config, returning its root element or None.
+    """
+    try:
+        with zip_ref.open('Metadata/slice_info.config') as f:
+            return ET.parse(f).getroot()
+    except KeyError:
+        logger.warning("Metadata/slice_info.config not found in 3MF archive")
+    except ET.ParseError as e:
+        logger.error(f"Failed to parse slice_info.config XML: {e}")
+    return None
+
+
+def _parse_slice_info(root: ET.Element) -> Dict[str, Any]:
     """
     Parse Metadata/slice_info.config file (XML format).
 
@@ -157,102 +431,92 @@ def _parse_slice_info(zip_ref: zipfile.ZipFile) -> Dict[str, Any]:
     """
     metadata = {}
 
-    try:
-        with zip_ref.open('Metadata/slice_info.config') as f:
-            tree = ET.parse(f)
-            root = tree.getroot()
-
-            # Extract plate metadata (prediction, weight, printer_model_id, nozzle_diameters)
-            for meta in root.findall('.//plate/metadata'):
-                key = meta.get('key')
-                value = meta.get('value')
-
-                if key == 'prediction':
-                    # Print time in seconds
-                    try:
-                        metadata['print_time_seconds'] = int(value)
-                    except (ValueError, TypeError):
-                        logger.warning(f"Invalid prediction value: {value}")
-
-                elif key == 'weight':
-                    # Filament weight in grams
-                    try:
-                        metadata['filament_weight_grams'] = float(value)
-                    except (ValueError, TypeError):
-                        logger.warning(f"Invalid weight value: {value}")
-
-                elif key == 'printer_model_id':
-                    # Printer model code (N1, N2S, P1P, X1, etc.)
-                    metadata['printer_model_id'] = value
-
-                elif key == 'nozzle_diameters':
-                    # Nozzle diameter in millimeters
-                    try:
-                        metadata['nozzle_diameter'] = float(value)
-                    except (ValueError, TypeError):
-                        logger.warning(f"Invalid nozzle_diameters value: {value}")
-
-            # Extract filament info (type, length, weight for multi-material support)
-            filaments = root.findall('.//plate/filament')
-            if filaments:
-                # For multi-material prints, sum the lengths and weights
-                total_length_m = 0.0
-                total_weight_g = 0.0
-                filament_types = []
-
-                for filament in filaments:
-                    # Filament length in meters
-                    used_m = filament.get('used_m')
-                    if used_m:
-                        try:
-                            total_length_m += float(used_m)
-                        except (ValueError, TypeError):
-                            logger.warning(f"Invalid used_m value: {used_m}")
-
-                    # Filament weight in grams
-                    used_g = filament.get('used_g')
-                    if used_g:
-                        try:
-                            total_weight_g += float(used_g)
-                        except (ValueError, TypeError):
-                            logger.warning(f"Invalid used_g value: {used_g}")
-
-                    # Filament type
-                    ftype = filament.get('type')
-                    if ftype and ftype not in filament_types:
-                        filament_types.append(ftype)
-
-                # Store aggregated values
-                if total_length_m > 0:
-                    metadata['filament_length_meters'] = round(total_length_m, 2)
-
-                # Use weight from filament element if available, otherwise use metadata weight
-                if total_weight_g > 0:
-                    metadata['filament_weight_grams'] = round(total_weight_g, 2)
-
-                # Store filament types (comma-separated for multi-material)
-                if filament_types:
-                    metadata['filament_type'] = ', '.join(filament_types)
-
-            # Calculate layer count from layer_ranges
-            # Format: "0 41" means layers 0-41 = 42 total layers
-            layer_list = root.find('.//plate/layer_filament_lists/layer_filament_list')
-            if layer_list is not None:
-                layer_ranges = layer_list.get('layer_ranges')
-                if layer_ranges:
-                    try:
-                        parts = layer_ranges.split()
-                        if len(parts) >= 2:
-                            start = int(parts[0])
-                            end = int(parts[1])
-                            metadata['layer_count'] = end - start + 1
-                    except (ValueError, IndexError) as e:
-                        logger.warning(f"Invalid layer_ranges format: {layer_ranges} - {e}")
+    # Extract plate metadata (prediction, weight, printer_model_id, nozzle_diameters)
+    for meta in root.findall('.//plate/metadata'):
+        key = meta.get('key')
+        value = meta.get('value')
 
-    except KeyError:
-        logger.warning("Metadata/slice_info.config not found in 3MF archive")
-    except ET.ParseError as e:
-        logger.error(f"Failed to parse slice_info.config XML: {e}")
+        if key == 'prediction':
+            # Print time in seconds
+            try:
+                metadata['print_time_seconds'] = int(value)
+            except (ValueError, TypeError):
+                logger.warning(f"Invalid prediction value: {value}")
+
+        elif key == 'weight':
+            # Filament weight in grams
+            try:
+                metadata['filament_weight_grams'] = float(value)
+            except (ValueError, TypeError):
+                logger.warning(f"Invalid weight value: {value}")
+
+        elif key == 'printer_model_id':
+            # Printer model code (N1, N2S, P1P, X1, etc.)
+            metadata['printer_model_id'] = value
+
+        elif key == 'nozzle_diameters':
+            # Nozzle diameter in millimeters
+            try:
+                metadata['nozzle_diameter'] = float(value)
+            except (ValueError, TypeError):
+                logger.warning(f"Invalid nozzle_diameters value: {value}")
+
+    # Extract filament info (type, length, weight for multi-material support)
+    filaments = root.findall('.//plate/filament')
+    if filaments:
+        # For multi-material prints, sum the lengths and weights
+        total_length_m = 0.0
+        total_weight_g = 0.0
+        filament_types = []
+
+        for filament in filaments:
+            # Filament length in meters
+            used_m = filament.get('used_m')
+            if used_m:
+                try:
+                    total_length_m += float(used_m)
+                except (ValueError, TypeError):
+                    logger.warning(f"Invalid used_m value: {used_m}")
+
+            # Filament weight in grams
+            used_g = filament.get('used_g')
+            if used_g:
+                try:
+                    total_weight_g += float(used_g)
+                except (ValueError, TypeError):
+                    logger.warning(f"Invalid used_g value: {used_g}")
+
+            # Filament type
+            ftype = filament.get('type')
+            if ftype and ftype not in filament_types:
+                filament_types.append(ftype)
+
+        # Store aggregated values
+        if total_length_m > 0:
+            metadata['filament_length_meters'] = round(total_length_m, 2)
+
+        # Use weight from filament element if available, otherwise use metadata weight
+        if total_weight_g > 0:
+            metadata['filament_weight_grams'] = round(total_weight_g, 2)
+
+        # Store filament types (comma-separated for multi-material)
+        if filament_types:
+            metadata['filament_type'] = ', '.join(filament_types)
+
+    # Calculate layer count from layer_ranges
+    # Format: "0 41" means layers 0-41 = 42 total layers
+    layer_list = root.find('.//plate/layer_filament_lists/layer_filament_list')
+    if layer_list is not None:
+        layer_ranges = layer_list.get('layer_ranges')
+        if layer_ranges:
+            try:
+                parts = layer_ranges.split()
+                if len(parts) >= 2:
+                    start = int(parts[0])
+                    end = int(parts[1])
+                    metadata['layer_count'] = end - start + 1
+            except (ValueError, IndexError) as e:
+                logger.warning(f"Invalid layer_ranges format: {layer_ranges} - {e}")
 
     return metadata
 
@@ -269,8 +533,15 @@ def _parse_project_settings(zip_ref: zipfile.ZipFile) -> Dict[str, Any]:
     metadata = {}
 
     try:
-        with zip_ref.open('Metadata/project_settings.config') as f:
-            settings = json.load(f)
+        info = zip_ref.getinfo('Metadata/project_settings.config')
+        with zip_ref.open(info) as f:
+            if info.file_size <= PROJECT_SETTINGS_STREAM_THRESHOLD:
+                # Typical single-plate settings: the C decoder is fastest
+                settings = json.load(f)
+            else:
+                # Big multi-plate projects: only three of several hundred keys
+                # are needed, so stream and stop once they are found
+                settings = extract_json_keys(f, PROJECT_SETTINGS_KEYS)
 
             # Extract bed type
             if 'curr_bed_type' in settings:
@@ -292,64 +563,147 @@ def _parse_project_settings(zip_ref: zipfile.ZipFile) -> Dict[str, Any]:
 
     except KeyError:
         logger.warning("Metadata/project_settings.config not found in 3MF archive")
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         logger.error(f"Failed to parse project_settings.config JSON: {e}")
 
     return metadata
 
 
-def _count_objects_in_3mf(zip_ref: zipfile.ZipFile) -> Optional[int]:
+def _index_plates(zip_ref: zipfile.ZipFile, raw: BinaryIO,
+                  slice_info: Optional[ET.Element]) -> List[Dict[str, Any]]:
     """
-    Count the number of objects in a 3MF print file.
-
-    Tries two methods in order:
-    1. G-code model label id (for sliced multi-object files)
-    2. slice_info.config object elements (for other files)
+    Build the per-plate index of a sliced 3MF file.
+
+    Each entry contains:
+    - plate_index: 1-based plate number (as used by start_print)
+    - object_count: from the plate G-code's model label ids, otherwise the
+      non-skipped objects listed for the plate in slice_info.config
+    - print_time_seconds / filament_weight_grams: slicer estimates for the plate
+    - filaments: per filament slot {slot, type, color, used_g, used_m}
+    - layer_count: from the G-code header, otherwise the layer ranges
+    - gcode_member: name of the plate's G-code inside the archive, if sliced
+    - thumbnails: image kind -> location of its data inside the archive
 
     Args:
-        zip_ref: Open ZipFile reference to the 3MF file
+        zip_ref: Open ZipFile reading from raw
+        raw: Binary file handle of the archive, used to read local headers
+        slice_info: Parsed slice_info.config root, if present
 
     Returns:
-        Number of objects, or None if count cannot be determined
+        Plate entries ordered by plate_index
+    """
+    plates: Dict[int, Dict[str, Any]] = {}
+
+    def plate_entry(index: int) -> Dict[str, Any]:
+        if index not in plates:
+            plates[index] = {
+                'plate_index': index,
+                'object_count': None,
+                'print_time_seconds': None,
+                'filament_weight_grams': None,
+                'filaments': [],
+                'layer_count': None,
+                'gcode_member': None,
+                'thumbnails': {},
+            }
+        return plates[index]
+
+    # One walk over the central directory finds every plate's G-code and
+    # images; thumbnail offsets are resolved now, before any member is open
+    gcode_members = {}
+    for info in zip_ref.infolist():
+        match = _PLATE_MEMBER.match(info.filename)
+        if not match:
+            continue
+        kind, index, small, extension = match.groups()
+        entry = plate_entry(int(index))
+        if extension == 'gcode':
+            entry['gcode_member'] = info.filename
+            gcode_members[int(index)] = info
+        else:
+            entry['thumbnails'][kind + (small or '')] = _member_location(raw, info)
+
+    if slice_info is not None:
+        for position, plate in enumerate(slice_info.findall('.//plate'), start=1):
+            values = {meta.get('key'): meta.get('value') for meta in plate.findall('metadata')}
+            entry = plate_entry(_to_int(values.get('index')) or position)
+            entry['print_time_seconds'] = _to_int(values.get('prediction'))
+            entry['filament_weight_grams'] = _to_float(values.get('weight'))
+
+            for filament in plate.findall('filament'):
+                entry['filaments'].append({
+                    'slot': _to_int(filament.get('id')),
+                    'type': filament.get('type'),
+                    'color': filament.get('color'),
+                    'used_g': _to_float(filament.get('used_g')),
+                    'used_m': _to_float(filament.get('used_m')),
+                })
+            if entry['filament_weight_grams'] is None and entry['filaments']:
+                entry['filament_weight_grams'] = round(sum(f['used_g'] or 0.0 for f in entry['filaments']), 2)
+
+            objects = [o for o in plate.findall('object') if o.get('skipped', 'false').lower() != 'true']
+            if objects:
+                entry['object_count'] = len(objects)
+
+            # Multi-colour plates list one range per filament change; the
+            # plate spans from the lowest start to the highest end
+            bounds = []
+            for layer_list in plate.findall('layer_filament_lists/layer_filament_list'):
+                parts = (layer_list.get('layer_ranges') or '').split()
+                bounds.extend(int(part) for part in parts if part.isdigit())
+            if bounds:
+                entry['layer_count'] = max(bounds) - min(bounds) + 1
+
+    # G-code headers are authoritative for what will actually be printed
+    for index, info in gcode_members.items():
+        entry = plates[index]
+        with zip_ref.open(info) as f:
+            header = f.read(GCODE_HEADER_BYTES).decode('utf-8', errors='ignore')
+
+        # Look for: ; model label id: 98,99,100,101,...
+        match = _GCODE_LABEL_IDS.search(header)
+        if match:
+            ids = [label.strip() for label in match.group(1).split(',') if label.strip()]
+            entry['object_count'] = len(ids)
+
+        match = _GCODE_LAYER_COUNT.search(header)
+        if match:
+            entry['layer_count'] = int(match.group(1))
+
+    return [plates[index] for index in sorted(plates)]
+
+
+def _member_location(raw: BinaryIO, info: zipfile.ZipInfo) -> Dict[str, Any]:
     """
+    Locate a member's data inside the archive so it can be served with a
+    ranged read (and, if deflated, a raw zlib decompress) without ZipFile.
+    """
+    raw.seek(info.header_offset)
+    header = _ZIP_LOCAL_HEADER.unpack(raw.read(_ZIP_LOCAL_HEADER.size))
+    if header[0] != b'PK\x03\x04':
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    name_length, extra_length = header[9], header[10]
+
+    return {
+        'member': info.filename,
+        'offset': info.header_offset + _ZIP_LOCAL_HEADER.size + name_length + extra_length,
+        'compressed_size': info.compress_size,
+        'size': info.file_size,
+        'compression': info.compress_type,
+    }
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
     try:
-        # Method 1: Try G-code header
-        try:
-            with zip_ref.open('Metadata/plate_1.gcode') as f:
-                # Read first 10KB (header section)
-                gcode_header = f.read(10000).decode('utf-8', errors='ignore')
-
-                # Look for: ; model label id: 98,99,100,101,...
-                match = re.search(r'; model label id:\s*([0-9,\s]+)', gcode_header)
-                if match:
-                    # Count comma-separated IDs
-                    ids = [id.strip() for id in match.group(1).split(',') if id.strip()]
-                    logger.info(f"Found {len(ids)} object(s) via G-code")
-                    return len(ids)
-        except:
-            pass  # Try next method
-
-        # Method 2: Try slice_info.config
-        try:
-            with zip_ref.open('Metadata/slice_info.config') as f:
-                tree = ET.parse(f)
-                root = tree.getroot()
-
-                # Find all <object> elements, filter out skipped
-                objects = root.findall('.//plate/object')
-                active = [o for o in objects if o.get('skipped', 'false').lower() != 'true']
-
-                if active:
-                    logger.info(f"Found {len(active)} object(s) via slice_info")
-                    return len(active)
-        except:
-            pass  # Both methods failed
-
-        logger.warning("Could not determine object count")
+        return int(value)
+    except (TypeError, ValueError):
         return None
 
-    except Exception as e:
-        logger.error(f"Error counting objects: {e}")
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
         return None
 
 
@@ -0,0 +1,337 @@
+"""
+Process pool for CPU-bound work
+
+3MF multiplication, mesh maths and metadata parsing hold the GIL for
+seconds at a time. Run on the event loop (or in a thread) they stall
+websocket streams and API calls, so CPUWorkerPool runs them in separate
+processes instead.
+
+The pool keeps the configured number of long-lived worker processes, forked
+from a forkserver that has NumPy and the 3MF code preloaded. Each worker runs
+one task at a time; further tasks wait for a slot. A worker only exits when
+its task is cancelled (it is terminated) or it crashes, and is then replaced
+with a fresh one, so a crash only loses that task. Log records from the
+workers are forwarded to the parent's loggers.
+
+multiprocessing re-imports the entry script in every child it starts, which
+for this application means all of src.main. Workers pay that once at pool
+start rather than once per task.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional
+
+from .resource_monitor import resource_monitor
+
+logger = logging.getLogger(__name__)
+
+# process: run tasks in forkserver children (default)
+# thread: run tasks in the default thread pool (no isolation, no hard cancel)
+POOL_MODES = ("process", "thread")
+
+# Package the application is imported as (normally "src")
+_PACKAGE = __name__.split('.')[0]
+
+# Modules imported once by the forkserver so workers start warm
+PRELOAD_MODULES = (
+    'numpy',
+    f'{_PACKAGE}.core.threemf_processor',
+    f'{_PACKAGE}.utils.metadata_parser',
+)
+
+class _PipeLogHandler(logging.Handler):
+    """Send log records from a worker process to its parent over the result pipe"""
+
+    def __init__(self, conn):
+        super().__init__()
+        self.conn = conn
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            payload = dict(record.__dict__)
+            payload['msg'] = record.getMessage()
+            payload['args'] = None
+            if record.exc_info:
+                payload['exc_text'] = logging.Formatter().formatException(record.exc_info)
+            payload['exc_info'] = None
+            self.conn.send(("log", payload))
+        except Exception:
+            self.handleError(record)
+
+def _worker_main(conn, log_level: int):
+    """Entry point of a worker process: run tasks from the pipe until it closes"""
+    root = logging.getLogger()
+    root.handlers[:] = [_PipeLogHandler(conn)]
+    root.setLevel(log_level)
+
+    while True:
+        try:
+            fn, args, kwargs = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            try:
+                conn.send(("error", e))
+            except Exception:
+                # The exception itself could not be pickled
+                conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+        else:
+            try:
+                conn.send(("ok", result))
+            except Exception as e:
+                conn.send(("error", RuntimeError(f"Result could not be returned: {e}")))
+    conn.close()
+
+class _Worker:
+    """A worker process and the parent's end of its pipe"""
+
+    def __init__(self, process: multiprocessing.process.BaseProcess, conn):
+        self.process = process
+        self.conn = conn
+        self.tasks_run = 0
+
+class CPUWorkerPool:
+    """
+    Bounded pool of worker processes for CPU-bound tasks
+    """
+
+    def __init__(self):
+        self.mode = "process"
+        self.max_workers = 2
+        self.is_running = False
+        self.tasks_started = 0
+        self.tasks_completed = 0
+        self.tasks_failed = 0
+        self.tasks_cancelled = 0
+        self.tasks_rejected = 0
+        self.tasks_waiting = 0
+        self.workers_replaced = 0
+        self._context = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._workers: Dict[int, _Worker] = {}
+        self._idle: List[_Worker] = []
+
+    def configure(self, pool_config: Optional[Dict[str, Any]]):
+        """Apply the performance.cpu_pool config block (mode, workers)"""
+        pool_config = pool_config or {}
+
+        mode = str(pool_config.get('mode', self.mode)).lower()
+        if mode not in POOL_MODES:
+            logger.warning(f"Invalid CPU pool mode '{mode}', using {self.mode}")
+        else:
+            self.mode = mode
+
+        try:
+            self.max_workers = max(1, int(pool_config.get('workers', self.max_workers)))
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid CPU pool workers '{pool_config.get('workers')}', using {self.max_workers}")
+
+    async def start(self):
+        """Load config and start the workers"""
+        if self.is_running:
+            return
+
+        from ..services.config_service import get_config_service
+        self.configure(get_config_service().get_performance_config().get('cpu_pool'))
+
+        if self.mode == "process":
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            self._context = multiprocessing.get_context(method)
+            if method == 'forkserver':
+                self._context.set_forkserver_preload(list(PRELOAD_MODULES))
+            # Workers import the application in the background while the rest of startup runs
+            for _ in range(self.max_workers):
+                self._idle.append(self._start_worker())
+
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self.is_running = True
+        logger.info(f"CPU worker pool started: mode={self.mode}, workers={self.max_workers}")
+
+    async def stop(self):
+        """Terminate any running workers"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        workers = list(self._workers.values())
+        for worker in workers:
+            if worker in self._idle:
+                worker.conn.close()
+            else:
+                # Its task sees EOF and fails; run() then closes the pipe
+                logger.warning(f"Terminating busy CPU worker {worker.process.pid} on shutdown")
+            worker.process.terminate()
+        for worker in workers:
+            await asyncio.to_thread(worker.process.join, 5)
+        self._workers.clear()
+        self._idle.clear()
+        logger.info("CPU worker pool stopped")
+
+    async def run(self, fn: Callable, *args, operation: str = "CPU task",
+                  check_resources: bool = True, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) in a worker and return its result
+
+        fn and its arguments must be picklable in process mode (module-level
+        functions, static methods, or bound methods of picklable objects).
+        Cancelling the awaiting task terminates the worker.
+
+        Args:
+            fn: Function to run
+            operation: Name used in logs and resource errors
+            check_resources: Refuse to start when resource_monitor reports
+                the system is overloaded
+
+        Raises:
+            RuntimeError: Resources insufficient, or the worker died
+            Any exception raised by fn
+        """
+        if not self.is_running:
+            await self.start()
+
+        self.tasks_waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.tasks_waiting -= 1
+
+        try:
+            # Checked once a slot is free, so a task that queued behind others
+            # is judged on the load it will actually run under
+            if check_resources:
+                is_safe, reason = resource_monitor.check_resources_safe(operation)
+                if not is_safe:
+                    self.tasks_rejected += 1
+                    raise RuntimeError(f"System resources insufficient for {operation}: {reason}")
+
+            self.tasks_started += 1
+            try:
+                if self.mode == "thread":
+                    result = await asyncio.to_thread(fn, *args, **kwargs)
+                else:
+                    result = await self._run_in_worker(fn, args, kwargs, operation)
+            except asyncio.CancelledError:
+                self.tasks_cancelled += 1
+                raise
+            except Exception:
+                self.tasks_failed += 1
+                raise
+
+            self.tasks_completed += 1
+            return result
+        finally:
+            self._slots.release()
+
+    def _start_worker(self) -> _Worker:
+        """Start a worker process and register it"""
+        conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, logging.getLogger().getEffectiveLevel()),
+            name="cpu-worker",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()  # EOF on our end then means the worker has exited
+        worker = _Worker(process, conn)
+        self._workers[process.pid] = worker
+        return worker
+
+    def _checkout_worker(self) -> _Worker:
+        """Take an idle worker, replacing any that have died while idle"""
+        while self._idle:
+            worker = self._idle.pop(0)  # Oldest first, so fresh replacements get time to warm up
+            if worker.process.is_alive():
+                return worker
+            logger.warning(f"CPU worker {worker.process.pid} exited while idle (exit code {worker.process.exitcode})")
+            self._discard_worker(worker)
+        return self._start_worker()
+
+    def _discard_worker(self, worker: _Worker):
+        self._workers.pop(worker.process.pid, None)
+        worker.conn.close()
+        self.workers_replaced += 1
+
+    async def _run_in_worker(self, fn: Callable, args: tuple, kwargs: Dict[str, Any], operation: str) -> Any:
+        """Run one task in an idle worker, relaying its logs"""
+        worker = self._checkout_worker()
+        conn, process = worker.conn, worker.process
+        healthy = False
+        try:
+            # Sending can block until a freshly started worker reaches its recv
+            await asyncio.to_thread(conn.send, (fn, args, kwargs))
+            kind, payload = await self._receive_outcome(worker, operation)
+            healthy = kind in ("ok", "error")
+        finally:
+            worker.tasks_run += 1
+            if healthy and self.is_running:
+                self._idle.append(worker)
+            else:
+                # Cancelled, crashed or shutting down: replace the worker so no task state leaks
+                if process.is_alive():
+                    process.terminate()
+                self._discard_worker(worker)
+                await asyncio.to_thread(process.join, 5)
+                if self.is_running:
+                    self._idle.append(self._start_worker())
+
+        if kind == "ok":
+            return payload
+        if kind == "error":
+            raise payload
+        raise RuntimeError(f"{operation} worker exited unexpectedly (exit code {process.exitcode})")
+
+    async def _receive_outcome(self, worker: _Worker, operation: str) -> tuple:
+        """Wait for a worker's result, handing its log records to our loggers"""
+        reader = worker.conn
+        loop = asyncio.get_running_loop()
+        outcome = loop.create_future()
+
+        def on_readable():
+            try:
+                while not outcome.done() and reader.poll():
+                    kind, payload = reader.recv()
+                    if kind == "log":
+                        record = logging.makeLogRecord(payload)
+                        logging.getLogger(record.name).handle(record)
+                    elif not outcome.done():
+                        outcome.set_result((kind, payload))
+            except (EOFError, OSError):
+                if not outcome.done():
+                    outcome.set_result(("exit", None))
+            except Exception as e:
+                if not outcome.done():
+                    outcome.set_exception(e)
+
+        loop.add_reader(reader.fileno(), on_readable)
+        try:
+            return await outcome
+        except asyncio.CancelledError:
+            logger.info(f"Cancelling {operation}: terminating worker {worker.process.pid}")
+            raise
+        finally:
+            loop.remove_reader(reader.fileno())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool configuration and task counters"""
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "running": len(self._workers) - len(self._idle) if self.mode == "process" else None,
+            "idle": len(self._idle) if self.mode == "process" else None,
+            "workers_replaced": self.workers_replaced,
+            "waiting": self.tasks_waiting,
+            "started": self.tasks_started,
+            "completed": self.tasks_completed,
+            "failed": self.tasks_failed,
+            "cancelled": self.tasks_cancelled,
+            "rejected": self.tasks_rejected
+        }
+
+# Global CPU worker pool instance
+cpu_worker_pool = CPUWorkerPool()
@@ -1,11 +1,27 @@
 """
 Resource monitoring utilities for preventing system overload on Pi
+
+A background sampler refreshes a shared snapshot at a fixed cadence, so the
+throttle checks on the printer polling path read a cached value instead of
+querying psutil on every call. Readers sample on demand if the snapshot is
+older than the staleness bound (sampler not started or falling behind).
+Limits use hysteresis: once tripped, a limit stays tripped until the value
+is back below it by a margin, so checks don't flap around a threshold. Only
+a snapshot taken within the last sample interval can trip or clear a limit,
+so one bad reading is not latched for as long as it stays cached.
+
+psutil reports CPU usage since its previous call, so the first call covers
+everything since import (on startup, mostly module imports). The sampler
+makes that call when it starts and discards the result. Before then, or
+whenever the previous reading is older than the staleness bound, CPU usage
+is taken from a short blocking measurement instead.
 """
 
 import psutil
 import logging
 import asyncio
 import os
+import time
 from typing import Dict, Optional, Tuple, Any
 from dataclasses import dataclass
 from datetime import datetime
@@ -21,6 +37,7 @@ class SystemResources:
     disk_percent: float
     load_avg_1min: float
     process_count: int
+    disk_free_gb: float = 0.0
 
 class ResourceMonitor:
     """Monitor system resources and enforce limits to prevent Pi overload"""
@@ -32,15 +49,154 @@ class ResourceMonitor:
     MAX_DISK_PERCENT = 95.0
     MAX_LOAD_AVG = 3.0
     MAX_PROCESS_COUNT = 200  # Pi normally runs ~163 processes
+
+    # Window of the blocking CPU measurement used when the last reading is too old
+    CPU_REMEASURE_SECONDS = 0.1
+
+    # Per-operation throttle thresholds (see should_throttle_operation)
+    THROTTLE_THRESHOLDS = {
+        "logging": {"cpu_percent": 95.0, "memory_percent": 95.0},  # Very lenient
+        "printer_poll": {"cpu_percent": 85.0, "memory_percent": 85.0}  # Moderate
+    }
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-    
-    def get_system_resources(self) -> SystemResources:
-        """Get current system resource usage"""
+        self.sample_interval = 2.0
+        self.max_staleness = 5.0
+        self.hysteresis_percent = 5.0
+        self.throttle_thresholds = {op: dict(limits) for op, limits in self.THROTTLE_THRESHOLDS.items()}
+        self.samples = 0
+        self.on_demand_samples = 0
+        self.cached_reads = 0
+        self.is_running = False
+        self._snapshot: Optional[SystemResources] = None
+        self._sampled_at = 0.0
+        self._tripped: set = set()
+        self._cpu_read_at = 0.0
+        self._sampler_task: Optional[asyncio.Task] = None
+        self._configured = False
+
+    def _prime_cpu_percent(self):
+        """Start psutil's CPU measurement window; the reading itself is meaningless"""
+        try:
+            psutil.cpu_percent(interval=None)
+            self._cpu_read_at = time.monotonic()
+        except Exception as e:
+            logger.debug(f"Could not prime CPU usage reading: {e}")
+
+    def configure(self, monitor_config: Optional[Dict[str, Any]]):
+        """
+        Apply the performance.resource_monitor config block
+
+        Keys: sample_interval_seconds, max_staleness_seconds, hysteresis_percent
+        (margin as a percentage of each limit), throttle_thresholds
+        ({operation: {cpu_percent, memory_percent}}) and limits (overrides for
+        cpu_percent, memory_percent, min_memory_available_mb, disk_percent,
+        load_avg, process_count).
+        """
+        monitor_config = monitor_config or {}
+        try:
+            self.sample_interval = max(0.1, float(monitor_config.get('sample_interval_seconds', self.sample_interval)))
+            self.max_staleness = max(self.sample_interval, float(monitor_config.get('max_staleness_seconds', self.max_staleness)))
+            self.hysteresis_percent = max(0.0, float(monitor_config.get('hysteresis_percent', self.hysteresis_percent)))
+            for operation, limits in (monitor_config.get('throttle_thresholds') or {}).items():
+                self.throttle_thresholds.setdefault(operation, {}).update(
+                    {name: float(value) for name, value in limits.items()}
+                )
+            limit_attributes = {
+                'cpu_percent': 'MAX_CPU_PERCENT',
+                'memory_percent': 'MAX_MEMORY_PERCENT',
+                'min_memory_available_mb': 'MIN_MEMORY_AVAILABLE_MB',
+                'disk_percent': 'MAX_DISK_PERCENT',
+                'load_avg': 'MAX_LOAD_AVG',
+                'process_count': 'MAX_PROCESS_COUNT'
+            }
+            for name, value in (monitor_config.get('limits') or {}).items():
+                if name in limit_attributes:
+                    setattr(self, limit_attributes[name], float(value))
+        except (TypeError, ValueError, AttributeError):
+            logger.warning(f"Invalid resource monitor config {monitor_config}, keeping defaults")
+
+    def _ensure_configured(self):
+        if self._configured:
+            return
+        self._configured = True
+        try:
+            from ..services.config_service import get_config_service
+            self.configure(get_config_service().get_performance_config().get('resource_monitor'))
+        except Exception as e:
+            logger.debug(f"Resource monitor using default config: {e}")
+
+    async def start(self):
+        """Start the background sampler"""
+        if self.is_running:
+            return
+        self._ensure_configured()
+        self.is_running = True
+        # Startup imports would dominate a reading taken now; the first sample
+        # comes one interval later, and checks before then sample on demand
+        self._prime_cpu_percent()
+        self._snapshot = None
+        self._sampler_task = asyncio.create_task(self._sampler_loop())
+        logger.info(f"Resource sampler started (every {self.sample_interval}s, max staleness {self.max_staleness}s)")
+
+    async def stop(self):
+        """Stop the background sampler"""
+        self.is_running = False
+        if self._sampler_task:
+            self._sampler_task.cancel()
+            try:
+                await self._sampler_task
+            except asyncio.CancelledError:
+                pass
+            self._sampler_task = None
+
+    async def _sampler_loop(self):
+        while self.is_running:
+            try:
+                await asyncio.sleep(self.sample_interval)
+                await asyncio.to_thread(self.sample)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in resource sampler: {e}")
+
+    def get_system_resources(self, max_age: Optional[float] = None) -> SystemResources:
+        """
+        Get system resource usage from the shared snapshot
+
+        Args:
+            max_age: Oldest acceptable snapshot in seconds (default: the
+                configured staleness bound); an older one is refreshed here
+        """
+        self._ensure_configured()
+        snapshot = self._snapshot
+        if max_age is None:
+            max_age = self.max_staleness
+        if snapshot is not None and time.monotonic() - self._sampled_at <= max_age:
+            self.cached_reads += 1
+            return snapshot
+
+        self.on_demand_samples += 1
+        return self.sample()
+
+    def sample(self) -> SystemResources:
+        """Read current system resource usage and update the shared snapshot"""
+        resources = self._read_system_resources()
+        self._snapshot = resources
+        self._sampled_at = time.monotonic()
+        self.samples += 1
+        return resources
+
+    def _read_system_resources(self) -> SystemResources:
+        """Query psutil for current system resource usage"""
         try:
-            # CPU usage (non-blocking, instant reading)
-            cpu_percent = psutil.cpu_percent(interval=None)
+            # CPU usage since the previous reading (non-blocking), unless that was too long ago
+            if time.monotonic() - self._cpu_read_at > self.max_staleness:
+                cpu_percent = psutil.cpu_percent(interval=self.CPU_REMEASURE_SECONDS)
+            else:
+                cpu_percent = psutil.cpu_percent(interval=None)
+            self._cpu_read_at = time.monotonic()
             
             # Memory usage
             memory = psutil.virtual_memory()
@@ -63,7 +219,8 @@ class ResourceMonitor:
                 memory_available_mb=memory_available_mb,
                 disk_percent=disk_percent,
                 load_avg_1min=load_avg,
-                process_count=process_count
+                process_count=process_count,
+                disk_free_gb=disk.free / (1024**3)  # Convert bytes to GB
             )
         except Exception as e:
             logger.error(f"Error getting system resources: {e}")
@@ -80,17 +237,51 @@ class ResourceMonitor:
     def check_system_health(self) -> Dict[str, Any]:
         """Get system health metrics formatted for API response"""
         resources = self.get_system_resources()
-        disk = psutil.disk_usage('/')
 
         return {
             "cpu_percent": resources.cpu_percent,
             "memory_percent": resources.memory_percent,
             "memory_available_mb": resources.memory_available_mb,
             "disk_percent": resources.disk_percent,
-            "disk_free_gb": disk.free / (1024**3),  # Convert bytes to GB
+            "disk_free_gb": resources.disk_free_gb,
+            "sample_age_seconds": round(time.monotonic() - self._sampled_at, 1),
             "timestamp": datetime.now().isoformat()
         }
 
+    def _is_fresh(self) -> bool:
+        """Whether the snapshot is recent enough to change hysteresis state"""
+        return time.monotonic() - self._sampled_at <= self.sample_interval
+
+    def _over_limit(self, name: str, value: float, limit: float, update: bool = True) -> bool:
+        """
+        value > limit, with hysteresis: once over, stays over until below limit - margin
+
+        With update=False the current state is applied but not changed.
+        """
+        if name in self._tripped:
+            over = value > limit - limit * self.hysteresis_percent / 100
+        else:
+            over = value > limit
+        if update:
+            if over:
+                self._tripped.add(name)
+            else:
+                self._tripped.discard(name)
+        return over
+
+    def _under_limit(self, name: str, value: float, limit: float, update: bool = True) -> bool:
+        """value < limit, with hysteresis: once under, stays under until above limit + margin"""
+        if name in self._tripped:
+            under = value < limit + limit * self.hysteresis_percent / 100
+        else:
+            under = value < limit
+        if update:
+            if under:
+                self._tripped.add(name)
+            else:
+                self._tripped.discard(name)
+        return under
+
     def should_throttle_operation(self, operation_type: str) -> bool:
         """
         Check if an operation should be throttled due to resource constraints
@@ -101,16 +292,17 @@ class ResourceMonitor:
         Returns:
             True if operation should be throttled, False if safe to proceed
         """
-        # Different thresholds for different operations
-        if operation_type == "logging":
-            # Be very lenient with logging throttling
-            resources = self.get_system_resources()
-            return resources.memory_percent > 95 or resources.cpu_percent > 95
-        
-        if operation_type == "printer_poll":
-            # Moderate throttling for polling operations
+        # Different thresholds for different operations (logging, printer_poll)
+        self._ensure_configured()
+        thresholds = self.throttle_thresholds.get(operation_type)
+        if thresholds:
             resources = self.get_system_resources()
-            return resources.memory_percent > 85 or resources.cpu_percent > 85
+            fresh = self._is_fresh()
+            memory_over = self._over_limit(f"{operation_type}.memory_percent", resources.memory_percent,
+                                           thresholds.get("memory_percent", 100.0), fresh)
+            cpu_over = self._over_limit(f"{operation_type}.cpu_percent", resources.cpu_percent,
+                                        thresholds.get("cpu_percent", 100.0), fresh)
+            return memory_over or cpu_over
         
         if operation_type == "reconnect":
             # More strict for reconnection attempts
@@ -129,25 +321,30 @@ class ResourceMonitor:
             (is_safe, reason_if_not_safe)
         """
         resources = self.get_system_resources()
+        fresh = self._is_fresh()
+        
+        # Check each resource limit (every limit is evaluated so hysteresis state stays current)
+        problems = []
+        if self._over_limit("cpu_percent", resources.cpu_percent, self.MAX_CPU_PERCENT, fresh):
+            problems.append(f"CPU usage too high: {resources.cpu_percent:.1f}% (max {self.MAX_CPU_PERCENT}%)")
         
-        # Check each resource limit
-        if resources.cpu_percent > self.MAX_CPU_PERCENT:
-            return False, f"CPU usage too high: {resources.cpu_percent:.1f}% (max {self.MAX_CPU_PERCENT}%)"
+        if self._over_limit("memory_percent", resources.memory_percent, self.MAX_MEMORY_PERCENT, fresh):
+            problems.append(f"Memory usage too high: {resources.memory_percent:.1f}% (max {self.MAX_MEMORY_PERCENT}%)")
         
-        if resources.memory_percent > self.MAX_MEMORY_PERCENT:
-            return False, f"Memory usage too high: {resources.memory_percent:.1f}% (max {self.MAX_MEMORY_PERCENT}%)"
+        if self._under_limit("memory_available_mb", resources.memory_available_mb, self.MIN_MEMORY_AVAILABLE_MB, fresh):
+            problems.append(f"Available memory too low: {resources.memory_available_mb:.0f}MB (min {self.MIN_MEMORY_AVAILABLE_MB}MB)")
         
-        if resources.memory_available_mb < self.MIN_MEMORY_AVAILABLE_MB:
-            return False, f"Available memory too low: {resources.memory_available_mb:.0f}MB (min {self.MIN_MEMORY_AVAILABLE_MB}MB)"
+        if self._over_limit("disk_percent", resources.disk_percent, self.MAX_DISK_PERCENT, fresh):
+            problems.append(f"Disk usage too high: {resources.disk_percent:.1f}% (max {self.MAX_DISK_PERCENT}%)")
         
-        if resources.disk_percent > self.MAX_DISK_PERCENT:
-            return False, f"Disk usage too high: {resources.disk_percent:.1f}% (max {self.MAX_DISK_PERCENT}%)"
+        if self._over_limit("load_avg", resources.load_avg_1min, self.MAX_LOAD_AVG, fresh):
+            problems.append(f"System load too high: {resources.load_avg_1min:.2f} (max {self.MAX_LOAD_AVG})")
         
-        if resources.load_avg_1min > self.MAX_LOAD_AVG:
-            return False, f"System load too high: {resources.load_avg_1min:.2f} (max {self.MAX_LOAD_AVG})"
+        if self._over_limit("process_count", resources.process_count, self.MAX_PROCESS_COUNT, fresh):
+            problems.append(f"Too many processes: {resources.process_count} (max {self.MAX_PROCESS_COUNT})")
         
-        if resources.process_count > self.MAX_PROCESS_COUNT:
-            return False, f"Too many processes: {resources.process_count} (max {self.MAX_PROCESS_COUNT})"
+        if problems:
+            return False, problems[0]
         
         # Only log resource usage if there are issues or periodically
         if not resources.memory_percent < 50:  # Only log if memory usage is concerning
@@ -211,6 +408,20 @@ class ResourceMonitor:
             
             await asyncio.sleep(check_interval)
     
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sampler cadence, snapshot age and read counters"""
+        return {
+            "sampler_running": self.is_running,
+            "sample_interval_seconds": self.sample_interval,
+            "max_staleness_seconds": self.max_staleness,
+            "hysteresis_percent": self.hysteresis_percent,
+            "snapshot_age_seconds": round(time.monotonic() - self._sampled_at, 1) if self._snapshot else None,
+            "samples": self.samples,
+            "on_demand_samples": self.on_demand_samples,
+            "cached_reads": self.cached_reads,
+            "tripped_limits": sorted(self._tripped)
+        }
+
     def get_recommended_limits(self, file_size_mb: float, object_count: int) -> Dict[str, int]:
         """
         Get recommended timeout and resource limits based on operation parameters
@@ -0,0 +1,145 @@
+"""
+SQLite connection profile
+
+One set of pragmas applied to every SQLite connection the app opens, whether
+through the SQLAlchemy engine in DatabaseService or a raw sqlite3 connection,
+so all writers agree on journal mode, sync level and lock waiting.
+"""
+
+import logging
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SYNCHRONOUS_LEVELS = {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}
+TEMP_STORES = {"DEFAULT": 0, "FILE": 1, "MEMORY": 2}
+
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """Pragmas applied to each new SQLite connection"""
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size_mb: int = 64
+    cache_size_kb: int = 8192
+    temp_store: str = "MEMORY"
+    busy_timeout_ms: int = 30000
+    foreign_keys: bool = True
+
+    @classmethod
+    def from_config(cls, database_config: Optional[Dict[str, Any]]) -> "SQLiteProfile":
+        """Build a profile from the 'sqlite' block of the database config
+
+        Unknown or invalid values fall back to the defaults with a warning,
+        so a typo in config.yaml never stops the database from opening.
+        """
+        settings = (database_config or {}).get('sqlite') or {}
+        defaults = cls()
+
+        def choice(key: str, allowed) -> str:
+            value = str(settings.get(key, getattr(defaults, key))).upper()
+            if value not in allowed:
+                logger.warning(f"Invalid SQLite {key} '{value}', using {getattr(defaults, key)}")
+                return getattr(defaults, key)
+            return value
+
+        def number(key: str) -> int:
+            try:
+                return max(0, int(settings.get(key, getattr(defaults, key))))
+            except (TypeError, ValueError):
+                logger.warning(f"Invalid SQLite {key} '{settings.get(key)}', using {getattr(defaults, key)}")
+                return getattr(defaults, key)
+
+        return cls(
+            journal_mode=choice('journal_mode', JOURNAL_MODES),
+            synchronous=choice('synchronous', SYNCHRONOUS_LEVELS),
+            mmap_size_mb=number('mmap_size_mb'),
+            cache_size_kb=number('cache_size_kb'),
+            temp_store=choice('temp_store', TEMP_STORES),
+            busy_timeout_ms=number('busy_timeout_ms'),
+            foreign_keys=bool(settings.get('foreign_keys', defaults.foreign_keys))
+        )
+
+    @property
+    def busy_timeout_seconds(self) -> float:
+        """Busy timeout in seconds, as sqlite3.connect(timeout=...) expects"""
+        return self.busy_timeout_ms / 1000
+
+    def pragmas(self) -> List[str]:
+        """PRAGMA statements in the order they are applied"""
+        return [
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA mmap_size={self.mmap_size_mb * 1024 * 1024}",
+            f"PRAGMA cache_size=-{self.cache_size_kb}",  # negative = KiB rather than pages
+            f"PRAGMA temp_store={self.temp_store}",
+            f"PRAGMA busy_timeout={self.busy_timeout_ms}",
+            f"PRAGMA foreign_keys={'ON' if self.foreign_keys else 'OFF'}",
+        ]
+
+    def apply(self, dbapi_connection) -> None:
+        """Apply the profile to an open DB-API connection"""
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in self.pragmas():
+                cursor.execute(statement)
+                # journal_mode returns a row; drain it so the statement completes
+                cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def expected(self) -> Dict[str, Any]:
+        """Pragma values as SQLite reports them back once applied"""
+        return {
+            "journal_mode": self.journal_mode.lower(),
+            "synchronous": SYNCHRONOUS_LEVELS[self.synchronous],
+            "mmap_size": self.mmap_size_mb * 1024 * 1024,
+            "cache_size": -self.cache_size_kb,
+            "temp_store": TEMP_STORES[self.temp_store],
+            "busy_timeout": self.busy_timeout_ms,
+            "foreign_keys": 1 if self.foreign_keys else 0,
+        }
+
+    def mismatches(self, active: Dict[str, Any]) -> Dict[str, Any]:
+        """Compare pragmas read from a connection against the profile
+
+        Returns:
+            pragma -> {"expected": ..., "active": ...} for every difference
+        """
+        differences = {}
+        for pragma, expected in self.expected().items():
+            value = active.get(pragma)
+            if isinstance(value, str):
+                value = value.lower()
+            if value != expected:
+                differences[pragma] = {"expected": expected, "active": value}
+        return differences
+
+# Active profile, built from config on first use
+_active_profile: Optional[SQLiteProfile] = None
+
+def get_sqlite_profile() -> SQLiteProfile:
+    """Get the profile for this process, loading it from config on first use"""
+    global _active_profile
+    if _active_profile is None:
+        from ..services.config_service import get_config_service
+        _active_profile = SQLiteProfile.from_config(get_config_service().get_database_config())
+    return _active_profile
+
+def connect_sqlite(database_path: str, **kwargs) -> sqlite3.Connection:
+    """Open a raw sqlite3 connection with the active profile applied
+
+    Use this instead of sqlite3.connect for the application database so raw
+    connections wait on locks and journal the same way the engine does.
+    """
+    profile = get_sqlite_profile()
+    kwargs.setdefault('timeout', profile.busy_timeout_seconds)
+    conn = sqlite3.connect(database_path, **kwargs)
+    try:
+        profile.apply(conn)
+    except Exception:
+        conn.close()
+        raise
+    return conn
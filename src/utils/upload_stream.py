@@ -0,0 +1,203 @@
+"""
+Streaming upload writer
+
+Copies an UploadFile to disk in fixed-size chunks on a worker thread,
+hashing it and enforcing a size limit as it goes, so an upload never has
+to fit in RAM. For ZIP-based files (3MF) the trailing bytes are kept in a
+bounded window and the central directory is indexed from them once the
+stream ends, without reopening the file.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import struct
+import zipfile
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, UploadFile
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Trailing bytes kept for the central directory; larger directories are
+# read back from the written file instead
+ZIP_TAIL_WINDOW = 256 * 1024
+
+_EOCD = struct.Struct('<4s4H2LH')
+_EOCD_SIGNATURE = b'PK\x05\x06'
+_CD_ENTRY = struct.Struct('<4s6H3L5H2L')
+_CD_SIGNATURE = b'PK\x01\x02'
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the allowed size"""
+
+    def __init__(self, limit_bytes: int, size_bytes: Optional[int] = None):
+        self.limit_bytes = limit_bytes
+        self.size_bytes = size_bytes
+        received = f"{size_bytes} bytes" if size_bytes is not None else "more"
+        super().__init__(f"File exceeds the {limit_bytes // (1024 * 1024)}MB upload limit (received {received})")
+
+class InvalidArchiveError(ValueError):
+    """Raised when a ZIP-based upload (3MF) is not a readable archive"""
+
+@dataclass
+class StreamedUpload:
+    """A streamed upload on disk"""
+    path: str
+    size_bytes: int
+    sha256: str
+    zip_members: Optional[Dict[str, Dict[str, Any]]] = None  # name -> location, if indexed
+
+def get_max_upload_bytes() -> int:
+    """Upload size limit from performance.uploads.max_file_size_mb"""
+    from ..services.config_service import get_config_service
+    uploads = get_config_service().get_performance_config().get('uploads', {})
+    return int(float(uploads.get('max_file_size_mb', 512)) * 1024 * 1024)
+
+async def stream_upload_to_file(upload: UploadFile, destination: str,
+                                max_bytes: Optional[int] = None,
+                                index_zip: bool = False) -> StreamedUpload:
+    """
+    Write an upload to destination in chunks, hashing it on the way
+
+    The data goes to destination + '.part' and is renamed into place only
+    when complete, so a failed or rejected upload never leaves a partial
+    file under the final name.
+
+    Args:
+        upload: Incoming file
+        destination: Final path
+        max_bytes: Reject uploads larger than this (default: configured limit)
+        index_zip: Index the ZIP central directory (for 3MF files); the
+            upload is rejected if it is not a readable ZIP
+
+    Raises:
+        UploadTooLargeError: The upload is over max_bytes (checked against the
+            declared size first, then while streaming)
+        InvalidArchiveError: index_zip was set and the upload is not a ZIP
+    """
+    if max_bytes is None:
+        max_bytes = get_max_upload_bytes()
+
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(max_bytes, upload.size)
+
+    await upload.seek(0)
+    return await asyncio.to_thread(_copy_upload, upload.file, destination, max_bytes, index_zip)
+
+async def receive_upload(upload: UploadFile, destination: str, index_zip: bool = False) -> StreamedUpload:
+    """stream_upload_to_file for API endpoints: oversize uploads are a 413, bad archives a 400"""
+    try:
+        return await stream_upload_to_file(upload, destination, index_zip=index_zip)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidArchiveError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _copy_upload(source, destination: str, max_bytes: int, index_zip: bool) -> StreamedUpload:
+    """Blocking chunked copy; runs on a worker thread"""
+    partial_path = destination + '.part'
+    digest = hashlib.sha256()
+    tail = bytearray()
+    size = 0
+
+    try:
+        with open(partial_path, 'wb') as target:
+            while True:
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                digest.update(chunk)
+                target.write(chunk)
+                if index_zip:
+                    tail += chunk
+                    if len(tail) > ZIP_TAIL_WINDOW:
+                        del tail[:len(tail) - ZIP_TAIL_WINDOW]
+
+        zip_members = None
+        if index_zip:
+            zip_members = _index_zip(bytes(tail), size, partial_path)
+            if zip_members is None:
+                raise InvalidArchiveError("File is not a valid ZIP/3MF archive")
+        os.replace(partial_path, destination)
+    except BaseException:
+        try:
+            os.remove(partial_path)
+        except OSError:
+            pass
+        raise
+
+    return StreamedUpload(destination, size, digest.hexdigest(), zip_members)
+
+def _index_zip(tail: bytes, file_size: int, path: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Index a ZIP central directory from the file's trailing bytes
+
+    Falls back to zipfile on the written file for ZIP64 archives or a
+    directory larger than the tail window. Returns None if the file is not
+    a readable ZIP.
+    """
+    members = _index_zip_tail(tail, file_size)
+    if members is not None:
+        return members
+
+    try:
+        with zipfile.ZipFile(path) as zip_ref:
+            return {
+                info.filename: {
+                    "offset": info.header_offset,
+                    "compressed_size": info.compress_size,
+                    "size": info.file_size,
+                    "compression": info.compress_type
+                }
+                for info in zip_ref.infolist()
+            }
+    except (zipfile.BadZipFile, OSError) as e:
+        logger.debug(f"Upload {path} is not a readable ZIP: {e}")
+        return None
+
+def _index_zip_tail(tail: bytes, file_size: int) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Parse the central directory out of tail, or None if it is not all there"""
+    eocd_at = tail.rfind(_EOCD_SIGNATURE)
+    if eocd_at < 0 or len(tail) - eocd_at < _EOCD.size:
+        return None
+
+    _, _, _, _, entry_count, cd_size, cd_offset, _ = _EOCD.unpack_from(tail, eocd_at)
+    if cd_offset == 0xFFFFFFFF or entry_count == 0xFFFF:
+        return None  # ZIP64
+
+    tail_start = file_size - len(tail)
+    position = cd_offset - tail_start
+    if position < 0 or position + cd_size != eocd_at:
+        return None  # Directory starts before the window, or prepended data
+
+    members = {}
+    for _ in range(entry_count):
+        if position + _CD_ENTRY.size > eocd_at:
+            return None
+        fields = _CD_ENTRY.unpack_from(tail, position)
+        if fields[0] != _CD_SIGNATURE:
+            return None
+        flags, compression = fields[3], fields[4]
+        compressed_size, size = fields[8], fields[9]
+        name_length, extra_length, comment_length = fields[10], fields[11], fields[12]
+        header_offset = fields[16]
+
+        raw_name = tail[position + _CD_ENTRY.size:position + _CD_ENTRY.size + name_length]
+        name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437')
+        members[name] = {
+            "offset": header_offset,
+            "compressed_size": compressed_size,
+            "size": size,
+            "compression": compression
+        }
+        position += _CD_ENTRY.size + name_length + extra_length + comment_length
+
+    return members